@@ -0,0 +1,368 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from src.logic.artifact_cache import ArtifactCache
+from src.logic.limited_exec import Limits
+from src.logic.pipeline import (
+    compile_source, build_intermediate, run_intermediate, run_program, run_assembly, read_inputs_file,
+    read_input_vectors, DEFAULT_MAX_STEPS
+)
+
+
+def _inputs(args):
+    inputs = list(args.input or [])
+    if args.inputs_file:
+        inputs += read_inputs_file(args.inputs_file)
+    return inputs
+
+
+def _limits(args):
+    mb = 1024 * 1024
+    return Limits(
+        cpu=args.cpu_limit,
+        memory=int(args.memory_limit * mb) if args.memory_limit else None,
+        output=int(args.output_limit * mb) if args.output_limit else None,
+        wall=args.timeout,
+    )
+
+
+def cmd_compile(args):
+    cache = None if args.no_cache else ArtifactCache()
+    result = compile_source(args.compiler, args.source, args.args, cache=cache, timeout=args.timeout)
+    return {"compile": result}, result["status"] == "ok"
+
+
+def cmd_run_int(args):
+    inputs = _inputs(args)
+    result = run_intermediate(args.file, inputs, args.timeout, backend=args.backend, optimize=args.optimize,
+                              profile=args.profile, limits=_limits(args))
+    report = {"intermediate": result}
+    if args.compare:
+        other = "gcc" if args.backend == "interp" else "interp"
+        reference = run_intermediate(args.file, inputs, args.timeout, backend=other, optimize=args.optimize)
+        report["comparison"] = {
+            "backend": other,
+            "result": reference,
+            "same_output": reference.get("stdout") == result.get("stdout"),
+            "speedup": _total_time(reference) / _total_time(result) if _total_time(result) else None,
+        }
+    return report, result["status"] == "ok"
+
+
+def _total_time(result):
+    """Wall time of a run including the gcc build, when there was one."""
+    return result.get("duration", 0.0) + result.get("build", {}).get("duration", 0.0)
+
+
+def cmd_run_int_batch(args):
+    # NumPy is only needed here, so the other commands start without it.
+    from src.logic.int_vector import read_input_matrix, run_lockstep
+    from src.logic.int_interpreter import compile_program
+    from src.logic.quads import parse_program
+
+    matrix = read_input_matrix(args.inputs_matrix)
+    if args.fork_server:
+        return _run_int_forked(args, matrix)
+    widths = {len(row) for row in matrix}
+    if len(widths) > 1:
+        return {"error": "every input vector must have the same number of values"}, False
+    compiled = compile_program(parse_program(args.file))
+    lanes = run_lockstep(compiled, matrix, max_steps=args.max_steps)
+    report = {
+        "lanes": [dict(lane, inputs=row) for lane, row in zip(lanes, matrix)],
+        "duration": lanes[0]["duration"] if lanes else 0.0,
+    }
+    return report, all(lane["status"] == "ok" for lane in lanes)
+
+
+def _run_int_forked(args, matrix):
+    """run-int-batch with --fork-server: one gcc build, one forked child per vector."""
+    from src.logic.fork_server import ForkServer
+
+    build = build_intermediate(args.file, fork_server=True)
+    if build["status"] != "ok":
+        return {"build": build}, False
+    server = ForkServer([build["executable"]])
+    start = time.perf_counter()
+    lanes = []
+    try:
+        for row in matrix:
+            result = server.run(row, _limits(args)) or run_program([build["executable"]], row, limits=_limits(args))
+            lanes.append(dict(result, inputs=row))
+    finally:
+        server.close()
+    report = {"lanes": lanes, "duration": time.perf_counter() - start, "fork_server_restarts": server.restarts}
+    return report, all(lane["status"] == "ok" for lane in lanes)
+
+
+def cmd_run_asm(args):
+    result = run_assembly(args.file, _inputs(args), args.timeout, limits=_limits(args), max_steps=args.max_steps,
+                          backend=args.backend)
+    return {"assembly": result}, result["status"] == "ok"
+
+
+def _asm_files(paths):
+    """The given .asm files, with directories expanded to the .asm files in them."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".asm"))
+        else:
+            files.append(path)
+    return files
+
+
+def cmd_bench_asm(args):
+    shared = _inputs(args) if args.input or args.inputs_file else None
+    rows = []
+    totals = {"rars": 0.0, "python": 0.0}
+    for path in _asm_files(args.files):
+        inputs = shared
+        if inputs is None:
+            # <name>.in next to the program, if there is one.
+            in_file = os.path.splitext(path)[0] + ".in"
+            inputs = read_inputs_file(in_file) if os.path.exists(in_file) else []
+        row = {"file": path}
+        for backend in ("rars", "python"):
+            result = run_assembly(path, inputs, args.timeout, max_steps=args.max_steps, backend=backend)
+            row[backend] = {
+                "status": result["status"],
+                "duration": result["duration"],
+                "instructions": result["stats"].get("instructions"),
+                "stdout": result["stdout"],
+            }
+            totals[backend] += result["duration"]
+        row["same_output"] = row["rars"]["stdout"] == row["python"]["stdout"]
+        row["same_instructions"] = row["rars"]["instructions"] == row["python"]["instructions"]
+        row["speedup"] = row["rars"]["duration"] / row["python"]["duration"] if row["python"]["duration"] else None
+        rows.append(row)
+    report = {
+        "files": rows,
+        "rars_duration": totals["rars"],
+        "python_duration": totals["python"],
+        "speedup": totals["rars"] / totals["python"] if totals["python"] else None,
+    }
+    return report, all(row["same_output"] for row in rows)
+
+
+def cmd_run_asm_batch(args):
+    from src.logic.asm_batch import list_cases, run_cases
+
+    summary = run_cases(list_cases(args.folder), workers=args.workers, backend=args.backend, limits=_limits(args),
+                        max_steps=args.max_steps, use_daemon=not args.no_warm_rars)
+    return {"batch": summary}, summary["failed"] == 0
+
+
+def cmd_diff_run(args):
+    from src.logic.differential import diff_program, summarize
+
+    vectors = read_input_vectors(args.vectors) if args.vectors else [_inputs(args)]
+    start = time.perf_counter()
+    cases = diff_program(args.int_file, args.asm_file, vectors, args.timeout, limits=_limits(args),
+                         max_steps=args.max_steps, asm_backend=args.backend)
+    summary = summarize(cases, 1, 1, time.perf_counter() - start)
+    return {"differential": summary}, summary["matched"] == len(cases)
+
+
+def cmd_diff_corpus(args):
+    from src.logic.batch_compiler import list_sources
+    from src.logic.differential import diff_corpus
+
+    summary = diff_corpus(args.compiler, list_sources(args.folder, args.extension), workers=args.workers,
+                          extra_args=args.args, timeout=args.timeout, limits=_limits(args),
+                          max_steps=args.max_steps, asm_backend=args.backend, use_daemon=not args.no_warm_rars)
+    return {"differential": summary}, summary["matched"] == len(summary["cases"])
+
+
+def cmd_test_matrix(args):
+    from src.logic.test_matrix import run_matrix
+
+    summary = run_matrix(args.compiler, args.source, workers=args.workers, extra_args=args.args,
+                         cache=None if args.no_cache else ArtifactCache(), limits=_limits(args),
+                         max_steps=args.max_steps, asm_backend=args.backend, fork_server=not args.no_fork_server,
+                         use_daemon=not args.no_warm_rars)
+    return {"matrix": summary}, summary["compile"]["status"] == "ok" and summary["failed"] == 0
+
+
+def cmd_all(args):
+    report, ok = cmd_compile(args)
+    if not ok:
+        return report, False
+    artifacts = report["compile"]["artifacts"]
+    inputs = _inputs(args)
+    if artifacts.get("int"):
+        report["intermediate"] = run_intermediate(artifacts["int"], inputs, args.timeout, limits=_limits(args))
+        ok = ok and report["intermediate"]["status"] == "ok"
+    if artifacts.get("asm"):
+        report["assembly"] = run_assembly(
+            artifacts["asm"], inputs, args.timeout, limits=_limits(args), max_steps=args.max_steps
+        )
+        ok = ok and report["assembly"]["status"] == "ok"
+    return report, ok
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="Run the compile/run pipeline without the GUI and print JSON results."
+    )
+    parser.add_argument("-o", "--output", help="write the JSON report to this file instead of stdout")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_compile_args(p):
+        p.add_argument("--compiler", required=True, help="compiler driver script (.py)")
+        p.add_argument("--source", required=True, help="source file to compile")
+        p.add_argument("--args", default="", help="extra arguments passed to the compiler")
+        p.add_argument("--no-cache", action="store_true", help="always run the compiler")
+
+    def add_input_args(p):
+        p.add_argument("-i", "--input", action="append", help="input value (repeat for several)")
+        p.add_argument("--inputs-file", help="file with whitespace-separated input values")
+
+    def add_limit_args(p):
+        p.add_argument("--cpu-limit", type=float, help="CPU seconds a program may use")
+        p.add_argument("--memory-limit", type=float, help="address space in MB (not applied to RARS)")
+        p.add_argument("--output-limit", type=float, help="MB of output before a program is stopped")
+
+    def add_step_args(p):
+        p.add_argument("--max-steps", type=int, default=DEFAULT_MAX_STEPS,
+                       help="instructions RARS may execute before the run is stopped (0 for no limit)")
+
+    def add_warm_rars_arg(p):
+        p.add_argument("--no-warm-rars", action="store_true",
+                       help="start a fresh RARS for every .asm run instead of using warm RARS hosts")
+
+    p = sub.add_parser("compile", help="compile a source file")
+    add_compile_args(p)
+    p.add_argument("--timeout", type=float, default=None, help="seconds before giving up")
+    p.set_defaults(func=cmd_compile)
+
+    p = sub.add_parser("run-int", help="run an .int file (via C and gcc, or the built-in interpreter)")
+    p.add_argument("file")
+    add_input_args(p)
+    add_limit_args(p)
+    p.add_argument("--backend", choices=["gcc", "interp"], default="gcc",
+                   help="translate to C and build with gcc, or interpret the quads in-process")
+    p.add_argument("--compare", action="store_true",
+                   help="also run the other backend and report timing and whether the outputs match")
+    p.add_argument("--optimize", action="store_true",
+                   help="run the quad optimizer before emitting C (gcc backend)")
+    p.add_argument("--profile", action="store_true",
+                   help="count how often each quad runs and report the hottest .int lines (gcc backend)")
+    p.add_argument("--timeout", type=float, default=10, help="seconds before the run is killed")
+    p.set_defaults(func=cmd_run_int)
+
+    p = sub.add_parser("run-int-batch", help="run an .int file once per input vector, all vectors in lockstep")
+    p.add_argument("file")
+    p.add_argument("--inputs-matrix", required=True,
+                   help="file with one whitespace-separated input vector per line")
+    p.add_argument("--max-steps", type=int, default=10_000_000,
+                   help="quads a vector may execute before it is stopped")
+    p.add_argument("--fork-server", action="store_true",
+                   help="build with gcc once and fork a fresh child per vector instead of running in lockstep")
+    add_limit_args(p)
+    p.add_argument("--timeout", type=float, default=10,
+                   help="seconds before each vector is killed (--fork-server)")
+    p.set_defaults(func=cmd_run_int_batch)
+
+    p = sub.add_parser("run-asm", help="run an .asm file under RARS")
+    p.add_argument("file")
+    add_input_args(p)
+    add_limit_args(p)
+    add_step_args(p)
+    p.add_argument("--backend", choices=["rars", "python"], default="rars",
+                   help="run under RARS, or with the built-in RV32IM simulator")
+    p.add_argument("--timeout", type=float, default=10, help="seconds before the run is killed")
+    p.set_defaults(func=cmd_run_asm)
+
+    p = sub.add_parser("run-asm-batch", help="run a folder of .asm cases (<name>.in/.out next to each) in parallel")
+    p.add_argument("folder")
+    add_limit_args(p)
+    add_step_args(p)
+    p.add_argument("--backend", choices=["rars", "python"], default="rars",
+                   help="run under RARS, or with the built-in RV32IM simulator")
+    p.add_argument("--workers", type=int, default=None, help="cases run at once (default: CPU count)")
+    p.add_argument("--timeout", type=float, default=10, help="seconds before each case is killed")
+    add_warm_rars_arg(p)
+    p.set_defaults(func=cmd_run_asm_batch)
+
+    p = sub.add_parser("bench-asm", help="run .asm files under RARS and the built-in simulator and compare")
+    p.add_argument("files", nargs="+", help=".asm files or directories of them")
+    add_input_args(p)
+    add_step_args(p)
+    p.add_argument("--timeout", type=float, default=10, help="seconds before each run is killed")
+    p.set_defaults(func=cmd_bench_asm)
+
+    p = sub.add_parser("diff-run", help="run an .int and its .asm on the same inputs and compare their output")
+    p.add_argument("int_file")
+    p.add_argument("asm_file")
+    add_input_args(p)
+    p.add_argument("--vectors", help="file with one input vector per line; each is compared separately")
+    add_limit_args(p)
+    add_step_args(p)
+    p.add_argument("--backend", choices=["rars", "python"], default="rars",
+                   help="run the .asm under RARS, or with the built-in RV32IM simulator")
+    p.add_argument("--timeout", type=float, default=10, help="seconds before each run is killed")
+    p.set_defaults(func=cmd_diff_run)
+
+    p = sub.add_parser("diff-corpus",
+                       help="compile a folder of sources and compare each program's .int and .asm runs")
+    p.add_argument("folder")
+    p.add_argument("--compiler", required=True, help="compiler driver script (.py)")
+    p.add_argument("--args", default="", help="extra arguments passed to the compiler")
+    p.add_argument("--extension", default="", help="only sources with this extension (e.g. .ci)")
+    add_limit_args(p)
+    add_step_args(p)
+    p.add_argument("--backend", choices=["rars", "python"], default="rars",
+                   help="run the .asm under RARS, or with the built-in RV32IM simulator")
+    p.add_argument("--workers", type=int, default=None, help="programs compared at once (default: CPU count)")
+    p.add_argument("--timeout", type=float, default=10, help="seconds before each run is killed")
+    add_warm_rars_arg(p)
+    p.set_defaults(func=cmd_diff_corpus)
+
+    p = sub.add_parser("test-matrix",
+                       help="compile a source once and run its <name>.tests/ cases on the .int and the .asm")
+    add_compile_args(p)
+    add_limit_args(p)
+    add_step_args(p)
+    p.add_argument("--backend", choices=["rars", "python"], default="rars",
+                   help="run the .asm under RARS, or with the built-in RV32IM simulator")
+    p.add_argument("--workers", type=int, default=None, help="runs at once (default: CPU count)")
+    p.add_argument("--no-fork-server", action="store_true",
+                   help="start the gcc build afresh for every case instead of forking it from a server")
+    p.add_argument("--timeout", type=float, default=10, help="seconds before each run is killed")
+    add_warm_rars_arg(p)
+    p.set_defaults(func=cmd_test_matrix)
+
+    p = sub.add_parser("all", help="compile, then run the generated .int and .asm")
+    add_compile_args(p)
+    add_input_args(p)
+    add_limit_args(p)
+    add_step_args(p)
+    p.add_argument("--timeout", type=float, default=10, help="seconds before each step is killed")
+    p.set_defaults(func=cmd_all)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        report, ok = args.func(args)
+    except (ValueError, TypeError, OSError) as e:
+        # Malformed .int quads, bad input values and unreadable files are reported, not raised.
+        report, ok = {"status": "error", "command": args.command, "error": str(e)}, False
+    report["ok"] = ok
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+import os
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
+    QSpinBox, QComboBox, QTableWidget, QTableWidgetItem, QFileDialog, QHeaderView
+)
+from PyQt6.QtCore import Qt
+
+from src.logic.asm_batch import list_cases, summary_line
+from src.gui.asm_batch_worker import AsmBatchWorker
+
+class AsmBatchDialog(QDialog):
+    """Run a folder of .asm test cases on a pool of workers and show pass/fail as they complete."""
+
+    COLUMNS = ["Case", "Status", "Duration", "Instructions", "Detail"]
+
+    def __init__(self, limits=None, max_steps=0, backend="rars", use_daemon=True, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Batch Run Assembly")
+        self.resize(850, 450)
+        self.limits = limits
+        self.max_steps = max_steps
+        self.use_daemon = use_daemon
+        self.worker = None
+        self.rows = {}
+        self.completed = 0
+
+        layout = QVBoxLayout(self)
+
+        folder_row = QHBoxLayout()
+        self.folder_entry = QLineEdit(readOnly=True)
+        self.folder_entry.setPlaceholderText("Select a folder of .asm files (with optional .in/.out files)...")
+        browse_btn = QPushButton("Browse...")
+        browse_btn.clicked.connect(self.browse_folder)
+        folder_row.addWidget(self.folder_entry)
+        folder_row.addWidget(browse_btn)
+        layout.addLayout(folder_row)
+
+        options_row = QHBoxLayout()
+        options_row.addWidget(QLabel("Backend:"))
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItems(["RARS", "Simulator"])
+        self.backend_combo.setCurrentText("Simulator" if backend == "python" else "RARS")
+        options_row.addWidget(self.backend_combo)
+        options_row.addWidget(QLabel("Workers:"))
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 64)
+        self.workers_spin.setValue(os.cpu_count() or 1)
+        options_row.addWidget(self.workers_spin)
+        options_row.addStretch()
+        self.start_btn = QPushButton("Start")
+        self.start_btn.setEnabled(False)
+        self.start_btn.clicked.connect(self.start)
+        self.stop_btn = QPushButton("Stop")
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self.stop)
+        options_row.addWidget(self.start_btn)
+        options_row.addWidget(self.stop_btn)
+        layout.addLayout(options_row)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.summary_label = QLabel("")
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+    def browse_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Assembly Folder")
+        if folder:
+            self.folder_entry.setText(folder)
+            self.start_btn.setEnabled(True)
+
+    def start(self):
+        cases = list_cases(self.folder_entry.text())
+        if not cases:
+            self.summary_label.setText("No .asm files found.")
+            return
+
+        self.table.setRowCount(len(cases))
+        self.rows = {}
+        self.completed = 0
+        for row, case in enumerate(cases):
+            self.rows[case["name"]] = row
+            self.table.setItem(row, 0, QTableWidgetItem(case["name"]))
+            self.table.setItem(row, 1, QTableWidgetItem("queued"))
+            for col in range(2, len(self.COLUMNS)):
+                self.table.setItem(row, col, QTableWidgetItem(""))
+
+        self.summary_label.setText(f"Running {len(cases)} case(s)...")
+        self.start_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.worker = AsmBatchWorker(
+            cases,
+            self.workers_spin.value(),
+            backend="python" if self.backend_combo.currentText() == "Simulator" else "rars",
+            limits=self.limits,
+            max_steps=self.max_steps,
+            use_daemon=self.use_daemon
+        )
+        self.worker.result_ready.connect(self.on_result)
+        self.worker.done.connect(self.on_done)
+        self.worker.error.connect(self.on_error)
+        self.worker.start()
+
+    def stop(self):
+        if self.worker:
+            self.worker.stop()
+
+    def on_result(self, result: dict):
+        row = self.rows.get(result["name"])
+        if row is None:
+            return
+        self.completed += 1
+        status_item = QTableWidgetItem(result["outcome"])
+        status_item.setToolTip(result["stdout"].strip())
+        self.table.setItem(row, 1, status_item)
+        duration = QTableWidgetItem(f"{result['duration'] * 1000:.0f} ms")
+        duration.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        self.table.setItem(row, 2, duration)
+        instructions = result["stats"].get("instructions")
+        count = QTableWidgetItem(f"{instructions:,}" if instructions is not None else "")
+        count.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        self.table.setItem(row, 3, count)
+        self.table.setItem(row, 4, QTableWidgetItem(result["detail"]))
+        self.summary_label.setText(f"{self.completed}/{len(self.rows)} case(s) done...")
+
+    def on_done(self, summary: dict):
+        self.summary_label.setText(summary_line(summary))
+        self._finish()
+
+    def on_error(self, message: str):
+        self.summary_label.setText(f"Batch run failed: {message}")
+        self._finish()
+
+    def _finish(self):
+        self.start_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+
+    def reject(self):
+        if self.worker and self.worker.isRunning():
+            self.worker.stop()
+            self.worker.wait()
+        super().reject()
@@ -0,0 +1,38 @@
+import threading
+from PyQt6.QtCore import QThread, pyqtSignal
+from src.logic.asm_batch import run_cases
+
+class AsmBatchWorker(QThread):
+    result_ready = pyqtSignal(dict)
+    done = pyqtSignal(dict)
+    error = pyqtSignal(str)
+
+    def __init__(self, cases: list[dict], workers: int, backend: str = "rars", limits=None, max_steps: int = 0,
+                 use_daemon: bool = True):
+        super().__init__()
+        self.cases = cases
+        self.workers = workers
+        self.backend = backend
+        self.limits = limits
+        self.max_steps = max_steps
+        self.use_daemon = use_daemon
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        try:
+            summary = run_cases(
+                self.cases,
+                workers=self.workers,
+                backend=self.backend,
+                limits=self.limits,
+                max_steps=self.max_steps,
+                use_daemon=self.use_daemon,
+                on_result=self.result_ready.emit,
+                cancel_event=self.cancel_event
+            )
+            self.done.emit(summary)
+        except Exception as e:
+            self.error.emit(str(e))
+
+    def stop(self):
+        self.cancel_event.set()
@@ -0,0 +1,131 @@
+import os
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
+    QSpinBox, QTableWidget, QTableWidgetItem, QFileDialog, QHeaderView
+)
+from PyQt6.QtCore import Qt
+
+from src.logic.batch_compiler import list_sources, summary_line
+from src.gui.batch_compile_worker import BatchCompileWorker
+
+class BatchCompileDialog(QDialog):
+    """Compile every source in a folder concurrently and show per-file results."""
+
+    COLUMNS = ["File", "Status", "Duration", ".int", ".asm"]
+
+    def __init__(self, compiler_file: str, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Batch Compile")
+        self.resize(750, 450)
+        self.compiler_file = compiler_file
+        self.worker = None
+        self.rows = {}
+
+        layout = QVBoxLayout(self)
+
+        folder_row = QHBoxLayout()
+        self.folder_entry = QLineEdit(readOnly=True)
+        self.folder_entry.setPlaceholderText("Select a folder of source files...")
+        browse_btn = QPushButton("Browse...")
+        browse_btn.clicked.connect(self.browse_folder)
+        folder_row.addWidget(self.folder_entry)
+        folder_row.addWidget(browse_btn)
+        layout.addLayout(folder_row)
+
+        options_row = QHBoxLayout()
+        options_row.addWidget(QLabel("Extension:"))
+        self.extension_entry = QLineEdit()
+        self.extension_entry.setPlaceholderText("any")
+        self.extension_entry.setMaximumWidth(80)
+        options_row.addWidget(self.extension_entry)
+        options_row.addWidget(QLabel("Workers:"))
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 64)
+        self.workers_spin.setValue(os.cpu_count() or 1)
+        options_row.addWidget(self.workers_spin)
+        options_row.addStretch()
+        self.start_btn = QPushButton("Start")
+        self.start_btn.setEnabled(False)
+        self.start_btn.clicked.connect(self.start)
+        self.stop_btn = QPushButton("Stop")
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self.stop)
+        options_row.addWidget(self.start_btn)
+        options_row.addWidget(self.stop_btn)
+        layout.addLayout(options_row)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.summary_label = QLabel("")
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+    def browse_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Source Folder")
+        if folder:
+            self.folder_entry.setText(folder)
+            self.start_btn.setEnabled(True)
+
+    def start(self):
+        sources = list_sources(self.folder_entry.text(), self.extension_entry.text().strip())
+        if not sources:
+            self.summary_label.setText("No source files found.")
+            return
+
+        self.table.setRowCount(len(sources))
+        self.rows = {}
+        for row, source in enumerate(sources):
+            self.rows[source] = row
+            self.table.setItem(row, 0, QTableWidgetItem(os.path.basename(source)))
+            self.table.setItem(row, 1, QTableWidgetItem("queued"))
+            for col in range(2, len(self.COLUMNS)):
+                self.table.setItem(row, col, QTableWidgetItem(""))
+
+        self.summary_label.setText(f"Compiling {len(sources)} file(s)...")
+        self.start_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.worker = BatchCompileWorker(self.compiler_file, sources, self.workers_spin.value())
+        self.worker.result_ready.connect(self.on_result)
+        self.worker.done.connect(self.on_done)
+        self.worker.error.connect(self.on_error)
+        self.worker.start()
+
+    def stop(self):
+        if self.worker:
+            self.worker.stop()
+
+    def on_result(self, result: dict):
+        row = self.rows.get(result["source"])
+        if row is None:
+            return
+        status = result["status"] if result["status"] != "error" else f"error ({result['returncode']})"
+        status_item = QTableWidgetItem(status)
+        status_item.setToolTip((result["stdout"] + result["stderr"]).strip())
+        self.table.setItem(row, 1, status_item)
+        duration = QTableWidgetItem(f"{result['duration'] * 1000:.0f} ms")
+        duration.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        self.table.setItem(row, 2, duration)
+        self.table.setItem(row, 3, QTableWidgetItem(result["artifacts"].get("int", "")))
+        self.table.setItem(row, 4, QTableWidgetItem(result["artifacts"].get("asm", "")))
+
+    def on_done(self, summary: dict):
+        self.summary_label.setText(summary_line(summary))
+        self._finish()
+
+    def on_error(self, message: str):
+        self.summary_label.setText(f"Batch compile failed: {message}")
+        self._finish()
+
+    def _finish(self):
+        self.start_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+
+    def reject(self):
+        if self.worker and self.worker.isRunning():
+            self.worker.stop()
+            self.worker.wait()
+        super().reject()
@@ -0,0 +1,33 @@
+import threading
+from PyQt6.QtCore import QThread, pyqtSignal
+from src.logic.batch_compiler import compile_batch
+
+class BatchCompileWorker(QThread):
+    result_ready = pyqtSignal(dict)
+    done = pyqtSignal(dict)
+    error = pyqtSignal(str)
+
+    def __init__(self, compiler_file: str, sources: list[str], workers: int, extra_args: str = ""):
+        super().__init__()
+        self.compiler_file = compiler_file
+        self.sources = sources
+        self.workers = workers
+        self.extra_args = extra_args
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        try:
+            summary = compile_batch(
+                self.compiler_file,
+                self.sources,
+                workers=self.workers,
+                extra_args=self.extra_args,
+                on_result=self.result_ready.emit,
+                cancel_event=self.cancel_event
+            )
+            self.done.emit(summary)
+        except Exception as e:
+            self.error.emit(str(e))
+
+    def stop(self):
+        self.cancel_event.set()
@@ -1,17 +1,22 @@
 ﻿from PyQt6.QtWidgets import (
-    QWidget, QHBoxLayout, QVBoxLayout, QPushButton, QTextEdit,
-    QLineEdit, QListWidget, QGroupBox
+    QWidget, QHBoxLayout, QVBoxLayout, QPushButton,
+    QLineEdit, QListWidget, QGroupBox, QSpinBox, QCheckBox, QComboBox
 )
 from PyQt6.QtGui import QFont
 from PyQt6.QtCore import Qt
 
+from src.logic.artifact_cache import ArtifactCache
+from src.logic.result_cache import ResultCache
+from src.logic.pipeline import DEFAULT_MAX_STEPS
+from src.gui.watch_mode import toggle_watch_mode
 from src.gui.buttons_handlers import (
     select_compiler_file, select_source_file, update_run_compile_state,
-    run_compiler_action, select_intermediate_file, run_intermediate_action,
-    select_assembly_file, run_assembly_wrapper, select_report_file,
+    run_compiler_action, stop_compile_action, batch_compile_action, test_matrix_action, select_intermediate_file, run_intermediate_action,
+    select_assembly_file, run_assembly_wrapper, warm_rars, asm_batch_action, differential_action, replay_inputs_action, inputs_file_action, select_report_file,
     load_more_files, update_chosen_files_list, open_file_item,
-    remote_turnin, auto_scroll
+    remote_turnin
 )
+from src.gui.output_console import OutputConsole
 
 class ButtonsUI(QWidget):
     def __init__(self):
@@ -23,11 +28,13 @@ class ButtonsUI(QWidget):
         self.file_loader = {}
         self.assembly_executor = None
         self.intermediate_executor = None
+        self.compile_executor = None
+        self.watch_controller = None
+        self.artifact_cache = ArtifactCache()
+        self.result_cache = ResultCache()
 
         # Output box
-        self.output_box = QTextEdit()
-        self.output_box.setReadOnly(True)
-        self.output_box.textChanged.connect(lambda: auto_scroll(self))
+        self.output_box = OutputConsole()
 
         # Main layout
         main_layout = QHBoxLayout(self)
@@ -65,15 +72,41 @@ class ButtonsUI(QWidget):
         src_row.addWidget(src_btn)
         c_layout.addLayout(src_row)
 
-        # Run compiler button
+        # Run / stop compiler buttons
+        self.compile_timeout_spin = QSpinBox()
+        self.compile_timeout_spin.setRange(0, 3600)
+        self.compile_timeout_spin.setValue(60)
+        self.compile_timeout_spin.setSuffix(" s")
+        self.compile_timeout_spin.setSpecialValueText("No timeout")
+        self.compile_timeout_spin.setToolTip("Compilation timeout")
         self.run_compile_button = QPushButton("Run Compiler")
         self.run_compile_button.setEnabled(False)
         self.run_compile_button.clicked.connect(lambda: run_compiler_action(self))
+        self.stop_compile_button = QPushButton("Stop")
+        self.stop_compile_button.setEnabled(False)
+        self.stop_compile_button.clicked.connect(lambda: stop_compile_action(self))
+        self.batch_compile_button = QPushButton("Batch...")
+        self.batch_compile_button.setToolTip("Compile a whole folder of sources")
+        self.batch_compile_button.setEnabled(False)
+        self.batch_compile_button.clicked.connect(lambda: batch_compile_action(self))
+        self.test_matrix_button = QPushButton("Tests...")
+        self.test_matrix_button.setToolTip("Run the source's <name>.tests/ cases on the .int and .asm")
+        self.test_matrix_button.setEnabled(False)
+        self.test_matrix_button.clicked.connect(lambda: test_matrix_action(self))
         run_row = QHBoxLayout()
+        run_row.addWidget(self.compile_timeout_spin)
+        run_row.addWidget(self.batch_compile_button)
+        run_row.addWidget(self.test_matrix_button)
         run_row.addStretch()
         run_row.addWidget(self.run_compile_button)
+        run_row.addWidget(self.stop_compile_button)
         c_layout.addLayout(run_row)
 
+        # Watch mode: recompile and re-run on save
+        self.watch_checkbox = QCheckBox("Watch files (recompile and re-run on save)")
+        self.watch_checkbox.toggled.connect(lambda checked: toggle_watch_mode(self, checked))
+        c_layout.addWidget(self.watch_checkbox)
+
         compiler_box.setLayout(c_layout)
         controls_layout.addWidget(compiler_box)
 
@@ -87,11 +120,33 @@ class ButtonsUI(QWidget):
         self.intermediate_file_entry.setMaximumWidth(220)
         int_btn = QPushButton("Browse .int")
         int_btn.clicked.connect(lambda: select_intermediate_file(self))
+        self.int_backend_combo = QComboBox()
+        self.int_backend_combo.addItems(["gcc", "Fork server", "Interpreter"])
+        self.int_backend_combo.setToolTip(
+            "Run via C and gcc, via gcc with a fork server kept up between runs, or interpret the quads directly"
+        )
+        self.int_optimize_checkbox = QCheckBox("Optimize")
+        self.int_optimize_checkbox.setToolTip(
+            "Fold constants, propagate copies and drop dead quads before emitting C (gcc only)"
+        )
+        self.int_profile_checkbox = QCheckBox("Profile")
+        self.int_profile_checkbox.setToolTip("Count how often each quad runs and list the hottest .int lines (gcc only)")
         self.run_intermediate_button = QPushButton("Run")
         self.run_intermediate_button.clicked.connect(lambda: run_intermediate_action(self))
+        self.replay_intermediate_button = QPushButton("Replay")
+        self.replay_intermediate_button.setToolTip("Run again with the last inputs")
+        self.replay_intermediate_button.clicked.connect(lambda: replay_inputs_action(self, 'intermediate'))
+        int_inputs_btn = QPushButton("Inputs file…")
+        int_inputs_btn.setToolTip("Run with input values read from a file")
+        int_inputs_btn.clicked.connect(lambda: inputs_file_action(self, 'intermediate'))
         i_layout.addWidget(self.intermediate_file_entry)
         i_layout.addWidget(int_btn)
+        i_layout.addWidget(self.int_backend_combo)
+        i_layout.addWidget(self.int_optimize_checkbox)
+        i_layout.addWidget(self.int_profile_checkbox)
         i_layout.addWidget(self.run_intermediate_button)
+        i_layout.addWidget(self.replay_intermediate_button)
+        i_layout.addWidget(int_inputs_btn)
         self.inter_box.setLayout(i_layout)
         self.inter_box.setVisible(False)
         controls_layout.addWidget(self.inter_box)
@@ -106,15 +161,77 @@ class ButtonsUI(QWidget):
         self.assembly_file_entry.setMaximumWidth(220)
         asm_btn = QPushButton("Browse .asm")
         asm_btn.clicked.connect(lambda: select_assembly_file(self))
+        self.asm_backend_combo = QComboBox()
+        self.asm_backend_combo.addItems(["RARS", "Simulator"])
+        self.asm_backend_combo.setToolTip("Run under RARS, or with the built-in RV32IM simulator (no Java needed)")
+        self.asm_backend_combo.currentTextChanged.connect(lambda _: warm_rars(self))
+        self.warm_rars_checkbox = QCheckBox("Warm RARS")
+        self.warm_rars_checkbox.setChecked(True)
+        self.warm_rars_checkbox.setToolTip(
+            "Run on a RARS JVM kept running between runs (falls back to a fresh RARS if it cannot start).\n"
+            "Output appears when the program ends, and runs with a CPU or output limit\n"
+            "always use a fresh RARS, which enforces them"
+        )
         self.run_asm_button = QPushButton("Run")
         self.run_asm_button.clicked.connect(lambda: run_assembly_wrapper(self))
+        self.replay_asm_button = QPushButton("Replay")
+        self.replay_asm_button.setToolTip("Run again with the last inputs")
+        self.replay_asm_button.clicked.connect(lambda: replay_inputs_action(self, 'assembly'))
+        asm_inputs_btn = QPushButton("Inputs file…")
+        asm_inputs_btn.setToolTip("Run with input values read from a file")
+        asm_inputs_btn.clicked.connect(lambda: inputs_file_action(self, 'assembly'))
+        asm_batch_btn = QPushButton("Batch...")
+        asm_batch_btn.setToolTip("Run a folder of .asm test cases in parallel")
+        asm_batch_btn.clicked.connect(lambda: asm_batch_action(self))
+        diff_btn = QPushButton("Differential...")
+        diff_btn.setToolTip("Run the .int and .asm on the same inputs and show where their outputs diverge")
+        diff_btn.clicked.connect(lambda: differential_action(self))
         a_layout.addWidget(self.assembly_file_entry)
         a_layout.addWidget(asm_btn)
+        a_layout.addWidget(self.asm_backend_combo)
+        a_layout.addWidget(self.warm_rars_checkbox)
         a_layout.addWidget(self.run_asm_button)
+        a_layout.addWidget(self.replay_asm_button)
+        a_layout.addWidget(asm_inputs_btn)
+        a_layout.addWidget(asm_batch_btn)
+        a_layout.addWidget(diff_btn)
         self.asm_box.setLayout(a_layout)
         self.asm_box.setVisible(False)
         controls_layout.addWidget(self.asm_box)
 
+        # --- Run Limits group (0 = no limit) ---
+        limits_box = QGroupBox("Run Limits")
+        limits_box.setAlignment(Qt.AlignmentFlag.AlignHCenter)
+        l_layout = QHBoxLayout()
+        l_layout.setContentsMargins(5, 5, 5, 5)
+        l_layout.setSpacing(4)
+
+        def limit_spin(maximum, value, suffix, tooltip):
+            spin = QSpinBox()
+            spin.setRange(0, maximum)
+            spin.setValue(value)
+            spin.setSuffix(suffix)
+            spin.setSpecialValueText("No limit")
+            spin.setToolTip(tooltip)
+            l_layout.addWidget(spin)
+            return spin
+
+        self.cpu_limit_spin = limit_spin(3600, 5, " s CPU", "CPU time limit")
+        self.wall_limit_spin = limit_spin(3600, 10, " s wall", "Wall-clock time limit")
+        self.memory_limit_spin = limit_spin(65536, 512, " MB", "Address-space limit (C programs only)")
+        self.output_limit_spin = limit_spin(4096, 10, " MB out", "Output size limit")
+        self.step_limit_spin = limit_spin(
+            2_000_000_000, DEFAULT_MAX_STEPS, " steps", "Instruction budget (assembly only; wall time is a backstop)"
+        )
+        self.result_cache_checkbox = QCheckBox("Cache results")
+        self.result_cache_checkbox.setToolTip(
+            "Replay the saved output of an earlier run of the same program with the same inputs and limits "
+            "(gcc and assembly runs; programs marked nondeterministic or using time/random syscalls always run)"
+        )
+        l_layout.addWidget(self.result_cache_checkbox)
+        limits_box.setLayout(l_layout)
+        controls_layout.addWidget(limits_box)
+
         # --- Report File group ---
         report_box = QGroupBox("Report File")
         report_box.setAlignment(Qt.AlignmentFlag.AlignHCenter)
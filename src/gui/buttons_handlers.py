@@ -3,15 +3,21 @@ from PyQt6.QtWidgets import (
     QFileDialog, QListWidgetItem, QDialog, QPlainTextEdit, QInputDialog,
     QMessageBox, QVBoxLayout, QProgressDialog
 )
-from PyQt6.QtGui import QTextCursor, QDesktopServices
+from PyQt6.QtGui import QDesktopServices
 from PyQt6.QtCore import Qt, QUrl
 
 from src.logic.runner import (
-    run_compiler, run_intermediate_code, run_assembly_code
+    run_compiler, run_intermediate_code, run_intermediate_interpreted, run_assembly_code, input_history
 )
-from src.gui.file_loader import FileLoader
+from src.logic.pipeline import read_inputs_file
+from src.logic.limited_exec import Limits
+from src.logic.rars_daemon import get_daemon
 from src.gui.confirm_submission_dialog import ConfirmSubmissionDialog
 from src.gui.remote_transfer_dialog import RemoteTransferDialog
+from src.gui.batch_compile_dialog import BatchCompileDialog
+from src.gui.asm_batch_dialog import AsmBatchDialog
+from src.gui.differential_dialog import DifferentialDialog
+from src.gui.test_matrix_dialog import TestMatrixDialog
 from src.gui.host_list_worker import HostListWorker
 from src.gui.turnin_worker import TurninWorker
 from src.logic.submit_files import get_online_lab_hosts, execute_remote_turnin
@@ -28,6 +34,8 @@ def select_compiler_file(ui):
         ui.compiler_entry.setText(os.path.basename(path))
         update_run_compile_state(ui)
         update_chosen_files_list(ui)
+        if ui.watch_controller is not None:
+            ui.watch_controller.refresh_paths()
 
 
 def select_source_file(ui):
@@ -42,42 +50,91 @@ def select_source_file(ui):
         ui.source_entry.setText(os.path.basename(path))
         update_run_compile_state(ui)
         update_chosen_files_list(ui)
+        if ui.watch_controller is not None:
+            ui.watch_controller.refresh_paths()
 
 
 def update_run_compile_state(ui):
+    ui.batch_compile_button.setEnabled(bool(ui.file_loader.get('compiler')))
+    ui.test_matrix_button.setEnabled(bool(ui.file_loader.get('compiler')) and bool(ui.file_loader.get('source')))
     ui.run_compile_button.setEnabled(
         bool(ui.file_loader.get('compiler')) and bool(ui.file_loader.get('source'))
+        and ui.compile_executor is None
     )
 
 
 def run_compiler_action(ui):
-    run_compiler(
+    if ui.compile_executor is not None:
+        return None
+    ui.compile_executor = run_compiler(
         ui.file_loader.get('compiler', ''),
         ui.file_loader.get('source', ''),
-        ui.output_box
+        ui.output_box,
+        cache=ui.artifact_cache,
+        timeout=ui.compile_timeout_spin.value() or None
     )
-    try:
-        defaults = FileLoader.load_default_files(
-            ui.file_loader.get('source', '')
-        )
-    except Exception as e:
-        ui.output_box.append(f"Error: {e}")
+    ui.compile_executor.finished.connect(lambda: on_compile_finished(ui))
+    ui.run_compile_button.setEnabled(False)
+    ui.stop_compile_button.setEnabled(True)
+    ui.compile_executor.start()
+    return ui.compile_executor
+
+
+def stop_compile_action(ui):
+    if ui.compile_executor is not None:
+        ui.compile_executor.stop()
+
+
+def on_compile_finished(ui):
+    result = ui.compile_executor.result
+    ui.compile_executor = None
+    ui.stop_compile_button.setEnabled(False)
+    update_run_compile_state(ui)
+    if result is None or result['status'] in ('timeout', 'cancelled'):
         return
-    if defaults.get('int'):
-        ui.file_loader['intermediate'] = defaults['int']
+    show_compiled_artifacts(ui, result['artifacts'])
+
+
+def show_compiled_artifacts(ui, artifacts):
+    if artifacts.get('int'):
+        ui.file_loader['intermediate'] = artifacts['int']
         ui.intermediate_file_entry.setText(
-            os.path.basename(defaults['int'])
+            os.path.basename(artifacts['int'])
         )
         ui.inter_box.setVisible(True)
-    if defaults.get('asm'):
-        ui.file_loader['assembly'] = defaults['asm']
+    if artifacts.get('asm'):
+        ui.file_loader['assembly'] = artifacts['asm']
         ui.assembly_file_entry.setText(
-            os.path.basename(defaults['asm'])
+            os.path.basename(artifacts['asm'])
         )
         ui.asm_box.setVisible(True)
+        warm_rars(ui)
     update_chosen_files_list(ui)
 
 
+def batch_compile_action(ui):
+    compiler = ui.file_loader.get('compiler')
+    if not compiler:
+        ui.output_box.append("Select a compiler first.")
+        return
+    dlg = BatchCompileDialog(compiler, ui)
+    dlg.exec()
+
+
+def test_matrix_action(ui):
+    dlg = TestMatrixDialog(
+        ui.file_loader['compiler'],
+        ui.file_loader['source'],
+        cache=ui.artifact_cache,
+        limits=run_limits(ui),
+        max_steps=ui.step_limit_spin.value(),
+        backend="python" if ui.asm_backend_combo.currentText() == "Simulator" else "rars",
+        use_daemon=ui.warm_rars_checkbox.isChecked(),
+        parent=ui
+    )
+    dlg.exec()
+
+
 def select_intermediate_file(ui):
     path, _ = QFileDialog.getOpenFileName(
         ui,
@@ -91,13 +148,87 @@ def select_intermediate_file(ui):
         update_chosen_files_list(ui)
 
 
-def run_intermediate_action(ui):
+def run_limits(ui):
+    """The Run Limits spin boxes as a Limits (0 means no limit)."""
+    mb = 1024 * 1024
+    return Limits(
+        cpu=ui.cpu_limit_spin.value() or None,
+        memory=ui.memory_limit_spin.value() * mb or None,
+        output=ui.output_limit_spin.value() * mb or None,
+        wall=ui.wall_limit_spin.value() or None,
+    )
+
+
+def run_result_cache(ui):
+    """The result cache when "Cache results" is ticked, else None."""
+    return ui.result_cache if ui.result_cache_checkbox.isChecked() else None
+
+
+def run_intermediate_action(ui, inputs=None):
+    if ui.int_backend_combo.currentText() == "Interpreter":
+        ui.intermediate_executor = run_intermediate_interpreted(
+            ui.file_loader.get('intermediate', ''),
+            ui.output_box,
+            inputs=inputs,
+            limits=run_limits(ui)
+        )
+        return
     ui.intermediate_executor = run_intermediate_code(
         ui.file_loader.get('intermediate', ''),
-        ui.output_box
+        ui.output_box,
+        optimize=ui.int_optimize_checkbox.isChecked(),
+        profile=ui.int_profile_checkbox.isChecked(),
+        inputs=inputs,
+        limits=run_limits(ui),
+        fork_server=ui.int_backend_combo.currentText() == "Fork server",
+        result_cache=run_result_cache(ui)
     )
 
 
+def _program_path(ui, kind):
+    """The file whose inputs are remembered for the 'intermediate' or 'assembly' stage."""
+    path = ui.file_loader.get(kind, '')
+    if path and kind == 'intermediate':
+        # The gcc path always runs <base>.int, whichever file was picked.
+        path = os.path.splitext(path)[0] + ".int"
+    return path
+
+
+def _run_stage(ui, kind, inputs):
+    if kind == 'intermediate':
+        run_intermediate_action(ui, inputs)
+    else:
+        run_assembly_wrapper(ui, inputs)
+
+
+def replay_inputs_action(ui, kind, ask_if_missing=False):
+    """Run the stage again with the inputs its program was last run with."""
+    path = _program_path(ui, kind)
+    inputs = input_history.get(path) if path else None
+    if inputs is None and not ask_if_missing:
+        ui.output_box.append("No previous inputs to replay for this program.")
+        return
+    _run_stage(ui, kind, inputs)
+
+
+def inputs_file_action(ui, kind):
+    """Run the stage with input values read from a file."""
+    path, _ = QFileDialog.getOpenFileName(
+        ui,
+        "Select Inputs File",
+        "",
+        "Text Files (*.txt *.in);;All Files (*)"
+    )
+    if not path:
+        return
+    try:
+        inputs = read_inputs_file(path)
+    except OSError as e:
+        ui.output_box.append(f"Error reading inputs file '{path}': {e}")
+        return
+    _run_stage(ui, kind, inputs)
+
+
 def select_assembly_file(ui):
     path, _ = QFileDialog.getOpenFileName(
         ui,
@@ -109,15 +240,53 @@ def select_assembly_file(ui):
         ui.file_loader['assembly'] = path
         ui.assembly_file_entry.setText(os.path.basename(path))
         update_chosen_files_list(ui)
+        warm_rars(ui)
+
+
+def warm_rars(ui):
+    """Start the warm RARS host in the background so the first run does not wait for the JVM."""
+    if ui.warm_rars_checkbox.isChecked() and ui.asm_backend_combo.currentText() == "RARS":
+        get_daemon().start_async()
 
 
-def run_assembly_wrapper(ui):
+def run_assembly_wrapper(ui, inputs=None):
     ui.assembly_executor = run_assembly_code(
         ui.file_loader.get('assembly', ''),
-        ui.output_box
+        ui.output_box,
+        inputs=inputs,
+        limits=run_limits(ui),
+        daemon=get_daemon() if ui.warm_rars_checkbox.isChecked() else None,
+        max_steps=ui.step_limit_spin.value(),
+        backend="python" if ui.asm_backend_combo.currentText() == "Simulator" else "rars",
+        result_cache=run_result_cache(ui)
     )
 
 
+def asm_batch_action(ui):
+    dlg = AsmBatchDialog(
+        limits=run_limits(ui),
+        max_steps=ui.step_limit_spin.value(),
+        backend="python" if ui.asm_backend_combo.currentText() == "Simulator" else "rars",
+        use_daemon=ui.warm_rars_checkbox.isChecked(),
+        parent=ui
+    )
+    dlg.exec()
+
+
+def differential_action(ui):
+    dlg = DifferentialDialog(
+        int_file=ui.file_loader.get('intermediate'),
+        asm_file=ui.file_loader.get('assembly'),
+        compiler_file=ui.file_loader.get('compiler'),
+        limits=run_limits(ui),
+        max_steps=ui.step_limit_spin.value(),
+        backend="python" if ui.asm_backend_combo.currentText() == "Simulator" else "rars",
+        daemon=get_daemon() if ui.warm_rars_checkbox.isChecked() else None,
+        parent=ui
+    )
+    dlg.exec()
+
+
 def select_report_file(ui):
     path, _ = QFileDialog.getOpenFileName(
         ui,
@@ -272,9 +441,3 @@ def remote_turnin(ui):
     ui.host_thread.hosts_ready.connect(on_hosts)
     ui.host_thread.error.connect(on_hosts_error)
     ui.host_thread.start()
-
-def auto_scroll(ui):
-    cursor = ui.output_box.textCursor()
-    cursor.movePosition(QTextCursor.MoveOperation.End)
-    ui.output_box.setTextCursor(cursor)
-    ui.output_box.ensureCursorVisible()
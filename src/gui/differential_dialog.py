@@ -0,0 +1,194 @@
+import os
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QPlainTextEdit,
+    QSpinBox, QComboBox, QTableWidget, QTableWidgetItem, QFileDialog, QHeaderView
+)
+from PyQt6.QtCore import Qt
+
+from src.logic.batch_compiler import list_sources
+from src.logic.differential import summary_line
+from src.gui.differential_worker import DifferentialWorker
+
+class DifferentialDialog(QDialog):
+    """Run the .int and .asm of a program (or of a folder of sources) on the same inputs and show where they diverge."""
+
+    COLUMNS = ["Case", "Outcome", ".int time", ".asm time", "First divergence"]
+
+    def __init__(self, int_file=None, asm_file=None, compiler_file=None, limits=None, max_steps=0,
+                 backend="rars", daemon=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Differential Run")
+        self.resize(900, 500)
+        self.int_file = int_file
+        self.asm_file = asm_file
+        self.compiler_file = compiler_file
+        self.limits = limits
+        self.max_steps = max_steps
+        self.daemon = daemon
+        self.worker = None
+
+        layout = QVBoxLayout(self)
+
+        mode_row = QHBoxLayout()
+        mode_row.addWidget(QLabel("Compare:"))
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(["Current program", "Folder of sources"])
+        self.mode_combo.currentIndexChanged.connect(self.update_mode)
+        mode_row.addWidget(self.mode_combo)
+        self.program_label = QLabel(
+            f"{os.path.basename(int_file or '?')} vs {os.path.basename(asm_file or '?')}"
+        )
+        mode_row.addWidget(self.program_label)
+        mode_row.addStretch()
+        layout.addLayout(mode_row)
+
+        self.vectors_box = QPlainTextEdit()
+        self.vectors_box.setPlaceholderText("Input vectors, one per line (whitespace-separated values)")
+        self.vectors_box.setMaximumHeight(90)
+        layout.addWidget(self.vectors_box)
+
+        folder_row = QHBoxLayout()
+        self.folder_entry = QLineEdit(readOnly=True)
+        self.folder_entry.setPlaceholderText("Select a folder of sources (with optional <name>.in vectors)...")
+        self.browse_btn = QPushButton("Browse...")
+        self.browse_btn.clicked.connect(self.browse_folder)
+        self.extension_entry = QLineEdit()
+        self.extension_entry.setPlaceholderText("any")
+        self.extension_entry.setMaximumWidth(80)
+        folder_row.addWidget(self.folder_entry)
+        folder_row.addWidget(QLabel("Extension:"))
+        folder_row.addWidget(self.extension_entry)
+        folder_row.addWidget(self.browse_btn)
+        layout.addLayout(folder_row)
+
+        options_row = QHBoxLayout()
+        options_row.addWidget(QLabel("Backend:"))
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItems(["RARS", "Simulator"])
+        self.backend_combo.setCurrentText("Simulator" if backend == "python" else "RARS")
+        options_row.addWidget(self.backend_combo)
+        options_row.addWidget(QLabel("Workers:"))
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 64)
+        self.workers_spin.setValue(os.cpu_count() or 1)
+        options_row.addWidget(self.workers_spin)
+        options_row.addStretch()
+        self.start_btn = QPushButton("Start")
+        self.start_btn.clicked.connect(self.start)
+        self.stop_btn = QPushButton("Stop")
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self.stop)
+        options_row.addWidget(self.start_btn)
+        options_row.addWidget(self.stop_btn)
+        layout.addLayout(options_row)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.summary_label = QLabel("")
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+        if not (int_file and asm_file) and compiler_file:
+            self.mode_combo.setCurrentIndex(1)
+        self.update_mode()
+
+    def corpus_mode(self):
+        return self.mode_combo.currentIndex() == 1
+
+    def update_mode(self):
+        corpus = self.corpus_mode()
+        self.vectors_box.setVisible(not corpus)
+        self.program_label.setVisible(not corpus)
+        for widget in (self.folder_entry, self.extension_entry, self.browse_btn, self.workers_spin):
+            widget.setEnabled(corpus)
+        if corpus:
+            self.start_btn.setEnabled(bool(self.compiler_file and self.folder_entry.text()))
+        else:
+            self.start_btn.setEnabled(bool(self.int_file and self.asm_file))
+
+    def browse_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Source Folder")
+        if folder:
+            self.folder_entry.setText(folder)
+            self.update_mode()
+
+    def start(self):
+        backend = "python" if self.backend_combo.currentText() == "Simulator" else "rars"
+        if self.corpus_mode():
+            sources = list_sources(self.folder_entry.text(), self.extension_entry.text().strip())
+            if not sources:
+                self.summary_label.setText("No source files found.")
+                return
+            self.worker = DifferentialWorker(
+                compiler_file=self.compiler_file,
+                sources=sources,
+                workers=self.workers_spin.value(),
+                backend=backend,
+                limits=self.limits,
+                max_steps=self.max_steps,
+                # Each thread starts its own host; the shared one only says warm RARS is wanted.
+                daemon=self.daemon if backend == "rars" else None
+            )
+            self.summary_label.setText(f"Compiling and comparing {len(sources)} source(s)...")
+        else:
+            vectors = [line.split() for line in self.vectors_box.toPlainText().splitlines() if line.strip()]
+            self.worker = DifferentialWorker(
+                int_file=self.int_file,
+                asm_file=self.asm_file,
+                vectors=vectors or [[]],
+                backend=backend,
+                limits=self.limits,
+                max_steps=self.max_steps,
+                daemon=self.daemon if backend == "rars" else None
+            )
+            self.summary_label.setText(f"Comparing {len(vectors or [[]])} vector(s)...")
+
+        self.table.setRowCount(0)
+        self.start_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.worker.result_ready.connect(self.on_result)
+        self.worker.done.connect(self.on_done)
+        self.worker.error.connect(self.on_error)
+        self.worker.start()
+
+    def stop(self):
+        if self.worker:
+            self.worker.stop()
+
+    def on_result(self, case: dict):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        name = QTableWidgetItem(case["name"])
+        name.setToolTip("Inputs: " + (" ".join(case["inputs"]) or "(none)"))
+        self.table.setItem(row, 0, name)
+        self.table.setItem(row, 1, QTableWidgetItem(case["outcome"]))
+        for col, key in ((2, "int"), (3, "asm")):
+            run = case[key]
+            item = QTableWidgetItem(f"{run['duration'] * 1000:.0f} ms" if run else "")
+            item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            if run:
+                item.setToolTip(run["stdout"].strip())
+            self.table.setItem(row, col, item)
+        self.table.setItem(row, 4, QTableWidgetItem(case["detail"]))
+
+    def on_done(self, summary: dict):
+        self.summary_label.setText(summary_line(summary))
+        self._finish()
+
+    def on_error(self, message: str):
+        self.summary_label.setText(f"Differential run failed: {message}")
+        self._finish()
+
+    def _finish(self):
+        self.stop_btn.setEnabled(False)
+        self.update_mode()
+
+    def reject(self):
+        if self.worker and self.worker.isRunning():
+            self.worker.stop()
+            self.worker.wait()
+        super().reject()
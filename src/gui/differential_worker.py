@@ -0,0 +1,60 @@
+import threading
+import time
+from PyQt6.QtCore import QThread, pyqtSignal
+from src.logic.differential import diff_program, diff_corpus, summarize
+
+class DifferentialWorker(QThread):
+    result_ready = pyqtSignal(dict)
+    done = pyqtSignal(dict)
+    error = pyqtSignal(str)
+
+    def __init__(self, int_file: str = None, asm_file: str = None, vectors: list = None,
+                 compiler_file: str = None, sources: list = None, workers: int = None,
+                 backend: str = "rars", limits=None, max_steps: int = 0, daemon=None):
+        super().__init__()
+        self.int_file = int_file
+        self.asm_file = asm_file
+        self.vectors = vectors
+        self.compiler_file = compiler_file
+        self.sources = sources
+        self.workers = workers
+        self.backend = backend
+        self.limits = limits
+        self.max_steps = max_steps
+        self.daemon = daemon
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        try:
+            if self.sources is not None:
+                summary = diff_corpus(
+                    self.compiler_file,
+                    self.sources,
+                    workers=self.workers,
+                    limits=self.limits,
+                    max_steps=self.max_steps,
+                    asm_backend=self.backend,
+                    use_daemon=self.daemon is not None,
+                    on_result=self.result_ready.emit,
+                    cancel_event=self.cancel_event
+                )
+            else:
+                start = time.perf_counter()
+                cases = diff_program(
+                    self.int_file,
+                    self.asm_file,
+                    self.vectors,
+                    limits=self.limits,
+                    max_steps=self.max_steps,
+                    asm_backend=self.backend,
+                    daemon=self.daemon,
+                    on_result=self.result_ready.emit,
+                    cancel_event=self.cancel_event
+                )
+                summary = summarize(cases, 1, 1, time.perf_counter() - start)
+            self.done.emit(summary)
+        except Exception as e:
+            self.error.emit(str(e))
+
+    def stop(self):
+        self.cancel_event.set()
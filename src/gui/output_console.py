@@ -0,0 +1,130 @@
+import os
+import time
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QPlainTextEdit, QLabel
+from PyQt6.QtGui import QTextCursor
+from PyQt6.QtCore import QTimer
+from src.logic.limited_exec import format_bytes
+
+# Flushes per second while output is pending.
+FRAME_RATE = 30
+# Lines kept in the widget; older ones are dropped (the log file keeps everything).
+MAX_LINES = 5000
+
+class OutputConsole(QWidget):
+    """
+    Output pane for program output of any volume.
+
+    Text written with write() (raw stream chunks) or append() (one message per
+    paragraph, like QTextEdit.append) is queued and inserted FRAME_RATE times
+    a second in one edit, so a program printing in a tight loop costs one
+    repaint per frame instead of one per chunk. Only the last max_lines lines
+    are kept on screen; the full output goes to log_path. A status line shows
+    the incoming rate in bytes per second.
+    """
+
+    def __init__(self, log_path=os.path.join(".cache", "console.log"), max_lines=MAX_LINES, parent=None):
+        super().__init__(parent)
+        self.max_lines = max_lines
+        self.log_path = log_path
+        self.log_file = None
+        try:
+            os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+            self.log_file = open(log_path, "w", encoding="utf-8")
+        except OSError:
+            pass
+
+        self.pending = []
+        self.at_line_start = True
+        self.bytes_in = 0
+        self.rate_bytes = 0
+        self.rate_since = time.monotonic()
+
+        self.view = QPlainTextEdit()
+        self.view.setReadOnly(True)
+        self.view.setMaximumBlockCount(max_lines)
+        self.status_label = QLabel()
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.view)
+        layout.addWidget(self.status_label)
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(1000 // FRAME_RATE)
+        self.flush_timer.timeout.connect(self.flush)
+        self.rate_timer = QTimer(self)
+        self.rate_timer.setInterval(1000)
+        self.rate_timer.timeout.connect(self.update_status)
+        self.rate_timer.start()
+        self.update_status()
+
+    def write(self, text):
+        """Queue a raw chunk of output, shown exactly as given."""
+        if not text:
+            return
+        self.pending.append(text)
+        size = len(text.encode("utf-8", "replace"))
+        self.bytes_in += size
+        self.rate_bytes += size
+        self.at_line_start = text.endswith("\n")
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def append(self, text):
+        """Queue text as a paragraph of its own."""
+        self.write(("" if self.at_line_start else "\n") + text + "\n")
+
+    def flush(self):
+        """Insert everything queued since the last frame."""
+        self.flush_timer.stop()
+        if not self.pending:
+            return
+        text = self._take_pending()
+
+        # Lines that would be dropped again right away are never inserted.
+        if text.count("\n") > self.max_lines:
+            cut = len(text)
+            for _ in range(self.max_lines + 1):
+                cut = text.rfind("\n", 0, cut)
+            text = text[cut + 1:]
+
+        scrollbar = self.view.verticalScrollBar()
+        follow = scrollbar.value() >= scrollbar.maximum() - 4
+        cursor = QTextCursor(self.view.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+        if follow:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def _take_pending(self):
+        """Join the queued chunks, writing them to the log file."""
+        text = "".join(self.pending)
+        self.pending = []
+        if self.log_file is not None:
+            self.log_file.write(text)
+            self.log_file.flush()
+        return text
+
+    def update_status(self):
+        now = time.monotonic()
+        rate = self.rate_bytes / max(now - self.rate_since, 1e-6)
+        self.rate_bytes, self.rate_since = 0, now
+        self.status_label.setText(
+            f"{format_bytes(rate)}/s · {format_bytes(self.bytes_in)} total · "
+            f"last {self.max_lines} lines shown, full log in {self.log_path}"
+        )
+
+    def clear(self):
+        """Clear the screen (the log file keeps the earlier output)."""
+        self._take_pending()
+        self.at_line_start = True
+        self.view.clear()
+
+    def setPlainText(self, text):
+        self.clear()
+        self.write(text)
+
+    def toPlainText(self):
+        self.flush()
+        return self.view.toPlainText()
+
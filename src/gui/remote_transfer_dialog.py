@@ -1,8 +1,5 @@
-import socket
-import time
 import logging
 import paramiko
-from paramiko import SSHClient, AutoAddPolicy, Transport
 from paramiko.ssh_exception import BadAuthenticationType, SSHException, AuthenticationException
 from PyQt6.QtCore import QThread, pyqtSignal
 from PyQt6.QtWidgets import (
@@ -10,6 +7,8 @@ from PyQt6.QtWidgets import (
     QDialogButtonBox, QMessageBox
 )
 
+from src.logic.ssh_session import SERVER, get_session
+
 # enable debug logging for Paramiko
 paramiko.util.log_to_file("paramiko.log", level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -25,87 +24,29 @@ class AuthWorker(QThread):
         self.password = password
 
     def run(self):
-        # Try password auth first
-        fallback = False
-        for attempt in range(1, 4):
-            ssh = SSHClient()
-            ssh.set_missing_host_key_policy(AutoAddPolicy())
-            try:
-                ssh.connect(
-                    self.server,
-                    username=self.username,
-                    password=self.password,
-                    timeout=10,
-                    allow_agent=False,
-                    look_for_keys=False,
-                    banner_timeout=10,
-                    auth_timeout=10
-                )
-                stdin, stdout, _ = ssh.exec_command("whoami")
-                result = stdout.read().decode().strip().lower()
-                if result == self.username.lower():
-                    self.success.emit((self.username, self.password))
-                    return
-                else:
-                    self.failure.emit("Authenticated but unable to verify user.")
-                    return
-            except BadAuthenticationType as e:
-                if "keyboard-interactive" in e.allowed_types:
-                    fallback = True
-                    break
-                self.failure.emit("No supported auth methods.")
-                return
-            except AuthenticationException:
-                self.failure.emit("Invalid username or password.")
-                return
-            except SSHException as e:
-                if "No existing session" in str(e):
-                    fallback = True
-                    break
-                logger.error("SSH error during password auth: %s", e)
-                self.failure.emit(f"SSH error: {e}")
-                return
-            finally:
-                ssh.close()
-            time.sleep(2)
-
-        if not fallback:
-            self.failure.emit("Authentication methods not supported.")
+        # Authenticates the shared session, which the host lookup and turnin then reuse.
+        session = get_session(self.username, self.password, self.server)
+        try:
+            result = session.exec("whoami").strip().lower()
+        except BadAuthenticationType:
+            self.failure.emit("No supported auth methods.")
             return
-
-        # Keyboard-interactive fallback
-        for attempt in range(1, 4):
-            sock = None
-            transport = None
-            try:
-                sock = socket.create_connection((self.server, 22), timeout=10)
-                transport = Transport(sock)
-                transport.start_client(timeout=10)
-                transport.auth_interactive(
-                    self.username,
-                    lambda title, instr, prompts: [self.password] * len(prompts)
-                )
-                chan = transport.open_session()
-                chan.exec_command("whoami")
-                out = chan.recv(1024).decode().strip().lower()
-                if out == self.username.lower():
-                    self.success.emit((self.username, self.password))
-                    return
-            except SSHException as e:
-                logger.warning("Interactive auth attempt %d failed: %s", attempt, e)
-                time.sleep(2)
-            finally:
-                if transport:
-                    transport.close()
-                if sock:
-                    sock.close()
-
-        self.failure.emit("Keyboard-interactive authentication failed.")
+        except AuthenticationException:
+            self.failure.emit("Invalid username or password.")
+            return
+        except (SSHException, OSError, EOFError) as e:
+            logger.error("SSH error during authentication: %s", e)
+            self.failure.emit(f"SSH error: {e}")
+            return
+        if result == self.username.lower():
+            self.success.emit((self.username, self.password))
+        else:
+            self.failure.emit("Authenticated but unable to verify user.")
 
 class RemoteTransferDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.server = "scylla.cs.uoi.gr"
+        self.server = SERVER
         self.setWindowTitle("Remote File Transfer Login")
         self.setObjectName("remoteTransferDialog")
 
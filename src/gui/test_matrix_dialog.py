@@ -0,0 +1,149 @@
+import os
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QSpinBox, QComboBox, QTableWidget, QTableWidgetItem, QHeaderView
+)
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor
+
+from src.logic.test_matrix import BACKENDS, list_cases, tests_dir, summary_line
+from src.gui.test_matrix_worker import TestMatrixWorker
+
+class TestMatrixDialog(QDialog):
+    """Compile the source once and run its golden cases on both backends, filling in a pass/fail grid."""
+
+    COLUMNS = ["Case", ".int", ".int time", ".asm", ".asm time", "Detail"]
+    COLORS = {"pass": QColor("#c8e6c9"), "fail": QColor("#ffcdd2"), "error": QColor("#ffe0b2"),
+              "timeout": QColor("#ffe0b2")}
+
+    def __init__(self, compiler_file, source, cache=None, limits=None, max_steps=0, backend="rars", use_daemon=True,
+                 parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Test Matrix")
+        self.resize(850, 450)
+        self.compiler_file = compiler_file
+        self.source = source
+        self.cache = cache
+        self.limits = limits
+        self.max_steps = max_steps
+        self.use_daemon = use_daemon
+        self.worker = None
+        self.rows = {}
+        self.details = {}
+
+        layout = QVBoxLayout(self)
+        self.cases = list_cases(tests_dir(source))
+        layout.addWidget(QLabel(
+            f"{len(self.cases)} case(s) in {os.path.basename(tests_dir(source))}/ "
+            "(<case>.in with the expected <case>.out)"
+        ))
+
+        options_row = QHBoxLayout()
+        options_row.addWidget(QLabel("Assembly backend:"))
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItems(["RARS", "Simulator"])
+        self.backend_combo.setCurrentText("Simulator" if backend == "python" else "RARS")
+        options_row.addWidget(self.backend_combo)
+        options_row.addWidget(QLabel("Workers:"))
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 64)
+        self.workers_spin.setValue(os.cpu_count() or 1)
+        options_row.addWidget(self.workers_spin)
+        options_row.addStretch()
+        self.start_btn = QPushButton("Start")
+        self.start_btn.setEnabled(bool(self.cases))
+        self.start_btn.clicked.connect(self.start)
+        self.stop_btn = QPushButton("Stop")
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self.stop)
+        options_row.addWidget(self.start_btn)
+        options_row.addWidget(self.stop_btn)
+        layout.addLayout(options_row)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(5, QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.summary_label = QLabel("" if self.cases else f"No cases found in {tests_dir(source)}.")
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+    def start(self):
+        self.table.setRowCount(len(self.cases))
+        self.rows = {}
+        self.details = {}
+        for row, case in enumerate(self.cases):
+            self.rows[case["name"]] = row
+            name = QTableWidgetItem(case["name"])
+            name.setToolTip("Inputs: " + (" ".join(case["inputs"]) or "(none)"))
+            self.table.setItem(row, 0, name)
+            for col in range(1, len(self.COLUMNS)):
+                self.table.setItem(row, col, QTableWidgetItem("queued" if col in (1, 3) else ""))
+
+        self.summary_label.setText(f"Compiling, then running {len(self.cases)} case(s) on {len(BACKENDS)} backends...")
+        self.start_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.worker = TestMatrixWorker(
+            self.compiler_file,
+            self.source,
+            self.workers_spin.value(),
+            backend="python" if self.backend_combo.currentText() == "Simulator" else "rars",
+            cache=self.cache,
+            limits=self.limits,
+            max_steps=self.max_steps,
+            use_daemon=self.use_daemon
+        )
+        self.worker.result_ready.connect(self.on_result)
+        self.worker.done.connect(self.on_done)
+        self.worker.error.connect(self.on_error)
+        self.worker.start()
+
+    def stop(self):
+        if self.worker:
+            self.worker.stop()
+
+    def on_result(self, cell: dict):
+        row = self.rows.get(cell["case"])
+        if row is None:
+            return
+        col = 1 if cell["backend"] == "int" else 3
+        outcome = QTableWidgetItem(cell["outcome"])
+        outcome.setToolTip(cell["stdout"].strip())
+        if cell["outcome"] in self.COLORS:
+            outcome.setBackground(self.COLORS[cell["outcome"]])
+        self.table.setItem(row, col, outcome)
+        duration = QTableWidgetItem(f"{cell['duration'] * 1000:.0f} ms")
+        duration.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        self.table.setItem(row, col + 1, duration)
+        if cell["detail"]:
+            self.details.setdefault(cell["case"], {})[cell["backend"]] = cell["detail"]
+        detail = "; ".join(f".{backend}: {text}" for backend, text in sorted(self.details.get(cell["case"], {}).items()))
+        self.table.setItem(row, 5, QTableWidgetItem(detail))
+
+    def on_done(self, summary: dict):
+        compile_result = summary["compile"]
+        if compile_result["status"] != "ok":
+            for row in range(self.table.rowCount()):
+                for col in (1, 3):
+                    self.table.setItem(row, col, QTableWidgetItem("not run"))
+            detail = (compile_result.get("stderr") or "").strip().splitlines()
+            self.summary_label.setText(summary_line(summary) + (f" ({detail[-1]})" if detail else ""))
+        else:
+            self.summary_label.setText(summary_line(summary))
+        self._finish()
+
+    def on_error(self, message: str):
+        self.summary_label.setText(f"Test matrix failed: {message}")
+        self._finish()
+
+    def _finish(self):
+        self.start_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+
+    def reject(self):
+        if self.worker and self.worker.isRunning():
+            self.worker.stop()
+            self.worker.wait()
+        super().reject()
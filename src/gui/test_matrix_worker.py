@@ -0,0 +1,42 @@
+import threading
+from PyQt6.QtCore import QThread, pyqtSignal
+from src.logic.test_matrix import run_matrix
+
+class TestMatrixWorker(QThread):
+    result_ready = pyqtSignal(dict)
+    done = pyqtSignal(dict)
+    error = pyqtSignal(str)
+
+    def __init__(self, compiler_file: str, source: str, workers: int, backend: str = "rars", cache=None,
+                 limits=None, max_steps: int = 0, use_daemon: bool = True):
+        super().__init__()
+        self.compiler_file = compiler_file
+        self.source = source
+        self.workers = workers
+        self.backend = backend
+        self.cache = cache
+        self.limits = limits
+        self.max_steps = max_steps
+        self.use_daemon = use_daemon
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        try:
+            summary = run_matrix(
+                self.compiler_file,
+                self.source,
+                workers=self.workers,
+                cache=self.cache,
+                limits=self.limits,
+                max_steps=self.max_steps,
+                asm_backend=self.backend,
+                use_daemon=self.use_daemon,
+                on_result=self.result_ready.emit,
+                cancel_event=self.cancel_event
+            )
+            self.done.emit(summary)
+        except Exception as e:
+            self.error.emit(str(e))
+
+    def stop(self):
+        self.cancel_event.set()
@@ -0,0 +1,158 @@
+import hashlib
+import os
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, QThread, QProcess
+
+from src.gui.buttons_handlers import run_compiler_action, replay_inputs_action
+
+DEBOUNCE_MS = 400
+
+
+def file_digest(path):
+    """sha256 of a file's content, or None if it cannot be read."""
+    if not path:
+        return None
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def is_running(executor):
+    """Whether a run executor (a QThread, or CExecutor with its QProcess) has not finished yet."""
+    if isinstance(executor, QThread):
+        return executor.isRunning()
+    return executor.process.state() != QProcess.ProcessState.NotRunning
+
+
+class WatchController(QObject):
+    """
+    Watches the selected compiler and source files. After a burst of saves
+    settles it cancels whatever is still compiling or running, recompiles if
+    the compiler or source content changed, and re-runs only the intermediate
+    and assembly stages whose generated file differs from the one last run.
+    """
+
+    def __init__(self, ui):
+        super().__init__(ui)
+        self.ui = ui
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.on_file_changed)
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(DEBOUNCE_MS)
+        self.debounce.timeout.connect(self.trigger)
+        # Content digests of the inputs of the last compile and of the last run per stage.
+        self.compiled_inputs = None
+        self.ran = {}
+        # Set while waiting for a cancelled compile to finish before starting over.
+        self.restart_pending = False
+
+    def start(self):
+        self.refresh_paths()
+        self.ui.output_box.append("Watch mode on: saving the compiler or source recompiles and re-runs.")
+        self.trigger()
+
+    def stop(self):
+        self.debounce.stop()
+        paths = self.watcher.files()
+        if paths:
+            self.watcher.removePaths(paths)
+        self.compiled_inputs = None
+        self.ran = {}
+        self.ui.output_box.append("Watch mode off.")
+
+    def refresh_paths(self):
+        paths = [
+            p for p in (self.ui.file_loader.get('compiler'), self.ui.file_loader.get('source'))
+            if p and os.path.exists(p)
+        ]
+        current = self.watcher.files()
+        stale = [p for p in current if p not in paths]
+        if stale:
+            self.watcher.removePaths(stale)
+        missing = [p for p in paths if p not in current]
+        if missing:
+            self.watcher.addPaths(missing)
+
+    def on_file_changed(self, path):
+        # Editors that save by rename make the watcher drop the path; add it back.
+        if path not in self.watcher.files() and os.path.exists(path):
+            self.watcher.addPath(path)
+        self.debounce.start()
+
+    def _inputs(self):
+        return (
+            file_digest(self.ui.file_loader.get('compiler')),
+            file_digest(self.ui.file_loader.get('source')),
+        )
+
+    def cancel_runs(self):
+        """Stop the runs still in progress; their stages run again after the next compile."""
+        for attr, stage in (('intermediate_executor', 'int'), ('assembly_executor', 'asm')):
+            executor = getattr(self.ui, attr, None)
+            if executor is not None and is_running(executor):
+                executor.stop()
+                if hasattr(executor, 'wait'):
+                    executor.wait(2000)
+                setattr(self.ui, attr, None)
+                self.ran.pop(stage, None)
+
+    def trigger(self):
+        self.refresh_paths()
+        inputs = self._inputs()
+        if None in inputs:
+            return
+        if self.ui.compile_executor is not None:
+            # Let the cancelled compile wind down, then start over.
+            if not self.restart_pending:
+                self.restart_pending = True
+                executor = self.ui.compile_executor
+                executor.finished.connect(lambda: self.on_compile_cancelled(executor.result))
+                executor.stop()
+            return
+        if inputs == self.compiled_inputs:
+            return
+
+        self.cancel_runs()
+        self.compiled_inputs = inputs
+        executor = run_compiler_action(self.ui)
+        if executor is not None:
+            executor.finished.connect(lambda: self.on_compiled(executor.result))
+
+    def on_compile_cancelled(self, result):
+        self.restart_pending = False
+        if result is None or result['status'] == 'cancelled':
+            self.compiled_inputs = None
+        QTimer.singleShot(0, self.trigger)
+
+    def on_compiled(self, result):
+        if result is None or result['status'] != 'ok':
+            return
+
+        artifacts = result['artifacts']
+        # Re-runs reuse each program's last inputs and only prompt the first time.
+        stages = (
+            ('int', 'intermediate'),
+            ('asm', 'assembly'),
+        )
+        for stage, kind in stages:
+            digest = file_digest(artifacts.get(stage))
+            if digest is None or self.ran.get(stage) == digest:
+                continue
+            self.ran[stage] = digest
+            replay_inputs_action(self.ui, kind, ask_if_missing=True)
+
+
+def toggle_watch_mode(ui, enabled):
+    if enabled:
+        if not (ui.file_loader.get('compiler') and ui.file_loader.get('source')):
+            ui.output_box.append("Select a compiler and a source file to watch.")
+            ui.watch_checkbox.setChecked(False)
+            return
+        ui.watch_controller = WatchController(ui)
+        ui.watch_controller.start()
+    elif ui.watch_controller is not None:
+        ui.watch_controller.stop()
+        ui.watch_controller.deleteLater()
+        ui.watch_controller = None
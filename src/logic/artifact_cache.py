@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+from src.logic.compiler_pool import artifact_paths
+
+
+class ArtifactCache:
+    """
+    On-disk cache of compiler runs, keyed by the content of the compiler script
+    (and the helper modules next to it), the source file and the extra arguments.
+    Each entry holds the compiler's stdout/stderr and copies of the generated
+    .int/.asm files. Entries are evicted least-recently-used once the cache
+    grows past max_bytes.
+    """
+
+    def __init__(self, root=os.path.join(".cache", "compile"), max_bytes=64 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _hash_file(digest, path):
+        digest.update(os.path.basename(path).encode() + b"\0")
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                digest.update(chunk)
+        digest.update(b"\0")
+
+    def key(self, compiler_file, source_file, extra_args=""):
+        digest = hashlib.sha256()
+        compiler_file = os.path.abspath(compiler_file)
+        self._hash_file(digest, compiler_file)
+        # Helper modules imported by the compiler live next to it.
+        folder = os.path.dirname(compiler_file)
+        for name in sorted(os.listdir(folder)):
+            path = os.path.join(folder, name)
+            if name.endswith(".py") and path != compiler_file and os.path.isfile(path):
+                self._hash_file(digest, path)
+        digest.update(b"--source--")
+        self._hash_file(digest, source_file)
+        digest.update((extra_args or "").encode())
+        return digest.hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.root, key)
+
+    def lookup(self, key, source_file):
+        """
+        Restore a cached compile: copy its artifacts back to int/ and asm/ and
+        return a result dict shaped like CompilerPool.compile's, or None on a miss.
+        """
+        entry = self._entry(key)
+        meta_path = os.path.join(entry, "meta.json")
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            artifacts = {}
+            for kind, target in artifact_paths(source_file).items():
+                if kind not in meta["artifacts"]:
+                    continue
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copyfile(os.path.join(entry, kind), target)
+                artifacts[kind] = target
+            now = time.time()
+            os.utime(meta_path, (now, now))
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return {
+            "stdout": meta["stdout"],
+            "stderr": meta["stderr"],
+            "returncode": meta["returncode"],
+            "status": "ok",
+            "duration": 0.0,
+            "cpu_time": 0.0,
+            "artifacts": artifacts,
+            "cached": True,
+        }
+
+    def store(self, key, result):
+        """Save a successful compile result and its artifacts, then enforce the size bound."""
+        if result is None or result.get("returncode") != 0:
+            return
+        entry = self._entry(key)
+        tmp = f"{entry}.tmp{os.getpid()}.{threading.get_ident()}"
+        try:
+            os.makedirs(tmp, exist_ok=True)
+            for kind, path in result["artifacts"].items():
+                shutil.copyfile(path, os.path.join(tmp, kind))
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump({
+                    "stdout": result["stdout"],
+                    "stderr": result["stderr"],
+                    "returncode": result["returncode"],
+                    "artifacts": sorted(result["artifacts"]),
+                }, f)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp, entry)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+        self.evict()
+
+    def evict(self):
+        """Drop least-recently-used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return
+        for name in names:
+            entry = os.path.join(self.root, name)
+            meta_path = os.path.join(entry, "meta.json")
+            if not os.path.isfile(meta_path):
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(entry, f)) for f in os.listdir(entry)
+            )
+            entries.append((os.path.getmtime(meta_path), size, entry))
+            total += size
+        entries.sort()
+        while total > self.max_bytes and entries:
+            _, size, entry = entries.pop(0)
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def stats_line(self):
+        return f"Compile cache: {self.hits} hit(s), {self.misses} miss(es)"
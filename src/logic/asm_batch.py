@@ -0,0 +1,167 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+from src.logic.limited_exec import Limits
+from src.logic.pipeline import DEFAULT_MAX_STEPS, run_assembly, read_inputs_file, program_output
+from src.logic.rars_daemon import DaemonPool
+
+# Cases listed in a batch summary as the slowest.
+SLOWEST = 5
+
+
+def make_case(name, asm_file, inputs=(), expected=None):
+    """A test case: an .asm file, its input values and the expected output (None: just run cleanly)."""
+    return {"name": name, "asm": asm_file, "inputs": list(inputs), "expected": expected}
+
+
+def list_cases(folder):
+    """
+    One case per .asm file directly inside folder, sorted by name. Inputs
+    come from <name>.in and the expected output from <name>.out, when present.
+    """
+    cases = []
+    for name in sorted(os.listdir(folder)):
+        if not name.endswith(".asm"):
+            continue
+        asm_file = os.path.join(folder, name)
+        stem = os.path.splitext(asm_file)[0]
+        inputs = read_inputs_file(stem + ".in") if os.path.exists(stem + ".in") else []
+        expected = None
+        if os.path.exists(stem + ".out"):
+            with open(stem + ".out", "r", encoding="utf-8", errors="replace") as f:
+                expected = f.read()
+        cases.append(make_case(name, asm_file, inputs, expected))
+    return cases
+
+
+def first_difference(actual, expected):
+    """
+    Where two outputs first differ, as '<line>: expected ..., got ...', or
+    None if they match (trailing whitespace is ignored).
+    """
+    actual_lines = actual.rstrip().splitlines()
+    expected_lines = expected.rstrip().splitlines()
+    for number, (got, want) in enumerate(zip(actual_lines, expected_lines), start=1):
+        if got.rstrip() != want.rstrip():
+            return f"line {number}: expected {want!r}, got {got!r}"
+    if len(actual_lines) != len(expected_lines):
+        number = min(len(actual_lines), len(expected_lines)) + 1
+        if len(actual_lines) < len(expected_lines):
+            return f"line {number}: expected {expected_lines[number - 1]!r}, got end of output"
+        return f"line {number}: expected end of output, got {actual_lines[number - 1]!r}"
+    return None
+
+
+def check_case(case, result):
+    """
+    The case's result from a run: the run dict plus name, asm, outcome
+    ('pass', 'fail', 'error' or 'timeout') and detail.
+    """
+    output = result["stdout"]
+    outcome, detail = "pass", ""
+    if result["status"] == "timeout":
+        outcome, detail = "timeout", f"{result['stats'].get('limit')} limit"
+    elif result["status"] == "error" and result["stats"]["reason"] != "normal":
+        outcome, detail = "error", result["stderr"] or result["stats"]["reason"]
+    elif "terminated due to errors" in output:
+        outcome = "error"
+        detail = next((line for line in output.splitlines() if line.startswith("Error")), "RARS error")
+    elif case["expected"] is not None:
+        difference = first_difference(program_output(output), case["expected"])
+        if difference is not None:
+            outcome, detail = "fail", difference
+    return dict(result, name=case["name"], asm=case["asm"], outcome=outcome, detail=detail)
+
+
+def _run_simulated(case, limits, max_steps):
+    # Module level so a process pool can pickle it.
+    return check_case(case, run_assembly(case["asm"], case["inputs"], limits=limits, max_steps=max_steps,
+                                         backend="python"))
+
+
+def run_cases(cases, workers=None, backend="rars", limits=None, max_steps=DEFAULT_MAX_STEPS, use_daemon=True,
+              on_result=None, cancel_event=None):
+    """
+    Run every case on a bounded pool of workers. Under RARS each worker
+    thread keeps its own warm RARS host (when use_daemon and Java allow it),
+    so cases run on separate JVMs and separate cores; the built-in simulator
+    runs in a pool of processes for the same reason.
+
+    on_result(result) is called as each case finishes, in completion order.
+    Returns a summary dict with the per-case results (in case order), pass
+    and fail counts, wall time, throughput in cases per second and the
+    slowest cases.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(cases) or 1))
+    limits = limits or Limits(wall=10)
+    results = {}
+    start = time.perf_counter()
+
+    def cancelled(case):
+        return dict(
+            name=case["name"], asm=case["asm"], stdout="", stderr="", returncode=None, status="cancelled",
+            duration=0.0, stats={}, outcome="cancelled", detail=""
+        )
+
+    def drain(futures):
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index] = cancelled(cases[index]) if future.cancelled() else future.result()
+            if on_result:
+                on_result(results[index])
+            if cancel_event is not None and cancel_event.is_set():
+                # Cases not started yet are dropped; running ones finish.
+                for other in futures:
+                    other.cancel()
+
+    if backend == "python":
+        # "spawn", as in compiler_pool: forking from the GUI's worker thread would copy Qt state.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            drain({
+                executor.submit(_run_simulated, case, limits, max_steps): index for index, case in enumerate(cases)
+            })
+    else:
+        daemons = DaemonPool(workers, use_daemon)
+
+        def run_one(case):
+            if cancel_event is not None and cancel_event.is_set():
+                return cancelled(case)
+            with daemons.daemon() as daemon:
+                result = run_assembly(case["asm"], case["inputs"], limits=limits, max_steps=max_steps,
+                                      daemon=daemon)
+            return check_case(case, result)
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                drain({executor.submit(run_one, case): index for index, case in enumerate(cases)})
+        finally:
+            daemons.close()
+
+    wall = time.perf_counter() - start
+    ordered = [results[index] for index in range(len(cases))]
+    finished = [r for r in ordered if r["outcome"] != "cancelled"]
+    return {
+        "results": ordered,
+        "workers": workers,
+        "backend": backend,
+        "wall_time": wall,
+        "total_time": sum(r["duration"] for r in finished),
+        "throughput": len(finished) / wall if wall > 0 else 0.0,
+        "passed": sum(1 for r in finished if r["outcome"] == "pass"),
+        "failed": sum(1 for r in finished if r["outcome"] != "pass"),
+        "slowest": [
+            {"name": r["name"], "duration": r["duration"]}
+            for r in sorted(finished, key=lambda r: r["duration"], reverse=True)[:SLOWEST]
+        ],
+    }
+
+
+def summary_line(summary):
+    slowest = ", ".join(f"{s['name']} {s['duration']:.2f} s" for s in summary["slowest"][:3])
+    return (
+        f"{summary['passed']} passed, {summary['failed']} failed with {summary['workers']} worker(s): "
+        f"wall {summary['wall_time']:.2f} s, {summary['throughput']:.1f} cases/s"
+        + (f"; slowest: {slowest}" if slowest else "")
+    )
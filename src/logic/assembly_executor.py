@@ -1,21 +1,63 @@
+import codecs
 import os
-from PyQt6.QtCore import QThread, pyqtSignal, QProcess, QTimer
+import re
+import threading
+
+from PyQt6.QtCore import QThread, pyqtSignal, QProcess
+from src.logic.pipeline import (
+    DEFAULT_MAX_STEPS, rars_limits, rars_command, split_instruction_count, apply_rars_stats, simulate_assembly
+)
+from src.logic.limited_exec import Limits, TERM_GRACE, wrap_command, new_stats_file, read_stats, summary_line
+
+# The line RARS ends a run with ("Program terminated by ..."); only the instruction count follows it.
+_TERMINATION_LINE = re.compile(r"terminated[^\n]*\n")
 
 class AssemblyExecutor(QThread):
     """
-    Executes a RISC-V assembly file using RARS in a separate thread,
-    feeding inputs and emitting output to the UI via output_signal.
+    Executes a RISC-V assembly file using RARS (or the built-in RV32IM
+    simulator) in a separate thread, feeding inputs and emitting output to the UI via output_signal.
     """
     output_signal = pyqtSignal(str)
+    # Raw program output, chunk by chunk (not one message per chunk).
+    stream_signal = pyqtSignal(str)
 
-    def __init__(self, asm_file, output_box, inputs=None, parent=None):
+    def __init__(self, asm_file, output_box, inputs=None, parent=None, limits=None, daemon=None,
+                 max_steps=DEFAULT_MAX_STEPS, backend="rars", cache=None):
         super().__init__(parent)
+        # 'rars', or 'python' for the built-in RV32IM simulator.
+        self.backend = backend
+        # Instruction budget (0 for none); the wall-clock limit is only a backstop.
+        self.max_steps = max_steps
+        # Output after RARS's termination line is held back until the run ends,
+        # so the instruction count it prints last never reaches the output box.
+        self.held = ""
+        self.terminated = False
+        self.tail = ""
+        # A result_cache.ResultCache that replays earlier runs with the same inputs.
+        self.cache = cache
+        self.cache_key = None
+        self.shown = []
+        # A rars_daemon.RarsDaemon to try before starting a fresh RARS.
+        self.daemon = daemon
+        self.cancel_event = threading.Event()
+        self.limits = rars_limits(limits or Limits(wall=10))
+        self.stats_path = new_stats_file()
+        # Multibyte characters may be split across reads.
+        self.decoder = codecs.getincrementaldecoder('utf-8')('replace')
         self.asm_file = asm_file
         self.inputs = inputs or []
         self.output_box = output_box
         self.process = None
 
     def run(self):
+        if self.cache is not None and self.run_from_cache():
+            return
+        if self.backend == "python":
+            self.run_in_process()
+            return
+        if self.daemon is not None and self.run_on_daemon():
+            return
+
         # Create QProcess in the thread context.
         self.process = QProcess()
         self.process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
@@ -26,17 +68,15 @@ class AssemblyExecutor(QThread):
         self.process.finished.connect(self._on_finished)
         self.process.errorOccurred.connect(lambda error: None)
 
-        # Build and start the RARS command.
-        jar_path = os.path.abspath("src/riscV_simulator/rars_46ab74d.jar")
-        self.process.start("java", ["-jar", jar_path, "nc", "sm", self.asm_file])
+        # Build and start the RARS command under the limited_exec wrapper,
+        # which enforces the limits (wall time included) and records the run.
+        command = wrap_command(rars_command(self.asm_file, self.max_steps), self.limits, self.stats_path)
+        self.process.start(command[0], command[1:])
 
         if not self.process.waitForStarted():
             self.output_signal.emit("Error: failed to launch RARS.\n")
             return
 
-        # Forcefully kill the process after 3 seconds.
-        QTimer.singleShot(3000, self.force_kill)
-
         # Run the thread's event loop until quit() is called.
         self.exec()
 
@@ -52,37 +92,91 @@ class AssemblyExecutor(QThread):
         except Exception:
             pass
 
-    def force_kill(self):
-        """
-        Forcefully kill the process after 3 seconds.
-        """
+    def run_from_cache(self):
+        """Replay a cached run of the same program and inputs; False on a miss or for a nondeterministic program."""
+        self.cache_key = self.cache.key(self.asm_file, self.backend, self.inputs, self.limits, self.max_steps)
+        result = self.cache.lookup(self.cache_key)
+        if result is None:
+            return False
+        self.emit_inputs()
+        if result["stdout"]:
+            self.stream_signal.emit(result["stdout"])
+        self.report(result, "RARS" if self.backend == "rars" else "built-in simulator")
+        return True
+
+    def run_on_daemon(self):
+        """Run on the warm RARS host; False if it is unavailable."""
+        result = self.daemon.run(
+            self.asm_file, self.inputs, self.limits, self.max_steps, cancel_event=self.cancel_event
+        )
+        if result is None:
+            return False
+        self.emit_inputs()
+        clean = result["stdout"].replace('\r', '').replace('\x00', '')
+        if clean:
+            self.stream_signal.emit(clean)
+        result["stdout"] = clean
+        self.report(result, "warm RARS")
+        return True
+
+    def run_in_process(self):
+        """Run with the built-in simulator, streaming its output."""
+        self.emit_inputs()
+        result = simulate_assembly(
+            self.asm_file, self.inputs, self.limits, self.max_steps,
+            on_output=self.stream_signal.emit, cancel_event=self.cancel_event
+        )
+        if result["status"] == "error" and result["stats"]["reason"] == "error":
+            self.output_signal.emit(f"Error: {result['stderr']}\n")
+        self.report(result, "built-in simulator")
+
+    def emit_inputs(self):
+        for idx, val in enumerate(self.inputs, start=1):
+            self.output_signal.emit(f"Input #{idx}: {val}\n")
+
+    def report(self, result, runner):
+        """Completion message and run summary of a run that did not go through the wrapper."""
         try:
-            if self.process and self.process.state() != QProcess.ProcessState.NotRunning:
-                self.process.kill()
-                self.process.waitForFinished(1000)
-        except Exception:
+            os.remove(self.stats_path)
+        except OSError:
             pass
+        stats = result["stats"]
+        if self.cache is not None and not stats.get("cached"):
+            self.cache.store(self.cache_key, result)
+        if stats["reason"] != "normal":
+            self.output_signal.emit(f"Assembly execution stopped ({stats['reason']}).\n")
+        else:
+            self.output_signal.emit("Assembly execution completed.\n")
+        self.output_signal.emit(f"{summary_line(stats)} · {runner}")
 
     def send_inputs(self, process):
-        """Feed input values to the process once it has started."""
-        for idx, val in enumerate(self.inputs, start=1):
-            self.output_signal.emit(f"Input #{idx}: {val}\n")
-            process.write((val + "\n").encode())
-            process.waitForBytesWritten()
-        # Send an extra newline in case RARS is waiting for a final input.
-        process.write("\n".encode())
-        process.waitForBytesWritten()
+        """Feed all input values to the process in one write once it has started."""
+        self.emit_inputs()
+        # An extra newline in case RARS is waiting for a final input.
+        process.write("".join(val + "\n" for val in self.inputs).encode() + b"\n")
         process.closeWriteChannel()
 
     def handle_stdout(self):
         """Read and emit process output."""
         try:
             raw = self.process.readAllStandardOutput().data()
-            text = raw.decode('utf-8', 'ignore')
+            text = self.decoder.decode(raw)
             # Clean the text by removing carriage returns or null characters.
             clean = text.replace('\r', '').replace('\x00', '')
-            if clean:
-                self.output_signal.emit(clean)
+            if self.terminated:
+                self.held += clean
+                return
+            cut = len(clean)
+            # The termination line may have started in the previous chunk.
+            match = _TERMINATION_LINE.search(self.tail + clean)
+            if match is not None and match.end() > len(self.tail):
+                self.terminated = True
+                cut = match.end() - len(self.tail)
+                self.held = clean[cut:]
+            if cut:
+                self.tail = (self.tail + clean[:cut])[-200:]
+                self.shown.append(clean[:cut])
+                self.stream_signal.emit(clean[:cut])
         except Exception:
             pass
 
@@ -95,7 +189,33 @@ class AssemblyExecutor(QThread):
         except Exception:
             pass
 
-        self.output_signal.emit("Assembly execution completed.\n")
+        rest = self.held + self.decoder.decode(b'', final=True)
+        shown, instructions = split_instruction_count(self.tail + rest)
+        rest = shown[len(self.tail):]
+        if rest:
+            self.shown.append(rest)
+            self.stream_signal.emit(rest)
+
+        stats = read_stats(self.stats_path)
+        try:
+            os.remove(self.stats_path)
+        except OSError:
+            pass
+        if stats is not None:
+            apply_rars_stats(stats, self.tail + rest, instructions)
+            if self.cache is not None:
+                self.cache.store(self.cache_key, {
+                    "stdout": "".join(self.shown), "stderr": "", "returncode": stats["returncode"],
+                    "status": "ok" if stats["returncode"] == 0 else "error", "stats": stats,
+                })
+        if stats is not None and stats["reason"] == "error":
+            self.output_signal.emit("Error: failed to launch RARS.\n")
+        elif stats is not None and stats["reason"] != "normal":
+            self.output_signal.emit(f"Assembly execution stopped ({stats['reason']}).\n")
+        else:
+            self.output_signal.emit("Assembly execution completed.\n")
+        if stats is not None:
+            self.output_signal.emit(summary_line(stats))
         self.quit()
 
     def stop(self):
@@ -103,10 +223,14 @@ class AssemblyExecutor(QThread):
         Call this method from your UI (e.g., in closeEvent) to ensure the process is
         terminated before the application exits.
         """
+        self.cancel_event.set()
         try:
             if self.process and self.process.state() != QProcess.ProcessState.NotRunning:
-                self.process.kill()
-                self.process.waitForFinished(1000)
+                # The wrapper stops RARS and still records the run.
+                self.process.terminate()
+                if not self.process.waitForFinished(int(TERM_GRACE * 1000) + 1000):
+                    self.process.kill()
+                    self.process.waitForFinished(1000)
         except Exception:
             pass
         self.quit()
\ No newline at end of file
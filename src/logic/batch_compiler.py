@@ -0,0 +1,87 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.logic.compiler_pool import CompilerPool
+
+# Files the compiler produces or consumes that are never sources themselves.
+SKIPPED_EXTENSIONS = {".int", ".asm", ".s", ".c", ".py", ".pyc", ".in", ".out", ".pdf"}
+
+
+def list_sources(folder, extension=""):
+    """
+    Return the source files directly inside folder, sorted by name.
+    If extension is given (e.g. '.ci') only files with that extension are kept.
+    """
+    sources = []
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        if name.startswith(".") or not os.path.isfile(path):
+            continue
+        ext = os.path.splitext(name)[1].lower()
+        if extension:
+            if ext != extension.lower():
+                continue
+        elif ext in SKIPPED_EXTENSIONS:
+            continue
+        sources.append(path)
+    return sources
+
+
+def compile_batch(compiler_file, sources, workers=None, extra_args="", on_result=None, cancel_event=None):
+    """
+    Compile every file in sources concurrently on a dedicated pool of warm
+    compiler workers (one process per worker, so compiles use separate cores).
+
+    on_result(result) is called from a pool thread as each file finishes; each
+    result is the CompilerPool.compile dict plus a 'source' key.
+    Returns a summary dict with the per-file results, wall time, the summed
+    compile time and CPU time, and the resulting speedup over a serial run.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(sources) or 1))
+    results = []
+    start = time.perf_counter()
+    pool = CompilerPool(compiler_file, workers)
+    try:
+        def compile_one(source):
+            if cancel_event is not None and cancel_event.is_set():
+                result = {
+                    "stdout": "", "stderr": "", "returncode": None, "status": "cancelled",
+                    "duration": 0.0, "cpu_time": 0.0, "artifacts": {},
+                }
+            else:
+                result = pool.compile(source, extra_args, cancel_event=cancel_event)
+            result["source"] = source
+            return result
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(compile_one, source) for source in sources]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                if on_result:
+                    on_result(result)
+    finally:
+        pool.close()
+
+    wall = time.perf_counter() - start
+    total = sum(r["duration"] for r in results)
+    cpu = sum(r["cpu_time"] for r in results)
+    return {
+        "results": sorted(results, key=lambda r: r["source"]),
+        "workers": workers,
+        "wall_time": wall,
+        "total_time": total,
+        "cpu_time": cpu,
+        "speedup": total / wall if wall > 0 else 0.0,
+        "passed": sum(1 for r in results if r["status"] == "ok"),
+        "failed": sum(1 for r in results if r["status"] != "ok"),
+    }
+
+
+def summary_line(summary):
+    return (
+        f"{summary['passed']} compiled, {summary['failed']} failed with {summary['workers']} worker(s): "
+        f"wall {summary['wall_time']:.2f} s, compile time {summary['total_time']:.2f} s "
+        f"(CPU {summary['cpu_time']:.2f} s), speedup x{summary['speedup']:.2f}"
+    )
@@ -0,0 +1,118 @@
+import hashlib
+import os
+import subprocess
+import threading
+import time
+
+from src.logic.fork_server import served_executables
+
+_gcc_version = None
+# Seconds after build() last returned an executable that it may still be starting or running.
+RECENT_USE = 600
+
+
+def gcc_version():
+    """Identify the gcc in PATH once per process, so an upgrade invalidates old builds."""
+    global _gcc_version
+    if _gcc_version is None:
+        try:
+            _gcc_version = subprocess.run(
+                ["gcc", "--version"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+            ).stdout.splitlines()[0]
+        except (OSError, IndexError):
+            _gcc_version = ""
+    return _gcc_version
+
+
+class CBuildCache:
+    """
+    Executables built from generated C, stored as <sha256>.out where the hash
+    covers the C source, the gcc flags and the gcc version. An unchanged program
+    reuses its executable without running gcc. Each program gets its own file,
+    so concurrent runs never overwrite each other's binary. Only the
+    max_entries most recently used executables are kept, apart from ones
+    still in use.
+    """
+
+    def __init__(self, root=os.path.join(".cache", "cbuild"), max_entries=64):
+        self.root = root
+        self.max_entries = max_entries
+
+    def key(self, c_source, flags=()):
+        digest = hashlib.sha256()
+        digest.update(gcc_version().encode() + b"\0")
+        digest.update("\0".join(flags).encode() + b"\0")
+        digest.update(c_source.encode())
+        return digest.hexdigest()
+
+    def build(self, c_source, flags=()):
+        """
+        Return a dict with status ('ok' or 'error'), executable, stderr,
+        duration and cached (True when gcc was skipped).
+        """
+        start = time.perf_counter()
+        os.makedirs(self.root, exist_ok=True)
+        executable = os.path.abspath(os.path.join(self.root, self.key(c_source, flags) + ".out"))
+        if os.path.exists(executable):
+            now = time.time()
+            os.utime(executable, (now, now))
+            return {
+                "status": "ok", "executable": executable, "stderr": "",
+                "duration": time.perf_counter() - start, "cached": True,
+            }
+
+        # Build next to the final name and rename, so a half-written binary is never run.
+        tmp = f"{executable}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            result = subprocess.run(
+                ["gcc", *flags, "-x", "c", "-", "-o", tmp],
+                input=c_source, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            )
+        except OSError as e:
+            return {
+                "status": "error", "executable": None, "stderr": str(e),
+                "duration": time.perf_counter() - start, "cached": False,
+            }
+        if result.returncode != 0:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return {
+                "status": "error", "executable": None, "stderr": result.stderr,
+                "duration": time.perf_counter() - start, "cached": False,
+            }
+        os.replace(tmp, executable)
+        self.evict()
+        return {
+            "status": "ok", "executable": executable, "stderr": result.stderr,
+            "duration": time.perf_counter() - start, "cached": False,
+        }
+
+    def evict(self):
+        """
+        Remove the least recently used executables beyond max_entries. One
+        that build() returned in the last RECENT_USE seconds, or that has a
+        shared fork server, stays, since a run may still need it.
+        """
+        try:
+            names = [name for name in os.listdir(self.root) if name.endswith(".out")]
+        except OSError:
+            return
+        if len(names) <= self.max_entries:
+            return
+        entries = []
+        for name in names:
+            path = os.path.abspath(os.path.join(self.root, name))
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+        entries.sort()
+        cutoff = time.time() - RECENT_USE
+        served = served_executables()
+        for mtime, path in entries[:len(entries) - self.max_entries]:
+            if mtime > cutoff or path in served:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
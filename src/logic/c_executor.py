@@ -1,10 +1,19 @@
-from PyQt6.QtCore import QProcess, pyqtSignal, QObject, QTimer
+import codecs
+import os
+
+from PyQt6.QtCore import QProcess, QProcessEnvironment, pyqtSignal, QObject, QTimer
 from PyQt6.QtWidgets import QInputDialog
+from src.logic.int_profile import new_profile_file, read_hits, hit_table, format_hit_table
+from src.logic.int_to_c_translator import PROFILE_ENV
+from src.logic.limited_exec import Limits, TERM_GRACE, wrap_command, new_stats_file, read_stats, summary_line
 
 class CExecutor(QObject):
     output_signal = pyqtSignal(str)
+    # Raw program output, chunk by chunk (not one message per chunk).
+    stream_signal = pyqtSignal(str)
 
-    def __init__(self, executable_path, output_box, input_names=None, parent=None):
+    def __init__(self, executable_path, output_box, input_names=None, parent=None, profile_map=None,
+                 inputs=None, limits=None, cache=None, source_file=None):
         super().__init__(parent)
         self.process = QProcess(self)
         self.executable_path = executable_path
@@ -12,6 +21,30 @@ class CExecutor(QObject):
         self.input_names = input_names or []
         self.input_index = 0
         self.expecting_input = True
+        # Pre-supplied input values are written to stdin at once instead of prompting.
+        self.inputs = inputs
+        # Multibyte characters may be split across reads.
+        self.stdout_decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        self.stderr_decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        # The program runs under the limited_exec wrapper, which writes its stats here.
+        self.limits = limits or Limits()
+        self.stats_path = new_stats_file()
+        # A result_cache.ResultCache for runs with pre-supplied inputs (profiled runs always run).
+        self.cache = cache if inputs is not None and profile_map is None else None
+        self.cache_key = None
+        # The .int the executable was built from; the cache checks it for the nondeterministic mark.
+        self.source_file = source_file
+        self.stdout_text = []
+        self.stderr_text = []
+
+        # A profiled build writes its per-quad counters to profile_path at exit.
+        self.profile_map = profile_map
+        self.profile_path = None
+        if profile_map is not None:
+            self.profile_path = new_profile_file()
+            env = QProcessEnvironment.systemEnvironment()
+            env.insert(PROFILE_ENV, self.profile_path)
+            self.process.setProcessEnvironment(env)
 
         self.process.readyReadStandardOutput.connect(self.handle_stdout)
         self.process.readyReadStandardError.connect(self.handle_stderr)
@@ -19,15 +52,68 @@ class CExecutor(QObject):
         self.process.finished.connect(self.on_finished)
 
     def start(self):
-        self.process.start(self.executable_path)
+        if self.cache is not None and self.run_from_cache():
+            return
+        command = wrap_command([self.executable_path], self.limits, self.stats_path)
+        self.process.start(command[0], command[1:])
 
     def on_started(self):
         self.output_signal.emit("C process started.\n")
+        if self.inputs is not None:
+            self.send_all_inputs()
+            return
         QTimer.singleShot(200, self.send_next_input)
 
+    def run_from_cache(self):
+        """Replay a cached run of the same executable and inputs; False on a miss."""
+        self.cache_key = self.cache.key(self.executable_path, "gcc", self.inputs, self.limits,
+                                        source_file=self.source_file)
+        result = self.cache.lookup(self.cache_key)
+        if result is None:
+            return False
+        os.remove(self.stats_path)
+        if self.inputs:
+            self.output_signal.emit("Inputs: " + " ".join(self.inputs))
+        self.stream_signal.emit(result["stdout"] + result["stderr"])
+        if result["status"] == "ok":
+            self.output_signal.emit("Intermediate code execution completed successfully")
+        else:
+            self.output_signal.emit(f"Intermediate code execution stopped ({result['stats']['reason']}).")
+        self.output_signal.emit(summary_line(result["stats"]))
+        return True
+
+    def send_all_inputs(self):
+        """Write every pre-supplied value to stdin, then close it."""
+        if self.inputs:
+            self.output_signal.emit("Inputs: " + " ".join(self.inputs))
+        self.process.write("".join(value + "\n" for value in self.inputs).encode('utf-8'))
+        self.process.closeWriteChannel()
+
     def on_finished(self, exitCode, exitStatus):
         self.expecting_input = False
-        self.output_signal.emit(f"Intermediate code execution completed successfully")
+        rest = self.stdout_decoder.decode(b'', final=True), self.stderr_decoder.decode(b'', final=True)
+        self.stdout_text.append(rest[0])
+        self.stderr_text.append(rest[1])
+        self.stream_signal.emit(rest[0] + rest[1])
+        stats = read_stats(self.stats_path)
+        os.remove(self.stats_path)
+        if self.cache is not None and stats is not None:
+            self.cache.store(self.cache_key, {
+                "stdout": "".join(self.stdout_text), "stderr": "".join(self.stderr_text),
+                "returncode": stats["returncode"], "status": "ok" if stats["returncode"] == 0 else "error",
+                "stats": stats,
+            })
+        if stats is None or (stats["reason"] == "normal" and stats["returncode"] == 0):
+            self.output_signal.emit(f"Intermediate code execution completed successfully")
+        else:
+            self.output_signal.emit(f"Intermediate code execution stopped ({stats['reason']}).")
+        if stats is not None:
+            self.output_signal.emit(summary_line(stats))
+        if self.profile_path:
+            rows = hit_table(self.profile_map, read_hits(self.profile_path))
+            self.output_signal.emit("Quad hit counts (hottest first):\n" + format_hit_table(rows))
+            os.remove(self.profile_path)
+            self.profile_path = None
 
     def send_next_input(self):
         if self.input_index < len(self.input_names) and self.expecting_input:
@@ -40,13 +126,27 @@ class CExecutor(QObject):
 
     def handle_stdout(self):
         data = self.process.readAllStandardOutput()
-        text = data.data().decode('utf-8')
-        self.output_signal.emit(text)
+        text = self.stdout_decoder.decode(data.data())
+        self.stdout_text.append(text)
+        self.stream_signal.emit(text)
 
     def handle_stderr(self):
         data = self.process.readAllStandardError()
-        text = data.data().decode('utf-8')
-        self.output_signal.emit(text)
+        text = self.stderr_decoder.decode(data.data())
+        self.stderr_text.append(text)
+        self.stream_signal.emit(text)
+
+    def stop(self):
+        """Kill the running program, if any."""
+        self.expecting_input = False
+        if self.process.state() != QProcess.ProcessState.NotRunning:
+            # The wrapper passes SIGTERM on (a profiled program writes its
+            # counters), kills the program after TERM_GRACE and records the run.
+            self.process.terminate()
+            if self.process.waitForFinished(int(TERM_GRACE * 1000) + 1000):
+                return
+            self.process.kill()
+            self.process.waitForFinished(1000)
 
     def send_input(self, text):
         if not text.endswith('\n'):
@@ -0,0 +1,62 @@
+import threading
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from src.logic.compiler_pool import get_pool
+
+
+class CompileExecutor(QThread):
+    """
+    Runs one compile on the warm compiler pool in a separate thread, streaming
+    the compiler's output line by line through output_signal. Once the thread
+    has finished, the result dict (or None on error) is available as self.result.
+    """
+    output_signal = pyqtSignal(str)
+
+    def __init__(self, compiler_file, source_file, extra_args="", cache=None, timeout=None, parent=None):
+        super().__init__(parent)
+        self.compiler_file = compiler_file
+        self.source_file = source_file
+        self.extra_args = extra_args
+        self.cache = cache
+        self.timeout = timeout
+        self.cancel_event = threading.Event()
+        self.result = None
+
+    def run(self):
+        try:
+            result = None
+            if self.cache is not None:
+                key = self.cache.key(self.compiler_file, self.source_file, self.extra_args)
+                result = self.cache.lookup(key, self.source_file)
+                if result is not None:
+                    for text in (result["stdout"], result["stderr"]):
+                        if text:
+                            self.output_signal.emit(text.rstrip("\n"))
+            if result is None:
+                result = get_pool(self.compiler_file).compile(
+                    self.source_file,
+                    self.extra_args,
+                    on_output=lambda channel, text: self.output_signal.emit(text.rstrip("\n")),
+                    timeout=self.timeout,
+                    cancel_event=self.cancel_event,
+                )
+                if self.cache is not None:
+                    self.cache.store(key, result)
+        except Exception as e:
+            self.output_signal.emit(f"Error: {e}")
+            result = None
+
+        if result is not None:
+            if result["status"] == "timeout":
+                self.output_signal.emit(f"Compilation timed out after {self.timeout} s.")
+            elif result["status"] == "cancelled":
+                self.output_signal.emit("Compilation stopped.")
+            if self.cache is not None:
+                self.output_signal.emit(
+                    self.cache.stats_line() + (" (restored from cache)" if result.get("cached") else "")
+                )
+        self.result = result
+
+    def stop(self):
+        """Cancel the compile; the worker running it is killed and replaced."""
+        self.cancel_event.set()
@@ -0,0 +1,358 @@
+import ast
+import atexit
+import builtins
+import importlib
+import io
+import multiprocessing
+import os
+import queue
+import shlex
+import sys
+import threading
+import time
+import traceback
+
+# Workers are started with "spawn" so they never inherit Qt state from the GUI.
+_CTX = multiprocessing.get_context("spawn")
+
+
+def artifact_paths(source_file):
+    """
+    Return the default .int/.asm locations the compiler writes for source_file:
+    int/<basename>.int and asm/<basename>.asm, relative to the working directory.
+    """
+    base = os.path.splitext(os.path.basename(source_file))[0]
+    return {
+        "int": os.path.join("int", f"{base}.int"),
+        "asm": os.path.join("asm", f"{base}.asm"),
+    }
+
+
+def _artifact_stats(source_file):
+    """The stat signature of each artifact of source_file that exists now."""
+    stats = {}
+    for kind, path in artifact_paths(source_file).items():
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        stats[kind] = (st.st_mtime_ns, st.st_size, st.st_ino)
+    return stats
+
+
+class _PipeStream(io.TextIOBase):
+    """Line-buffered text stream that forwards complete lines over the job pipe."""
+
+    def __init__(self, conn, channel):
+        super().__init__()
+        self.conn = conn
+        self.channel = channel
+        self.pending = ""
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self.pending += text
+        if "\n" in self.pending:
+            head, _, self.pending = self.pending.rpartition("\n")
+            self.conn.send((self.channel, head + "\n"))
+        return len(text)
+
+    def flush(self):
+        if self.pending:
+            self.conn.send((self.channel, self.pending))
+            self.pending = ""
+
+
+class _LoadedCompiler:
+    """
+    The compiler script held by a worker: its compiled code object, recompiled
+    whenever the script changes on disk, plus the third-party and standard
+    modules it imports. Helper modules from the compiler's own folder are
+    imported afresh for every run, so no module-level state survives a job.
+    """
+
+    def __init__(self, compiler_file):
+        self.path = os.path.abspath(compiler_file)
+        self.folder = os.path.dirname(self.path)
+        self.code = None
+        self.mtime = None
+        # The worker's own modules, never dropped even if they live under folder.
+        self.own_modules = set(sys.modules)
+
+    def _forget_local_modules(self):
+        """Drop the modules imported from the compiler's folder (helper files next to it)."""
+        prefix = os.path.join(self.folder, "")
+        for name, module in list(sys.modules.items()):
+            path = getattr(module, "__file__", None)
+            if name not in self.own_modules and path and os.path.abspath(path).startswith(prefix):
+                del sys.modules[name]
+        importlib.invalidate_caches()
+
+    def _stale(self):
+        try:
+            return os.path.getmtime(self.path) != self.mtime
+        except OSError:
+            return True
+
+    def load(self):
+        with open(self.path, "rb") as f:
+            source = f.read()
+        self.code = compile(source, self.path, "exec")
+
+        # Warm the import cache with the script's top-level imports without running it;
+        # helper modules next to the script are left to each run.
+        if self.folder not in sys.path:
+            sys.path.insert(0, self.folder)
+        for node in ast.parse(source, self.path).body:
+            names = []
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            for name in names:
+                top = os.path.join(self.folder, name.partition(".")[0])
+                if os.path.exists(top + ".py") or os.path.isdir(top):
+                    continue
+                try:
+                    importlib.import_module(name)
+                except Exception:
+                    pass
+
+        self.mtime = os.path.getmtime(self.path)
+
+    def run(self, source_file, extra_args):
+        """Execute the script as `python compiler.py source [args]` would and return its exit code."""
+        if self.code is None or self._stale():
+            self.load()
+        self._forget_local_modules()
+        sys.argv = [self.path, source_file] + shlex.split(extra_args or "")
+        namespace = {
+            "__name__": "__main__",
+            "__file__": self.path,
+            "__builtins__": builtins,
+            "__package__": None,
+        }
+        try:
+            exec(self.code, namespace)
+        except SystemExit as e:
+            if e.code is None:
+                return 0
+            if isinstance(e.code, int):
+                return e.code
+            print(e.code, file=sys.stderr)
+            return 1
+        except BaseException:
+            traceback.print_exc()
+            return 1
+        return 0
+
+
+def _worker_main(conn, compiler_file):
+    """Worker loop: receive (source, extra_args, cwd) jobs, stream output, report the exit code."""
+    compiler = _LoadedCompiler(compiler_file)
+    real_stdout, real_stderr = sys.stdout, sys.stderr
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+        source_file, extra_args, cwd = job
+        out = _PipeStream(conn, "stdout")
+        err = _PipeStream(conn, "stderr")
+        sys.stdout, sys.stderr = out, err
+        cpu_start = time.process_time()
+        try:
+            os.chdir(cwd)
+            returncode = compiler.run(source_file, extra_args)
+        except BaseException:
+            traceback.print_exc()
+            returncode = 1
+        finally:
+            out.flush()
+            err.flush()
+            sys.stdout, sys.stderr = real_stdout, real_stderr
+        conn.send(("done", (returncode, time.process_time() - cpu_start)))
+
+
+class _Worker:
+    def __init__(self, compiler_file):
+        self.conn, child_conn = _CTX.Pipe()
+        self.process = _CTX.Process(
+            target=_worker_main, args=(child_conn, compiler_file), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def alive(self):
+        return self.process.is_alive()
+
+    def close(self, force=False):
+        if not force:
+            try:
+                self.conn.send(None)
+            except Exception:
+                pass
+            self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(1)
+        self.conn.close()
+
+
+class CompilerPool:
+    """
+    A set of long-lived worker processes that keep one compiler script loaded
+    and take compile jobs over a pipe, instead of starting a new interpreter
+    for every compile.
+    """
+
+    def __init__(self, compiler_file, workers=1):
+        self.compiler_file = os.path.abspath(compiler_file)
+        self.size = max(1, int(workers))
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = []
+        # Compiles in progress, and whether the pool closes once they are done.
+        self._active = 0
+        self._closing = False
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self):
+        worker = _Worker(self.compiler_file)
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _retire(self, worker):
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        worker.close(force=True)
+
+    def compile(self, source_file, extra_args="", on_output=None, timeout=None, cancel_event=None):
+        """
+        Compile source_file on an idle worker, blocking until it finishes.
+        on_output(channel, text) is called for every line as it is produced.
+        If timeout (seconds) passes or cancel_event is set first, the worker is
+        killed and replaced.
+        Returns a dict with stdout, stderr, returncode, status ('ok', 'error',
+        'timeout' or 'cancelled'), duration, the worker's cpu_time and the produced artifacts
+        ({'int': path, 'asm': path} for the files this compile created or rewrote).
+        """
+        with self._lock:
+            self._active += 1
+        try:
+            return self._compile(source_file, extra_args, on_output, timeout, cancel_event)
+        finally:
+            with self._lock:
+                self._active -= 1
+                close = self._closing and not self._active
+            if close:
+                self.close()
+
+    def _compile(self, source_file, extra_args, on_output, timeout, cancel_event):
+        before = _artifact_stats(source_file)
+        worker = self._idle.get()
+        if not worker.alive():
+            self._retire(worker)
+            worker = self._spawn()
+
+        stdout, stderr = [], []
+        status = None
+        cpu_time = 0.0
+        start = time.perf_counter()
+        deadline = start + timeout if timeout else None
+        try:
+            worker.conn.send((os.path.abspath(source_file), extra_args, os.getcwd()))
+            while True:
+                if not worker.conn.poll(0.05):
+                    if cancel_event is not None and cancel_event.is_set():
+                        status = "cancelled"
+                    elif deadline is not None and time.perf_counter() > deadline:
+                        status = "timeout"
+                    elif not worker.alive():
+                        raise EOFError("worker process died")
+                    else:
+                        continue
+                    self._retire(worker)
+                    worker = self._spawn()
+                    returncode = None
+                    break
+                kind, payload = worker.conn.recv()
+                if kind == "done":
+                    returncode, cpu_time = payload
+                    break
+                (stdout if kind == "stdout" else stderr).append(payload)
+                if on_output:
+                    on_output(kind, payload)
+        except (EOFError, OSError) as e:
+            self._retire(worker)
+            worker = self._spawn()
+            stderr.append(f"Compiler worker exited unexpectedly: {e}\n")
+            returncode = 1
+        finally:
+            self._idle.put(worker)
+
+        if status is None:
+            status = "ok" if returncode == 0 else "error"
+        # Files left over from an earlier compile are not this compile's output.
+        after = _artifact_stats(source_file)
+        paths = artifact_paths(source_file)
+        artifacts = {kind: paths[kind] for kind, stat in after.items() if before.get(kind) != stat}
+        return {
+            "stdout": "".join(stdout),
+            "stderr": "".join(stderr),
+            "returncode": returncode,
+            "status": status,
+            "duration": time.perf_counter() - start,
+            "cpu_time": cpu_time,
+            "artifacts": artifacts,
+        }
+
+    def close_when_idle(self):
+        """Close the pool now, or once the compiles still running on it have finished."""
+        with self._lock:
+            self._closing = True
+            close = not self._active
+        if close:
+            self.close()
+
+    def close(self):
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(compiler_file, workers=1):
+    """Return the shared pool for compiler_file, (re)creating it if the size differs."""
+    key = os.path.abspath(compiler_file)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.size != max(1, int(workers)):
+            if pool is not None:
+                # Other threads may still be compiling on the old pool.
+                pool.close_when_idle()
+            pool = CompilerPool(key, workers)
+            _pools[key] = pool
+        return pool
+
+
+def shutdown_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(shutdown_pools)
@@ -0,0 +1,175 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.logic.batch_compiler import compile_batch
+from src.logic.limited_exec import Limits
+from src.logic.pipeline import (
+    DEFAULT_MAX_STEPS, run_intermediate, run_assembly, program_output, read_input_vectors
+)
+from src.logic.rars_daemon import DaemonPool
+
+# Tokens shown before a divergence.
+CONTEXT_TOKENS = 3
+
+
+def first_divergence(int_output, asm_output):
+    """
+    The first whitespace-separated token where the two outputs differ, as a
+    dict with its 1-based position, both tokens (None past the end of an
+    output) and the tokens before it; None if the token streams are equal.
+    """
+    int_tokens = int_output.split()
+    asm_tokens = asm_output.split()
+    for index in range(max(len(int_tokens), len(asm_tokens))):
+        int_token = int_tokens[index] if index < len(int_tokens) else None
+        asm_token = asm_tokens[index] if index < len(asm_tokens) else None
+        if int_token != asm_token:
+            return {
+                "token": index + 1,
+                "int": int_token,
+                "asm": asm_token,
+                "context": " ".join(int_tokens[max(index - CONTEXT_TOKENS, 0):index]),
+            }
+    return None
+
+
+def describe_divergence(divergence):
+    def shown(token):
+        return repr(token) if token is not None else "end of output"
+
+    return (
+        f"token {divergence['token']}: .int gives {shown(divergence['int'])}, "
+        f".asm gives {shown(divergence['asm'])}"
+        + (f" (after '{divergence['context']}')" if divergence["context"] else "")
+    )
+
+
+def _case(name, source, inputs, int_result, asm_result):
+    """A compared vector: outcome 'match', 'diverge' or 'error', with the first divergence."""
+    divergence = None
+    if int_result is not None and asm_result is not None:
+        divergence = first_divergence(int_result["stdout"], program_output(asm_result["stdout"]))
+    if int_result is None or asm_result is None:
+        outcome, detail = "error", "missing .int or .asm"
+    elif int_result["status"] != "ok" or asm_result["status"] != "ok" or \
+            "terminated due to errors" in asm_result["stdout"]:
+        failed, run = (".int", int_result) if int_result["status"] != "ok" else (".asm", asm_result)
+        lines = (run.get("stderr") or run["stdout"]).strip().splitlines()
+        message = next((line for line in lines if line.startswith("Error")), lines[-1] if lines else "")
+        status = run["status"] if run["status"] != "ok" else "runtime error"
+        outcome, detail = "error", f"{failed} run failed ({status}): {message}"
+    elif divergence is not None:
+        outcome, detail = "diverge", describe_divergence(divergence)
+    else:
+        outcome, detail = "match", ""
+    return {
+        "name": name,
+        "source": source,
+        "inputs": list(inputs),
+        "int": int_result,
+        "asm": asm_result,
+        "outcome": outcome,
+        "divergence": divergence,
+        "detail": detail,
+    }
+
+
+def diff_program(int_file, asm_file, vectors, timeout=10, limits=None, max_steps=DEFAULT_MAX_STEPS,
+                 asm_backend="rars", daemon=None, name=None, source=None, on_result=None, cancel_event=None):
+    """
+    Run int_file (translated to C and built with gcc) and asm_file with the
+    same inputs, both at once, for each input vector, and compare their
+    output token by token. on_result(case) is called after each vector.
+    Returns the list of case dicts.
+    """
+    name = name or os.path.splitext(os.path.basename(int_file))[0]
+    limits = limits or Limits()
+    cases = []
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for number, inputs in enumerate(vectors, start=1):
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            int_run = executor.submit(run_intermediate, int_file, inputs, timeout, limits=limits)
+            asm_run = executor.submit(
+                run_assembly, asm_file, inputs, timeout, limits=limits, daemon=daemon, max_steps=max_steps,
+                backend=asm_backend
+            )
+            case = _case(f"{name} #{number}", source, inputs, int_run.result(), asm_run.result())
+            cases.append(case)
+            if on_result:
+                on_result(case)
+    return cases
+
+
+def source_vectors(source):
+    """Input vectors for a source: one per line of <name>.in, or a single empty vector."""
+    path = os.path.splitext(source)[0] + ".in"
+    return read_input_vectors(path) if os.path.exists(path) else [[]]
+
+
+def diff_corpus(compiler_file, sources, workers=None, extra_args="", timeout=10, limits=None,
+                max_steps=DEFAULT_MAX_STEPS, asm_backend="rars", use_daemon=True, on_result=None,
+                cancel_event=None):
+    """
+    Compile every source (in parallel, as batch compile does), then compare
+    each program's .int and .asm runs for every vector from source_vectors,
+    several programs at once, each thread on its own warm RARS host when
+    use_daemon is set. on_result(case) is called as each vector is
+    compared. Returns a summary dict with the cases in source order, the
+    match/diverge/error counts and the wall time.
+    """
+    start = time.perf_counter()
+    compiled = compile_batch(compiler_file, sources, workers=workers, extra_args=extra_args,
+                             cancel_event=cancel_event)
+    workers = compiled["workers"]
+    per_source = {}
+    daemons = DaemonPool(workers, use_daemon and asm_backend == "rars")
+
+    def diff_one(result):
+        source = result["source"]
+        name = os.path.basename(source)
+        artifacts = result.get("artifacts", {})
+        if result["status"] != "ok" or not artifacts.get("int") or not artifacts.get("asm"):
+            case = _case(name, source, [], None, None)
+            case["detail"] = "compile failed" if result["status"] != "ok" else "compiler produced no .int/.asm"
+            if on_result:
+                on_result(case)
+            return [case]
+        with daemons.daemon() as daemon:
+            return diff_program(
+                artifacts["int"], artifacts["asm"], source_vectors(source), timeout, limits, max_steps,
+                asm_backend, daemon, name=name, source=source, on_result=on_result, cancel_event=cancel_event
+            )
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(diff_one, result): result["source"] for result in compiled["results"]}
+            for future in as_completed(futures):
+                per_source[futures[future]] = future.result()
+    finally:
+        daemons.close()
+
+    cases = [case for source in sources for case in per_source.get(source, [])]
+    return summarize(cases, len(sources), workers, time.perf_counter() - start)
+
+
+def summarize(cases, sources, workers, wall_time):
+    """A summary dict for compared cases: the cases plus match/diverge/error counts."""
+    return {
+        "cases": cases,
+        "sources": sources,
+        "workers": workers,
+        "wall_time": wall_time,
+        "matched": sum(1 for case in cases if case["outcome"] == "match"),
+        "diverged": sum(1 for case in cases if case["outcome"] == "diverge"),
+        "errors": sum(1 for case in cases if case["outcome"] == "error"),
+    }
+
+
+def summary_line(summary):
+    return (
+        f"{summary['matched']} matched, {summary['diverged']} diverged, {summary['errors']} error(s) "
+        f"over {summary['sources']} source(s) with {summary['workers']} worker(s): "
+        f"wall {summary['wall_time']:.2f} s"
+    )
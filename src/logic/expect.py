@@ -0,0 +1,132 @@
+import codecs
+import re
+import socket
+import time
+
+ANSI_CSI_RE = re.compile(r"\x1b\[[0-9;?]*[ -/]*[@-~]")
+# Terminal title and similar OSC strings, which many shell prompts set.
+ANSI_OSC_RE = re.compile(r"\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)")
+# Longest partial escape held back for the next chunk; longer ones are passed through.
+_MAX_PENDING_ESCAPE = 256
+
+
+def strip_ansi(s: str) -> str:
+    return ANSI_CSI_RE.sub("", ANSI_OSC_RE.sub("", s))
+
+
+class ExpectError(Exception):
+    pass
+
+
+class ExpectTimeout(ExpectError):
+    pass
+
+
+# Pass as one of the patterns to expect() to match the channel closing.
+EOF = object()
+
+
+class Expect:
+    """
+    Expect-style driver for an interactive paramiko channel. Output is
+    decoded, stripped of ANSI codes and kept in a buffer, so a pattern is
+    matched as soon as it is complete, even across chunk boundaries.
+    Time spent waiting is added up per step name in steps.
+    """
+
+    def __init__(self, channel, timeout=30):
+        self.channel = channel
+        self.timeout = timeout
+        self.buffer = ""
+        self.before = ""
+        self.match = None
+        self.transcript = []
+        self.steps = {}
+        self.eof = False
+        self._pending = ""
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+
+    def send(self, text):
+        self.channel.sendall(text.encode())
+
+    def sendline(self, text=""):
+        self.send(text + "\n")
+
+    def _feed(self, text, final=False):
+        text = self._pending + text
+        self._pending = ""
+        if not final:
+            # Hold back an escape sequence or a CR/LF pair cut off by the chunk boundary.
+            escape = text.rfind("\x1b")
+            if escape != -1 and len(text) - escape < _MAX_PENDING_ESCAPE and not (
+                ANSI_CSI_RE.match(text, escape) or ANSI_OSC_RE.match(text, escape)
+            ):
+                text, self._pending = text[:escape], text[escape:]
+            elif text.endswith("\r"):
+                text, self._pending = text[:-1], "\r"
+        text = strip_ansi(text).replace("\r\n", "\n")
+        self.buffer += text
+        self.transcript.append(text)
+
+    def _read(self, deadline):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        self.channel.settimeout(remaining)
+        try:
+            data = self.channel.recv(65536)
+        except socket.timeout:
+            return False
+        if data:
+            self._feed(self._decoder.decode(data))
+        else:
+            self.eof = True
+            self._feed(self._decoder.decode(b"", final=True), final=True)
+        return True
+
+    def expect(self, patterns, timeout=None, step=None):
+        """
+        Wait until one of patterns (regex strings, compiled patterns or EOF)
+        matches the buffered output and return its index; the earliest match
+        in the buffer wins. Consumes the output up to the end of the match,
+        keeping what came before it in before. Raises ExpectTimeout after
+        timeout seconds, or ExpectError if the channel closes first.
+        """
+        patterns = [re.compile(p) if isinstance(p, str) else p for p in patterns]
+        timeout = self.timeout if timeout is None else timeout
+        step = step or " or ".join(p.pattern for p in patterns if p is not EOF)
+        start = time.monotonic()
+        try:
+            while True:
+                best = None
+                for index, pattern in enumerate(patterns):
+                    if pattern is EOF:
+                        continue
+                    match = pattern.search(self.buffer)
+                    if match and (best is None or match.start() < best[1].start()):
+                        best = (index, match)
+                if best is not None:
+                    index, self.match = best
+                    self.before = self.buffer[:self.match.start()]
+                    self.buffer = self.buffer[self.match.end():]
+                    return index
+                if self.eof:
+                    if EOF in patterns:
+                        self.before, self.buffer, self.match = self.buffer, "", None
+                        return patterns.index(EOF)
+                    raise ExpectError(f"connection closed while waiting for {step}{self._tail()}")
+                if not self._read(start + timeout):
+                    raise ExpectTimeout(f"timed out after {timeout:g} s waiting for {step}{self._tail()}")
+        finally:
+            self.steps[step] = self.steps.get(step, 0.0) + time.monotonic() - start
+
+    def _tail(self):
+        tail = self.buffer.strip()[-200:]
+        return f" (last output: {tail!r})" if tail else ""
+
+    def output(self):
+        """Everything received so far, with ANSI codes removed."""
+        return "".join(self.transcript)
+
+    def format_steps(self):
+        return " · ".join(f"{step} {seconds:.2f} s" for step, seconds in self.steps.items())
@@ -0,0 +1,277 @@
+import atexit
+import codecs
+import os
+import queue
+import select
+import signal
+import struct
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+
+from src.logic.int_to_c_translator import FORK_SERVER_ENV
+from src.logic.limited_exec import Limits, classify_end
+
+# Seconds a server may take to start and report ready.
+STARTUP_TIMEOUT = 5
+_REQUEST = struct.Struct("=qqq")
+_PID = struct.Struct("=q")
+_REPLY = struct.Struct("=qqqq")
+
+
+class ForkServerError(Exception):
+    pass
+
+
+def _read_exact(fd, size, deadline=None):
+    chunks = []
+    while size:
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise TimeoutError
+        data = os.read(fd, size)
+        if not data:
+            raise ForkServerError("fork server closed its reply pipe")
+        chunks.append(data)
+        size -= len(data)
+    return b"".join(chunks)
+
+
+def _kill_group(pid):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+class ForkServer:
+    """
+    An executable built with fork_server=True, started once: it is loaded,
+    linked and initialised a single time, then forks a fresh child for each
+    run(). Runs go one at a time. run() returns None when the server cannot
+    be used, so callers fall back to starting the executable directly.
+    command is the executable, possibly behind a wrapper such as stdbuf.
+    """
+
+    def __init__(self, command):
+        self.command = list(command)
+        self.process = None
+        self.request = None
+        self.reply = None
+        self.lock = threading.Lock()
+        self.failed = False
+        self.restarts = 0
+
+    def _start(self):
+        request_read, request_write = os.pipe()
+        reply_read, reply_write = os.pipe()
+        env = dict(os.environ)
+        env[FORK_SERVER_ENV] = f"{request_read},{reply_write}"
+        try:
+            process = subprocess.Popen(
+                self.command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                pass_fds=(request_read, reply_write), env=env
+            )
+        except OSError:
+            for fd in (request_read, request_write, reply_read, reply_write):
+                os.close(fd)
+            self.failed = True
+            return False
+        os.close(request_read)
+        os.close(reply_write)
+        try:
+            ready = _read_exact(reply_read, _PID.size, time.monotonic() + STARTUP_TIMEOUT)
+        except (OSError, ForkServerError, TimeoutError):
+            ready = None
+        if ready is None or _PID.unpack(ready)[0] != 0:
+            # Not a fork-server build, or it failed to start.
+            process.kill()
+            process.wait()
+            process.stdout.close()
+            process.stderr.close()
+            os.close(request_write)
+            os.close(reply_read)
+            self.failed = True
+            return False
+        self.process, self.request, self.reply = process, request_write, reply_read
+        return True
+
+    def _ensure_running(self):
+        if self.process is not None and self.process.poll() is None:
+            return True
+        if self.process is not None:
+            self._close_pipes()
+            self.restarts += 1
+        if self.failed:
+            return False
+        return self._start()
+
+    def _close_pipes(self):
+        os.close(self.request)
+        os.close(self.reply)
+        self.process.stdout.close()
+        self.process.stderr.close()
+        self.process.wait()
+        self.process = self.request = self.reply = None
+
+    def ensure_started(self):
+        """Start the server if it is not running; False if it cannot be started."""
+        with self.lock:
+            return self._ensure_running()
+
+    def run(self, inputs=None, limits=None, on_output=None, cancel_event=None):
+        """
+        Run the program once in a fresh child with inputs on stdin, under
+        limits, passing stdout to on_output(text) as it arrives. Returns a
+        dict shaped like pipeline.run_program's, or None if the server is
+        unavailable.
+        """
+        limits = limits or Limits()
+        with self.lock:
+            if not self._ensure_running():
+                return None
+            stdin = "".join(str(value) + "\n" for value in inputs or []).encode()
+            cpu = max(int(limits.cpu + 0.999), 1) if limits.cpu is not None else 0
+            start = time.perf_counter()
+            try:
+                os.write(self.request, _REQUEST.pack(cpu, limits.memory or 0, len(stdin)))
+                view = memoryview(stdin)
+                while view:
+                    view = view[os.write(self.request, view):]
+                (pid,) = _PID.unpack(_read_exact(self.reply, _PID.size))
+                if pid < 0:
+                    raise ForkServerError("fork failed")
+                return self._collect(pid, start, limits, on_output, cancel_event)
+            except (OSError, ForkServerError, struct.error):
+                # The server died under this run: let the caller run it the direct way.
+                self.process.kill()
+                self._close_pipes()
+                self.restarts += 1
+                return None
+
+    def _collect(self, pid, start, limits, on_output, cancel_event):
+        """Stream the child's output until the server reports it finished."""
+        stdout, stderr = [], []
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        channels = {self.process.stdout.fileno(): stdout, self.process.stderr.fileno(): stderr}
+        deadline = start + limits.wall if limits.wall is not None else None
+        output_bytes = 0
+        stopped_for = None
+        reply = None
+        while True:
+            if stopped_for is None:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    stopped_for = "wall"
+                elif cancel_event is not None and cancel_event.is_set():
+                    stopped_for = "cancel"
+                if stopped_for is not None:
+                    _kill_group(pid)
+            # Once the reply is in, the child has exited: drain what it left in the pipes.
+            ready, _, _ = select.select(
+                list(channels) + ([self.reply] if reply is None else []), [], [], 0.05 if reply is None else 0
+            )
+            if reply is not None and not ready:
+                break
+            for fd in ready:
+                if fd == self.reply:
+                    reply = _REPLY.unpack(_read_exact(self.reply, _REPLY.size))
+                    continue
+                data = os.read(fd, 65536)
+                if not data:
+                    raise ForkServerError("fork server exited")
+                if stopped_for == "output":
+                    continue
+                if limits.output is not None and stopped_for is None and output_bytes + len(data) > limits.output:
+                    data = data[:max(limits.output - output_bytes, 0)]
+                    stopped_for = "output"
+                    _kill_group(pid)
+                output_bytes += len(data)
+                channels[fd].append(data)
+                if on_output is not None and fd == self.process.stdout.fileno():
+                    on_output(decoder.decode(data))
+
+        status, user, system, max_rss = reply
+        stats = {
+            "reason": "normal", "limit": None, "returncode": os.waitstatus_to_exitcode(status), "signal": None,
+            "wall": time.perf_counter() - start, "user": user / 1e6, "sys": system / 1e6,
+            "max_rss": max_rss * 1024, "output_bytes": output_bytes, "fork_server": True,
+        }
+        classify_end(stats, status, stopped_for, limits)
+        if stats["reason"] == "timeout":
+            status = "timeout"
+        elif stats["reason"] == "normal" and stats["returncode"] == 0:
+            status = "ok"
+        else:
+            status = "error"
+        return {
+            "stdout": b"".join(stdout).decode("utf-8", "replace"),
+            "stderr": b"".join(stderr).decode("utf-8", "replace"),
+            "returncode": stats["returncode"],
+            "status": status,
+            "duration": stats["wall"],
+            "stats": stats,
+        }
+
+    def close(self):
+        """Close the request pipe, which ends the server after its current run."""
+        with self.lock:
+            process, self.process = self.process, None
+            if process is None:
+                return
+            os.close(self.request)
+            os.close(self.reply)
+            self.request = self.reply = None
+        try:
+            process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+class ForkServerPool:
+    """
+    One ForkServer per worker thread, handed out like rars_daemon.DaemonPool.
+    A disabled pool hands out None.
+    """
+
+    def __init__(self, command, size, enabled=True):
+        self.servers = queue.Queue()
+        for _ in range(size):
+            self.servers.put(ForkServer(command) if enabled else None)
+
+    @contextmanager
+    def server(self):
+        server = self.servers.get()
+        try:
+            yield server
+        finally:
+            self.servers.put(server)
+
+    def close(self):
+        while not self.servers.empty():
+            server = self.servers.get()
+            if server is not None:
+                server.close()
+
+
+_servers = {}
+_servers_lock = threading.Lock()
+
+
+def get_fork_server(executable):
+    """The shared ForkServer for executable, closed when the application exits."""
+    with _servers_lock:
+        if executable not in _servers:
+            _servers[executable] = ForkServer([executable])
+            atexit.register(_servers[executable].close)
+        return _servers[executable]
+
+
+def served_executables():
+    """The executables that have a shared ForkServer, which may restart them at any time."""
+    with _servers_lock:
+        return set(_servers)
@@ -0,0 +1,60 @@
+import threading
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from src.logic.limited_exec import summary_line
+from src.logic.pipeline import run_program
+
+class ForkServerExecutor(QThread):
+    """
+    Runs a gcc-built .int program through its fork server (fork_server.ForkServer)
+    in a separate thread: the server stays up between runs, so each run only
+    pays for a fork. Falls back to starting the executable when the server
+    cannot be used.
+    """
+    output_signal = pyqtSignal(str)
+    # Raw program output, chunk by chunk.
+    stream_signal = pyqtSignal(str)
+
+    def __init__(self, server, executable, inputs=None, limits=None, cache=None, source_file=None, parent=None):
+        super().__init__(parent)
+        self.server = server
+        self.executable = executable
+        self.inputs = inputs or []
+        self.limits = limits
+        # A result_cache.ResultCache that replays earlier runs with the same inputs.
+        self.cache = cache
+        # The .int the executable was built from; the cache checks it for the nondeterministic mark.
+        self.source_file = source_file
+        self.cancel_event = threading.Event()
+        self.result = None
+
+    def run(self):
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(self.executable, "gcc", self.inputs, self.limits, source_file=self.source_file)
+        self.result = self.cache.lookup(key) if self.cache is not None else None
+        if self.result is not None:
+            self.stream_signal.emit(self.result["stdout"])
+        else:
+            self.run_live()
+            if self.cache is not None:
+                self.cache.store(key, self.result)
+        if self.result["stderr"]:
+            self.stream_signal.emit(self.result["stderr"])
+        if self.result["status"] == "ok":
+            self.output_signal.emit("Intermediate code execution completed successfully")
+        else:
+            self.output_signal.emit(f"Intermediate code execution stopped ({self.result['stats']['reason']}).")
+        self.output_signal.emit(summary_line(self.result["stats"]))
+
+    def run_live(self):
+        self.result = self.server.run(self.inputs, self.limits, self.stream_signal.emit, self.cancel_event)
+        if self.result is None:
+            self.output_signal.emit("Fork server unavailable; starting the program directly.")
+            self.result = run_program(
+                [self.executable], self.inputs, limits=self.limits,
+                on_output=self.stream_signal.emit, cancel_event=self.cancel_event
+            )
+
+    def stop(self):
+        self.cancel_event.set()
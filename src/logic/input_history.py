@@ -0,0 +1,44 @@
+import json
+import os
+import threading
+
+
+class InputHistory:
+    """
+    The last input vector given to each program, kept in a small JSON file so
+    a run can be replayed with the same inputs, also after a restart.
+    Programs are keyed by absolute path.
+    """
+
+    def __init__(self, path=os.path.join(".cache", "inputs.json")):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, "r") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, program_path):
+        """The last inputs for program_path as a list of strings, or None."""
+        with self._lock:
+            inputs = self._load().get(os.path.abspath(program_path))
+        return list(inputs) if inputs is not None else None
+
+    def remember(self, program_path, inputs):
+        with self._lock:
+            entries = self._load()
+            entries[os.path.abspath(program_path)] = [str(value) for value in inputs]
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                tmp = self.path + ".tmp"
+                with open(tmp, "w") as f:
+                    json.dump(entries, f, indent=1)
+                os.replace(tmp, self.path)
+            except OSError:
+                pass
@@ -0,0 +1,193 @@
+import time
+
+from src.logic.quads import ASSIGN, ARITHMETIC, RELATIONAL, IGNORED, FUNCTIONS, is_number, not_enough_fields
+
+# Opcodes of the pre-resolved instruction array.
+(OP_ASSIGN, OP_ADD, OP_SUB, OP_MUL, OP_DIV,
+ OP_EQ, OP_NE, OP_LE, OP_GE, OP_GT, OP_LT,
+ OP_JUMP, OP_IN, OP_OUT, OP_NOP) = range(15)
+
+_OPCODES = {
+    ASSIGN: OP_ASSIGN, '+': OP_ADD, '-': OP_SUB, '*': OP_MUL, '/': OP_DIV,
+    '=': OP_EQ, '<>': OP_NE, '<=': OP_LE, '>=': OP_GE, '>': OP_GT, '<': OP_LT,
+    'jump': OP_JUMP, 'in': OP_IN, 'out': OP_OUT,
+}
+
+
+def wrap32(value):
+    """Wrap a Python int to a C 32-bit signed int."""
+    return ((value + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+
+
+def c_div(a, b):
+    """C integer division: truncates toward zero."""
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+
+class CompiledProgram:
+    """
+    A Program lowered for execution: every operand is an index into one value
+    array (constants occupy pre-filled slots that are never written) and every
+    jump target is a quad index.
+    """
+    __slots__ = ("code", "initial", "names")
+
+    def __init__(self, code, initial, names):
+        self.code = code
+        self.initial = initial
+        self.names = names
+
+
+def compile_program(program):
+    """
+    Resolve labels to indices and variables/constants to slots.
+    Raises ValueError for quads the C translation would also reject.
+    """
+    slots = {}
+    initial = []
+    names = []
+
+    def slot(operand):
+        index = slots.get(operand)
+        if index is None:
+            index = slots[operand] = len(initial)
+            initial.append(wrap32(int(operand)) if is_number(operand) else 0)
+            names.append(operand)
+        return index
+
+    def target(label):
+        index = program.labels.get(label)
+        if index is None:
+            raise ValueError(f"Error: jump to undefined label {label}")
+        return index
+
+    code = []
+    for quad in program.quads:
+        op = quad.op
+        if op == ASSIGN:
+            if quad.nfields <= 4:
+                raise not_enough_fields(quad, "assignment")
+            code.append((OP_ASSIGN, slot(quad.x), 0, slot(quad.z)))
+        elif op in ARITHMETIC:
+            if quad.nfields <= 4:
+                raise not_enough_fields(quad, "arithmetic")
+            code.append((_OPCODES[op], slot(quad.x), slot(quad.y), slot(quad.z)))
+        elif op in RELATIONAL:
+            if quad.nfields <= 4:
+                raise not_enough_fields(quad, "comparison")
+            code.append((_OPCODES[op], slot(quad.x), slot(quad.y), target(quad.z)))
+        elif op == 'jump':
+            if quad.nfields <= 4:
+                raise not_enough_fields(quad, "jump")
+            code.append((OP_JUMP, 0, 0, target(quad.z)))
+        elif op in ('in', 'out') and quad.nfields <= 2:
+            raise not_enough_fields(quad, op)
+        elif op == 'in':
+            code.append((OP_IN, slot(quad.x), 0, 0))
+        elif op == 'out':
+            code.append((OP_OUT, slot(quad.x), 0, 0))
+        elif op in IGNORED:
+            # halt, like begin_block/end_block, produces no C statement, so the
+            # C program falls through to the end of main; do the same here.
+            code.append((OP_NOP, 0, 0, 0))
+        elif op in FUNCTIONS:
+            raise ValueError(f"Error: functions not supported: {op}")
+        else:
+            raise ValueError(f"Error: unknown operator in line: {quad.fields()}")
+    return CompiledProgram(code, initial, names)
+
+
+def interpret(compiled, inputs=(), on_output=None, max_steps=None, timeout=None, cancel_event=None):
+    """
+    Run a CompiledProgram with the given input values (consumed by `in` in
+    order, like scanf("%d") reading stdin). on_output(line) is called for each
+    `out`. Execution stops after max_steps quads, timeout seconds or once
+    cancel_event is set. Returns a dict with stdout, status ('ok', 'error',
+    'step-limit', 'timeout' or 'cancelled'), error, steps and duration.
+    """
+    code = compiled.code
+    values = list(compiled.initial)
+    tokens = iter(" ".join(str(v) for v in inputs).split())
+    stdin_ok = True
+    out = []
+    n = len(code)
+    pc = 0
+    steps = 0
+    limit = max_steps if max_steps else -1
+    status, error = "ok", ""
+    start = time.perf_counter()
+    deadline = start + timeout if timeout else None
+
+    while pc < n:
+        if steps == limit:
+            status = "step-limit"
+            break
+        steps += 1
+        if not steps & 0xFFFF:
+            if deadline is not None and time.perf_counter() > deadline:
+                status = "timeout"
+                break
+            if cancel_event is not None and cancel_event.is_set():
+                status = "cancelled"
+                break
+        op, a, b, c = code[pc]
+        pc += 1
+        if op == OP_ASSIGN:
+            values[c] = values[a]
+        elif op == OP_ADD:
+            values[c] = wrap32(values[a] + values[b])
+        elif op == OP_SUB:
+            values[c] = wrap32(values[a] - values[b])
+        elif op == OP_MUL:
+            values[c] = wrap32(values[a] * values[b])
+        elif op == OP_DIV:
+            if values[b] == 0:
+                status, error = "error", "Floating point exception (division by zero)"
+                break
+            values[c] = wrap32(c_div(values[a], values[b]))
+        elif op == OP_JUMP:
+            pc = c
+        elif op == OP_LT:
+            if values[a] < values[b]:
+                pc = c
+        elif op == OP_GT:
+            if values[a] > values[b]:
+                pc = c
+        elif op == OP_LE:
+            if values[a] <= values[b]:
+                pc = c
+        elif op == OP_GE:
+            if values[a] >= values[b]:
+                pc = c
+        elif op == OP_EQ:
+            if values[a] == values[b]:
+                pc = c
+        elif op == OP_NE:
+            if values[a] != values[b]:
+                pc = c
+        elif op == OP_IN:
+            # scanf leaves the variable untouched at end of input or on a
+            # non-number, and a failed conversion blocks all later reads.
+            if stdin_ok:
+                token = next(tokens, None)
+                if token is None:
+                    stdin_ok = False
+                else:
+                    try:
+                        values[a] = wrap32(int(token))
+                    except ValueError:
+                        stdin_ok = False
+        elif op == OP_OUT:
+            line = f"{values[a]}\n"
+            out.append(line)
+            if on_output:
+                on_output(line)
+
+    return {
+        "stdout": "".join(out),
+        "status": status,
+        "error": error,
+        "steps": steps,
+        "duration": time.perf_counter() - start,
+    }
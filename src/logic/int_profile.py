@@ -0,0 +1,64 @@
+import os
+import tempfile
+
+from src.logic.int_to_c_translator import PROFILE_ENV
+
+
+def profile_map(program):
+    """[line number, quad text] for each quad, indexed like the profiled C counters."""
+    return [[quad.line_no, quad.text()] for quad in program.quads]
+
+
+def new_profile_file():
+    """Create an empty file for a profiled run to write its counters to."""
+    fd, path = tempfile.mkstemp(prefix="int_profile_", suffix=".txt")
+    os.close(fd)
+    return path
+
+
+def profile_env(path, base=None):
+    """A copy of base (or os.environ) telling a profiled program where to write."""
+    env = dict(os.environ if base is None else base)
+    env[PROFILE_ENV] = path
+    return env
+
+
+def read_hits(path):
+    """Read the "<quad index> <count>" lines a profiled program wrote."""
+    hits = {}
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2:
+                    hits[int(parts[0])] = int(parts[1])
+    except (OSError, ValueError):
+        pass
+    return hits
+
+
+def hit_table(quad_map, hits):
+    """
+    Rows of {'line', 'quad', 'hits', 'share'} for every executed quad,
+    most executed first; share is the fraction of all quad executions.
+    """
+    total = sum(hits.values())
+    rows = []
+    for index, count in hits.items():
+        if 0 <= index < len(quad_map):
+            line_no, text = quad_map[index]
+            rows.append({"line": line_no, "quad": text, "hits": count, "share": count / total})
+    rows.sort(key=lambda row: (-row["hits"], row["line"]))
+    return rows
+
+
+def format_hit_table(rows, limit=20):
+    """The rows as a fixed-width text table, truncated to the limit hottest quads."""
+    if not rows:
+        return "No profile data (the program did not exit normally)."
+    lines = [f"{'Hits':>12}  {'%':>6}  {'Line':>6}  Quad"]
+    for row in rows[:limit]:
+        lines.append(f"{row['hits']:>12}  {row['share'] * 100:>5.1f}%  {row['line']:>6}  {row['quad']}")
+    if len(rows) > limit:
+        lines.append(f"... {len(rows) - limit} more quads executed")
+    return "\n".join(lines)
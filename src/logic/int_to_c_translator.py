@@ -1,171 +1,264 @@
-import sys
+from src.logic.quads import (
+    ASSIGN, ARITHMETIC, RELATIONAL, IGNORED, FUNCTIONS, not_enough_fields, parse_program
+)
 
-def write_to_c(filename, outfile, output_box=None):
+C_RELATIONAL = {'=': '==', '<>': '!=', '<=': '<=', '>=': '>=', '>': '>', '<': '<'}
+ARITHMETIC_NAMES = {'+': 'addition', '-': 'subtraction', '*': 'multiplication', '/': 'division'}
+
+# Number of C lines buffered before each write to the output file.
+WRITE_BATCH = 4096
+
+# Environment variable naming the file a profiled program writes its counters to.
+PROFILE_ENV = "INT_PROFILE_OUT"
+
+# Counter dump for profiled programs: at exit, and before dying on SIGFPE/SIGTERM/SIGXCPU.
+PROFILE_RUNTIME = r"""#include <stdlib.h>
+#include <signal.h>
+
+static unsigned long long int_hits[%d];
+
+static void int_dump_hits(void)
+{
+    const char *path = getenv("%s");
+    FILE *f = path ? fopen(path, "w") : stderr;
+    int i;
+    if (!f) return;
+    for (i = 0; i < %d; i++)
+        if (int_hits[i]) fprintf(f, "%%d %%llu\n", i, int_hits[i]);
+    if (f != stderr) fclose(f);
+}
+
+static void int_dump_hits_on_signal(int sig)
+{
+    int_dump_hits();
+    signal(sig, SIG_DFL);
+    raise(sig);
+}
+"""
+
+# Environment variable that puts a fork-server build into server mode: "<request fd>,<reply fd>".
+FORK_SERVER_ENV = "INT_FORK_SERVER"
+
+# Fork-server harness: without $INT_FORK_SERVER the program just runs. With it,
+# the process stops after start-up and runs the program in a fresh child per
+# request. A request is three long longs (CPU seconds, address-space bytes and
+# the stdin size, 0 for no limit) followed by stdin; the reply is the child's
+# pid once it is forked, then its wait status, user and system time in
+# microseconds and peak RSS in kilobytes. "0" is sent once the server is ready.
+FORK_SERVER_RUNTIME = r"""#include <stdlib.h>
+#include <unistd.h>
+#include <sys/types.h>
+#include <sys/wait.h>
+#include <sys/time.h>
+#include <sys/resource.h>
+
+static int int_transfer(int fd, char *data, long long size, int writing)
+{
+    while (size > 0) {
+        ssize_t n = writing ? write(fd, data, size) : read(fd, data, size);
+        if (n <= 0) return -1;
+        data += n;
+        size -= n;
+    }
+    return 0;
+}
+
+static int int_fork_server(int (*program)(void))
+{
+    const char *fds = getenv("%s");
+    int request_fd, reply_fd, status;
+    long long request[3], reply[4] = {0, 0, 0, 0};
+    struct rusage usage;
+    struct rlimit limit;
+    if (!fds || sscanf(fds, "%%d,%%d", &request_fd, &reply_fd) != 2)
+        return program();
+    if (int_transfer(reply_fd, (char *) reply, sizeof reply[0], 1)) return 1;
+    while (!int_transfer(request_fd, (char *) request, sizeof request, 0)) {
+        FILE *input = tmpfile();
+        char *data = malloc(request[2] + 1);
+        pid_t pid;
+        if (!input || !data || int_transfer(request_fd, data, request[2], 0)) return 1;
+        fwrite(data, 1, request[2], input);
+        fflush(input);
+        rewind(input);
+        free(data);
+        pid = fork();
+        if (pid == 0) {
+            close(request_fd);
+            close(reply_fd);
+            dup2(fileno(input), 0);
+            setpgid(0, 0);
+            if (request[0] > 0) {
+                limit.rlim_cur = request[0];
+                limit.rlim_max = request[0] + 1;
+                setrlimit(RLIMIT_CPU, &limit);
+            }
+            if (request[1] > 0) {
+                limit.rlim_cur = limit.rlim_max = request[1];
+                setrlimit(RLIMIT_AS, &limit);
+            }
+            exit(program());
+        }
+        fclose(input);
+        reply[0] = pid;
+        if (int_transfer(reply_fd, (char *) reply, sizeof reply[0], 1)) return 1;
+        if (pid < 0) continue;
+        wait4(pid, &status, 0, &usage);
+        reply[0] = status;
+        reply[1] = usage.ru_utime.tv_sec * 1000000LL + usage.ru_utime.tv_usec;
+        reply[2] = usage.ru_stime.tv_sec * 1000000LL + usage.ru_stime.tv_usec;
+        reply[3] = usage.ru_maxrss;
+        if (int_transfer(reply_fd, (char *) reply, sizeof reply, 1)) return 1;
+    }
+    return 0;
+}
+"""
+
+
+def quad_to_c(quad):
+    """
+    Translate one quad to its C statement (without the label).
+    Raises ValueError with a log message for quads that cannot be translated.
+    """
+    op = quad.op
+    if op == ASSIGN:
+        if quad.nfields > 4:
+            return quad.z + '=' + quad.x + ';'
+        raise not_enough_fields(quad, "assignment")
+    if op in ARITHMETIC:
+        if quad.nfields > 4:
+            return quad.z + '=' + quad.x + op + quad.y + ';'
+        raise not_enough_fields(quad, ARITHMETIC_NAMES[op])
+    if op == 'jump':
+        if quad.nfields > 4:
+            return 'goto L' + quad.z + ';'
+        raise not_enough_fields(quad, "jump")
+    if op in RELATIONAL:
+        if quad.nfields > 4:
+            return 'if (' + quad.x + ' ' + C_RELATIONAL[op] + ' ' + quad.y + ') goto L' + quad.z + ';'
+        raise not_enough_fields(quad, "comparison")
+    if op == 'out':
+        if quad.nfields > 2:
+            return 'printf("%d\\n",' + quad.x + ');'
+        raise not_enough_fields(quad, "out")
+    if op == 'in':
+        if quad.nfields > 2:
+            return 'scanf("%d",&' + quad.x + ');'
+        raise not_enough_fields(quad, "in")
+    if op in IGNORED:
+        # These operations are ignored.
+        return ''
+    if op in FUNCTIONS:
+        raise ValueError(f"Error: functions not supported: {op}")
+    raise ValueError(f"Error: unknown operator in line: {quad.fields()}")
+
+
+def generate_c(program, labels=None, profile=False, fork_server=False):
+    """
+    Yield the C translation of a parsed program in chunks of lines.
+    If labels is given, only those labels are emitted (e.g. just the jump
+    targets) and quads that produce no statement are left out entirely.
+    With profile, every quad counts its executions in int_hits[<quad index>]
+    and the nonzero counters are written as "<index> <count>" lines at exit,
+    to the file named by $INT_PROFILE_OUT or else to stderr.
+    With fork_server, the program body becomes int_program() and main hands
+    it to the fork-server harness (see FORK_SERVER_RUNTIME).
+    """
+    lines = ["#include <stdio.h>"]
+    if profile:
+        size = max(len(program.quads), 1)
+        lines.append(PROFILE_RUNTIME % (size, PROFILE_ENV, size))
+    if fork_server:
+        lines.append(FORK_SERVER_RUNTIME % FORK_SERVER_ENV)
+    lines.extend(["", "static int int_program(void)" if fork_server else "int main()", "{"])
+    lines.extend("int " + name + " ;" for name in program.variables)
+    lines.append("")
+    if profile:
+        lines.append("atexit(int_dump_hits);")
+        lines.append("signal(SIGFPE, int_dump_hits_on_signal);")
+        lines.append("signal(SIGTERM, int_dump_hits_on_signal);")
+        lines.append("signal(SIGXCPU, int_dump_hits_on_signal);")
+    for index, quad in enumerate(program.quads):
+        statement = quad_to_c(quad)
+        if profile:
+            statement = f"int_hits[{index}]++; " + statement
+        if labels is None:
+            lines.append('L' + quad.label + ': ' + statement)
+        elif quad.label in labels:
+            lines.append('L' + quad.label + ': ' + statement)
+        elif statement:
+            lines.append(statement)
+        if len(lines) >= WRITE_BATCH:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if fork_server:
+        lines.extend(["return 0;", "}", "", "int main(void)", "{", "return int_fork_server(int_program);"])
+    lines.append("}\n")
+    yield "\n".join(lines) + "\n"
+
+
+def c_line_count(program, labels=None):
+    """The number of lines translate_to_c(program, labels) produces, counted without translating."""
+    if labels is None:
+        body = len(program.quads)
+    else:
+        body = sum(1 for quad in program.quads if quad.label in labels or quad.op not in IGNORED)
+    # The include, blank, main and brace lines around the declarations and the body.
+    return len(program.variables) + body + 7
+
+
+def translate_to_c(program, labels=None, profile=False, fork_server=False):
+    """Return the whole C translation of a parsed program as one string."""
+    return "".join(generate_c(program, labels, profile, fork_server))
+
+
+def write_to_c(filename, outfile, output_box=None, program=None):
     """
     Reads an intermediate (.int) file and writes a translated C program to outfile,
-    using your professor's conversion logic. Logs messages to output_box if provided.
+    using your professor's conversion logic. Logs messages to output_box if provided
+    (anything with an append method). Returns True once the C file is complete.
+    An already parsed program can be passed to skip reading filename again.
     """
     def log(message):
         if output_box is not None:
             output_box.append(message)
         else:
             print(message)
-    
-    def add_to_list(lst, x):
+
+    if program is None:
         try:
-            # Try converting to int or float to see if it is numerical.
-            int(x)
-            float(x)
-            numerical = True
-        except:
-            numerical = False
-        if x not in lst and not numerical:
-            lst.append(x)
-        return lst
-
-    variables = []
+            program = parse_program(filename)
+        except Exception as e:
+            log(f"Error reading input file '{filename}': {e}")
+            return False
 
     try:
         fout = open(outfile, 'w')
     except Exception as e:
         log(f"Error opening output file '{outfile}': {e}")
-        return
-
-    print("#include <stdio.h>", file=fout)
-    print("\nint main()", file=fout)
-    print("{", file=fout)
+        return False
 
-    # First pass: determine variable declarations.
     try:
-        with open(filename, 'r') as file:
-            for s in file:
-                # Replace ':=' temporarily with '#' to avoid conflict with ':' splitting.
-                s = s.replace(':=', "#").replace(":", ',')
-                words = s.split(',')
-                # Restore ':=' and also replace '@' with '$'
-                for i, w in enumerate(words):
-                    words[i] = w.strip().replace('#', ':=').replace('@', '$')
-                if len(words) < 2:
-                    continue
-                if words[1] == ':=':
-                    variables = add_to_list(variables, words[2])
-                    if len(words) > 4:
-                        variables = add_to_list(variables, words[4])
-                if words[1] in ['+', '-', '*', '/']:
-                    variables = add_to_list(variables, words[2])
-                    if len(words) > 3:
-                        variables = add_to_list(variables, words[3])
-                    if len(words) > 4:
-                        variables = add_to_list(variables, words[4])
-                if words[1] in ['=', '<>', '<=', '>=', '>', '<']:
-                    variables = add_to_list(variables, words[2])
-                    if len(words) > 3:
-                        variables = add_to_list(variables, words[3])
-    except Exception as e:
-        log(f"Error reading input file '{filename}' during variable declaration pass: {e}")
-        fout.close()
-        return
-
-    for x in variables:
-        print("int", x, ';', file=fout)
-    print(file=fout)
-
-    # Second pass: translate each line.
-    try:
-        with open(filename, 'r') as file:
-            for s in file:
-                s = s.replace(':=', "#").replace(":", ',')
-                words = s.split(',')
-                for i, w in enumerate(words):
-                    words[i] = w.strip().replace('#', ':=').replace('@', '$')
-                if len(words) < 2:
-                    continue
-                # Write the label.
-                print('L' + words[0] + ': ', end='', file=fout)
-                if words[1] == ':=':
-                    if len(words) > 4:
-                        print(words[4] + '=' + words[2] + ';', end='', file=fout)
-                    else:
-                        log(f"Error: Not enough fields in assignment line: {s.strip()}")
-                        fout.close()
-                        return
-                elif words[1] == '+':
-                    if len(words) > 3:
-                        print(words[4] + '=' + words[2] + '+' + words[3] + ';', end='', file=fout)
-                    else:
-                        log(f"Error: Not enough fields in addition line: {s.strip()}")
-                        fout.close()
-                        return
-                elif words[1] == '-':
-                    if len(words) > 3:
-                        print(words[4] + '=' + words[2] + '-' + words[3] + ';', end='', file=fout)
-                    else:
-                        log(f"Error: Not enough fields in subtraction line: {s.strip()}")
-                        fout.close()
-                        return
-                elif words[1] == '*':
-                    if len(words) > 3:
-                        print(words[4] + '=' + words[2] + '*' + words[3] + ';', end='', file=fout)
-                    else:
-                        log(f"Error: Not enough fields in multiplication line: {s.strip()}")
-                        fout.close()
-                        return
-                elif words[1] == '/':
-                    if len(words) > 3:
-                        print(words[4] + '=' + words[2] + '/' + words[3] + ';', end='', file=fout)
-                    else:
-                        log(f"Error: Not enough fields in division line: {s.strip()}")
-                        fout.close()
-                        return
-                elif words[1] == 'jump':
-                    print('goto L' + words[4] + ';', end='', file=fout)
-                elif words[1] == '=':
-                    print('if (' + words[2] + ' == ' + words[3] + ') goto L' + words[4] + ';', end='', file=fout)
-                elif words[1] == '<>':
-                    print('if (' + words[2] + ' != ' + words[3] + ') goto L' + words[4] + ';', end='', file=fout)
-                elif words[1] == '<=':
-                    print('if (' + words[2] + ' <= ' + words[3] + ') goto L' + words[4] + ';', end='', file=fout)
-                elif words[1] == '>=':
-                    print('if (' + words[2] + ' >= ' + words[3] + ') goto L' + words[4] + ';', end='', file=fout)
-                elif words[1] == '>':
-                    print('if (' + words[2] + ' > ' + words[3] + ') goto L' + words[4] + ';', end='', file=fout)
-                elif words[1] == '<':
-                    print('if (' + words[2] + ' < ' + words[3] + ') goto L' + words[4] + ';', end='', file=fout)
-                elif words[1] == 'out':
-                    print('printf("%d\\n",' + words[2] + ');', end='', file=fout)
-                elif words[1] == 'in':
-                    print('scanf("%d",&' + words[2] + ');', end='', file=fout)
-                elif words[1] in ['begin_block', 'end_block', 'halt']:
-                    # These operations are ignored.
-                    pass
-                elif words[1] in ['par', 'call', 'retv', 'ret']:
-                    log(f"Error: functions not supported: {words[1]}")
-                    fout.close()
-                    return
-                else:
-                    log(f"Error: unknown operator in line: {words}")
-                    fout.close()
-                    return
-                print(file=fout)
+        with fout:
+            for chunk in generate_c(program):
+                fout.write(chunk)
+    except ValueError as e:
+        log(str(e))
+        return False
     except Exception as e:
         log(f"Error processing input file '{filename}' during translation: {e}")
-        fout.close()
-        return
+        return False
 
-    print('}\n', file=fout)
-    fout.close()
     log(f"Conversion complete. Generated C file saved as '{outfile}'.")
+    return True
 
-def extract_input_variables(filename):
-    inputs = []
-    try:
-        with open(filename, 'r') as file:
-            for line in file:
-                parts = line.strip().replace(':', ',').split(',')
-                if len(parts) > 2 and parts[1].strip() == 'in':
-                    var = parts[2].strip()
-                    if var not in inputs:
-                        inputs.append(var)
-    except Exception as e:
-        print(f"Error reading .int file to extract inputs: {e}")
-    return inputs
+
+def extract_input_variables(filename, program=None):
+    """Names of the variables read by `in`, in first-use order."""
+    if program is None:
+        try:
+            program = parse_program(filename)
+        except Exception as e:
+            print(f"Error reading .int file to extract inputs: {e}")
+            return []
+    return list(program.inputs)
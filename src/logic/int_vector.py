@@ -0,0 +1,135 @@
+import time
+
+import numpy as np
+
+from src.logic.int_interpreter import (
+    OP_ASSIGN, OP_ADD, OP_SUB, OP_MUL, OP_DIV,
+    OP_EQ, OP_NE, OP_LE, OP_GE, OP_GT, OP_LT,
+    OP_JUMP, OP_IN, OP_OUT
+)
+
+_COMPARE = {
+    OP_EQ: np.equal, OP_NE: np.not_equal, OP_LE: np.less_equal,
+    OP_GE: np.greater_equal, OP_GT: np.greater, OP_LT: np.less,
+}
+
+
+def _wrap32(values):
+    """Wrap int64 values to C 32-bit signed ints."""
+    return ((values + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+
+
+def read_input_matrix(path):
+    """Read one input vector per non-empty line (whitespace-separated integers)."""
+    rows = []
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                rows.append([int(token) for token in line.split()])
+    return rows
+
+
+def run_lockstep(compiled, inputs, max_steps=None):
+    """
+    Run one CompiledProgram for every row of inputs (an N x k matrix) at once.
+
+    Each row is a lane; the variable store is a (slots x N) array, so every
+    quad is executed for all lanes currently at it with one array operation.
+    Lanes that take different branches are masked: each step runs the quad at
+    the lowest program counter among live lanes, which lets lanes that went
+    round a loop fewer times wait and rejoin the others. Lanes stop on
+    reaching the end of the program, dividing by zero or exceeding max_steps.
+
+    Returns a list with one dict per lane: stdout, status ('ok', 'error' or
+    'step-limit'), error and steps, plus the total wall time as 'duration' of
+    every entry.
+    """
+    matrix = np.asarray(inputs, dtype=np.int64)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(-1, 1) if matrix.size else matrix.reshape(0, 0)
+    lanes_total, width = matrix.shape if matrix.ndim == 2 else (0, 0)
+    start = time.perf_counter()
+
+    code = compiled.code
+    n = len(code)
+    values = np.repeat(
+        np.asarray(compiled.initial, dtype=np.int64).reshape(-1, 1), lanes_total, axis=1
+    ) if compiled.initial else np.zeros((0, lanes_total), dtype=np.int64)
+    pc = np.zeros(lanes_total, dtype=np.int64)
+    live = np.ones(lanes_total, dtype=bool) if n else np.zeros(lanes_total, dtype=bool)
+    next_input = np.zeros(lanes_total, dtype=np.int64)
+    steps = np.zeros(lanes_total, dtype=np.int64)
+    status = np.array(["ok"] * lanes_total, dtype=object)
+    out_lanes, out_values = [], []
+
+    while live.any():
+        current = int(pc[live].min())
+        lanes = np.flatnonzero(live & (pc == current))
+        op, a, b, c = code[current]
+        steps[lanes] += 1
+        target = current + 1
+
+        if op == OP_ASSIGN:
+            values[c, lanes] = values[a, lanes]
+        elif op == OP_ADD:
+            values[c, lanes] = _wrap32(values[a, lanes] + values[b, lanes])
+        elif op == OP_SUB:
+            values[c, lanes] = _wrap32(values[a, lanes] - values[b, lanes])
+        elif op == OP_MUL:
+            values[c, lanes] = _wrap32(values[a, lanes] * values[b, lanes])
+        elif op == OP_DIV:
+            divisor = values[b, lanes]
+            zero = divisor == 0
+            if zero.any():
+                status[lanes[zero]] = "error"
+                live[lanes[zero]] = False
+                lanes, divisor = lanes[~zero], divisor[~zero]
+            dividend = values[a, lanes]
+            quotient = np.abs(dividend) // np.abs(divisor)
+            values[c, lanes] = _wrap32(np.where((dividend < 0) == (divisor < 0), quotient, -quotient))
+        elif op == OP_JUMP:
+            target = c
+        elif op in _COMPARE:
+            taken = _COMPARE[op](values[a, lanes], values[b, lanes])
+            pc[lanes] = np.where(taken, c, current + 1)
+            target = None
+        elif op == OP_IN:
+            # Like scanf at end of input: lanes whose vector ran out keep the old value.
+            has_input = next_input[lanes] < width
+            reading = lanes[has_input]
+            values[a, reading] = _wrap32(matrix[reading, next_input[reading]])
+            next_input[reading] += 1
+        elif op == OP_OUT:
+            out_lanes.append(lanes)
+            out_values.append(values[a, lanes].copy())
+
+        if target is not None:
+            pc[lanes] = target
+        live &= pc < n
+        if max_steps:
+            over = live & (steps >= max_steps)
+            if over.any():
+                status[over] = "step-limit"
+                live &= ~over
+
+    duration = time.perf_counter() - start
+
+    # Regroup the output events by lane, keeping each lane's order.
+    outputs = [[] for _ in range(lanes_total)]
+    if out_lanes:
+        all_lanes = np.concatenate(out_lanes)
+        all_values = np.concatenate(out_values)
+        order = np.argsort(all_lanes, kind="stable")
+        for lane, value in zip(all_lanes[order].tolist(), all_values[order].tolist()):
+            outputs[lane].append(f"{value}\n")
+
+    return [
+        {
+            "stdout": "".join(outputs[lane]),
+            "status": status[lane],
+            "error": "Floating point exception (division by zero)" if status[lane] == "error" else "",
+            "steps": int(steps[lane]),
+            "duration": duration,
+        }
+        for lane in range(lanes_total)
+    ]
@@ -0,0 +1,40 @@
+import threading
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from src.logic.pipeline import interpret_intermediate
+
+class InterpreterExecutor(QThread):
+    """
+    Runs an .int program with the in-process quad interpreter in a separate
+    thread, emitting each output line through output_signal.
+    """
+    output_signal = pyqtSignal(str)
+    # Program output, line by line with its newline.
+    stream_signal = pyqtSignal(str)
+
+    def __init__(self, int_file, inputs=None, timeout=None, parent=None):
+        super().__init__(parent)
+        self.int_file = int_file
+        self.inputs = inputs or []
+        self.timeout = timeout
+        self.cancel_event = threading.Event()
+        self.result = None
+
+    def run(self):
+        self.result = interpret_intermediate(
+            self.int_file,
+            self.inputs,
+            timeout=self.timeout,
+            on_output=self.stream_signal.emit,
+            cancel_event=self.cancel_event
+        )
+        status = self.result["status"]
+        if status == "ok":
+            self.output_signal.emit("Intermediate code execution completed successfully")
+        elif status == "error":
+            self.output_signal.emit(self.result["stderr"])
+        else:
+            self.output_signal.emit(f"Intermediate code execution stopped ({status}).")
+
+    def stop(self):
+        self.cancel_event.set()
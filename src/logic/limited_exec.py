@@ -0,0 +1,316 @@
+import argparse
+import json
+import os
+import resource
+import selectors
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# This module only uses the standard library: the executors run it as a
+# script (python limited_exec.py ... -- program), whatever the working directory.
+LIMITED_EXEC = os.path.abspath(__file__)
+
+# Seconds a program gets between SIGTERM and SIGKILL when it is stopped.
+TERM_GRACE = 1.0
+
+
+class Limits:
+    """
+    Resource limits for one run; None means unlimited.
+    cpu: CPU seconds (RLIMIT_CPU), memory: bytes of address space (RLIMIT_AS),
+    output: bytes of stdout+stderr, wall: seconds of wall-clock time.
+    """
+
+    def __init__(self, cpu=None, memory=None, output=None, wall=None):
+        self.cpu = cpu
+        self.memory = memory
+        self.output = output
+        self.wall = wall
+
+    def args(self):
+        """Command-line options for the wrapper script."""
+        args = []
+        for name in ("cpu", "memory", "output", "wall"):
+            value = getattr(self, name)
+            if value is not None:
+                args += [f"--{name}", str(value)]
+        return args
+
+
+def _set_rlimits(limits):
+    def apply():
+        if limits.cpu is not None:
+            seconds = max(int(limits.cpu + 0.999), 1)
+            # SIGXCPU at the soft limit, SIGKILL one second later.
+            resource.setrlimit(resource.RLIMIT_CPU, (seconds, seconds + 1))
+        if limits.memory is not None:
+            resource.setrlimit(resource.RLIMIT_AS, (limits.memory, limits.memory))
+    return apply
+
+
+def _feed_stdin(pipe, data):
+    try:
+        pipe.write(data)
+    except (BrokenPipeError, OSError):
+        pass
+    try:
+        pipe.close()
+    except (BrokenPipeError, OSError):
+        pass
+
+
+def peak_rss(pid):
+    """
+    The program's own peak resident set (VmHWM) in bytes, or 0 once it has exited.
+    ru_maxrss from wait4 is no substitute: it keeps the high-water mark of the
+    Python process the program was forked from.
+    """
+    try:
+        with open(f"/proc/{pid}/status", "rb") as f:
+            for line in f:
+                if line.startswith(b"VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def _signal_group(pid, sig):
+    try:
+        os.killpg(pid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def run_limited(command, limits=None, stdin=None, on_stdout=None, on_stderr=None,
+                env=None, merge_stderr=False, cancel_event=None):
+    """
+    Run command under limits, passing its output chunks (bytes) to on_stdout
+    and on_stderr as they arrive. stdin is bytes to feed, or None to inherit.
+    Stops the program with SIGTERM, then SIGKILL, on the wall limit, the
+    output limit or cancel_event.
+
+    Returns a stats dict: reason ('normal', 'timeout', 'oom', 'signal',
+    'output-limit', 'cancelled' or 'error'), limit (which limit was hit),
+    returncode, signal (name), wall, user, sys (seconds), max_rss (bytes)
+    and output_bytes.
+    """
+    limits = limits or Limits()
+    start = time.perf_counter()
+    try:
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE if stdin is not None else None,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT if merge_stderr else subprocess.PIPE,
+            env=env,
+            preexec_fn=_set_rlimits(limits),
+            start_new_session=True,
+        )
+    except OSError as e:
+        return {
+            "reason": "error", "limit": None, "returncode": None, "signal": None, "error": str(e),
+            "wall": time.perf_counter() - start, "user": 0.0, "sys": 0.0, "max_rss": 0, "output_bytes": 0,
+        }
+    if stdin is not None:
+        threading.Thread(target=_feed_stdin, args=(process.stdin, stdin), daemon=True).start()
+
+    selector = selectors.DefaultSelector()
+    selector.register(process.stdout, selectors.EVENT_READ, on_stdout)
+    if not merge_stderr:
+        selector.register(process.stderr, selectors.EVENT_READ, on_stderr)
+
+    deadline = start + limits.wall if limits.wall is not None else None
+    output_bytes = 0
+    stopped_for = None
+    kill_at = None
+    peak = 0
+    status = usage = None
+    # A program can close its output and keep running, so the limits are
+    # enforced until it has exited, not just until its pipes close.
+    poll_interval = 0.001
+    while selector.get_map() or status is None:
+        now = time.perf_counter()
+        peak = max(peak, peak_rss(process.pid))
+        if stopped_for is None:
+            if deadline is not None and now >= deadline:
+                stopped_for = "wall"
+            elif cancel_event is not None and cancel_event.is_set():
+                stopped_for = "cancel"
+            if stopped_for is not None:
+                _signal_group(process.pid, signal.SIGTERM)
+                kill_at = now + TERM_GRACE
+        if kill_at is not None and now >= kill_at:
+            _signal_group(process.pid, signal.SIGKILL)
+            kill_at = None
+
+        if not selector.get_map():
+            pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+            if pid == 0:
+                status = None
+                time.sleep(poll_interval)
+                poll_interval = min(poll_interval * 2, 0.05)
+            continue
+        for key, _ in selector.select(timeout=0.05):
+            data = os.read(key.fd, 65536)
+            if not data:
+                selector.unregister(key.fileobj)
+                continue
+            if stopped_for == "output":
+                # Already over the limit: whatever is still in the pipes is dropped.
+                continue
+            if limits.output is not None and stopped_for is None:
+                room = limits.output - output_bytes
+                if len(data) > room:
+                    data = data[:max(room, 0)]
+                    stopped_for = "output"
+                    _signal_group(process.pid, signal.SIGKILL)
+            output_bytes += len(data)
+            if data and key.data is not None:
+                key.data(data)
+    selector.close()
+
+    process.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - start
+    stats = {
+        "reason": "normal", "limit": None, "returncode": process.returncode, "signal": None,
+        "wall": wall, "user": usage.ru_utime, "sys": usage.ru_stime,
+        # Sampled while the program ran; ru_maxrss (kilobytes, an upper bound)
+        # only for runs too short to be sampled.
+        "max_rss": peak or usage.ru_maxrss * 1024, "output_bytes": output_bytes,
+    }
+    return classify_end(stats, status, stopped_for, limits)
+
+
+def classify_end(stats, status, stopped_for, limits):
+    """
+    Fill in stats' reason, limit and signal from the program's wait status
+    and what it was stopped for ('wall', 'cancel', 'output' or None).
+    """
+    cpu = stats["user"] + stats["sys"]
+    sig = os.WTERMSIG(status) if os.WIFSIGNALED(status) else None
+    if sig is not None:
+        stats["signal"] = signal.Signals(sig).name
+    if stopped_for == "wall":
+        stats.update(reason="timeout", limit="wall")
+    elif stopped_for == "cancel":
+        stats["reason"] = "cancelled"
+    elif stopped_for == "output":
+        stats.update(reason="output-limit", limit="output")
+    elif sig is None:
+        pass
+    elif sig == signal.SIGXCPU or (sig == signal.SIGKILL and limits.cpu is not None and cpu >= limits.cpu):
+        stats.update(reason="timeout", limit="cpu")
+    elif sig == signal.SIGKILL or (
+        sig == signal.SIGSEGV and limits.memory is not None and stats["max_rss"] >= limits.memory // 2
+    ):
+        # A SIGKILL we did not send comes from the kernel's OOM killer; a
+        # segfault close to the address-space limit is a failed allocation.
+        stats.update(reason="oom", limit="memory" if limits.memory is not None else None)
+    else:
+        stats["reason"] = "signal"
+    return stats
+
+
+def format_bytes(count):
+    for unit in ("B", "KB", "MB"):
+        if count < 1024:
+            return f"{count:.0f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
+
+
+def summary_line(stats):
+    """One line describing how a run ended and what it used."""
+    reason = stats["reason"]
+    if reason == "normal":
+        ending = f"normal (exit code {stats['returncode']})"
+    elif reason == "timeout":
+        ending = f"timeout ({stats['limit']} limit)"
+    elif reason == "signal":
+        ending = f"signal {stats['signal']}"
+    elif reason == "error":
+        ending = f"error ({stats.get('error', '')})"
+    else:
+        ending = reason
+    line = (
+        f"Run summary: {ending} · wall {stats['wall']:.3f} s · "
+        f"user {stats['user']:.3f} s · sys {stats['sys']:.3f} s · "
+        f"peak RSS {format_bytes(stats['max_rss']) if stats['max_rss'] is not None else 'n/a'}"
+    )
+    if stats.get("instructions") is not None:
+        line += f" · {stats['instructions']:,} instructions"
+    for name in stats.get("not_applied", []):
+        line += f" · {name} limit not applied"
+    if stats.get("cached"):
+        line += " · cached result (not run again)"
+    return line
+
+
+def wrap_command(command, limits, stats_path):
+    """The command line that runs command under limits through this script."""
+    return [sys.executable, LIMITED_EXEC, *limits.args(), "--stats", stats_path, "--", *command]
+
+
+def new_stats_file():
+    """Create an empty file for a wrapped run to write its stats to."""
+    fd, path = tempfile.mkstemp(prefix="run_stats_", suffix=".json")
+    os.close(fd)
+    return path
+
+
+def read_stats(stats_path):
+    """The stats a wrapped run wrote, or None if it did not get that far."""
+    try:
+        with open(stats_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_all(fd, data):
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+    except OSError:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a program under CPU, memory, output and wall-time limits.")
+    parser.add_argument("--cpu", type=float, help="CPU seconds")
+    parser.add_argument("--memory", type=int, help="bytes of address space")
+    parser.add_argument("--output", type=int, help="bytes of output")
+    parser.add_argument("--wall", type=float, help="wall-clock seconds")
+    parser.add_argument("--stats", help="write the run's stats to this file as JSON")
+    parser.add_argument("command", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+    if not command:
+        parser.error("no command given")
+
+    # Stopping the wrapper stops the program the same way.
+    cancel = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: cancel.set())
+
+    stats = run_limited(
+        command, Limits(args.cpu, args.memory, args.output, args.wall),
+        on_stdout=lambda data: _write_all(1, data),
+        on_stderr=lambda data: _write_all(2, data),
+        cancel_event=cancel,
+    )
+    if args.stats:
+        with open(args.stats, "w") as f:
+            json.dump(stats, f)
+    if stats["returncode"] is None:
+        return 1
+    return stats["returncode"] if stats["returncode"] >= 0 else 128 - stats["returncode"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+import codecs
+import os
+import re
+import time
+
+from src.logic.compiler_pool import get_pool
+from src.logic.c_build_cache import CBuildCache
+from src.logic.int_to_c_translator import translate_to_c
+from src.logic.quad_optimizer import optimize as optimize_quads, jump_targets, report_line
+from src.logic.int_interpreter import compile_program, interpret
+from src.logic.int_profile import profile_map, new_profile_file, profile_env, read_hits, hit_table
+from src.logic.limited_exec import Limits, run_limited
+from src.logic.quads import parse_program
+from src.riscV_simulator.rv32im import AssemblyError, assemble_file, simulate
+
+RARS_JAR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "riscV_simulator", "rars_46ab74d.jar"
+)
+# Default instruction budget for RARS runs; 0 means none.
+DEFAULT_MAX_STEPS = 10_000_000
+# With 'ic', RARS prints the instruction count on a line of its own after its termination message.
+_INSTRUCTION_COUNT = re.compile(r"(terminated[^\n]*\n)\n(\d+)\n*\Z")
+# The message RARS appends to the output of a program that ran to completion.
+_TERMINATION = re.compile(r"\nProgram terminated by (?:calling exit|dropping off the bottom\.)\n?\Z")
+
+
+def read_inputs_file(path):
+    """Read input values from a file: whitespace-separated, one or more per line."""
+    with open(path, "r") as f:
+        return f.read().split()
+
+
+def read_input_vectors(path):
+    """Read one input vector per non-empty line (whitespace-separated values)."""
+    with open(path, "r") as f:
+        return [line.split() for line in f if line.strip()]
+
+
+def compile_source(compiler_file, source_file, extra_args="", cache=None, timeout=None):
+    """Compile with the warm compiler pool, going through cache when one is given."""
+    key = None
+    if cache is not None:
+        key = cache.key(compiler_file, source_file, extra_args)
+        result = cache.lookup(key, source_file)
+        if result is not None:
+            return result
+    result = get_pool(compiler_file).compile(source_file, extra_args, timeout=timeout)
+    if cache is not None:
+        cache.store(key, result)
+    return result
+
+
+def build_intermediate(int_file, cache=None, flags=(), optimize=False, profile=False, fork_server=False):
+    """
+    Translate int_file to C in memory and build it with gcc through cache (a
+    CBuildCache), which skips gcc when the same C was built before. With
+    optimize, the quads go through the quad optimizer first and only jump
+    targets get labels. With profile, the program counts quad executions and
+    the result carries profile_map to map the counters back to .int lines.
+    With fork_server, the executable can also run as a fork server (fork_server.ForkServer).
+    Returns a dict with status, executable, the names of the variables read by
+    `in`, messages from the translator, gcc stderr and whether the build was cached.
+    """
+    cache = cache or CBuildCache()
+    start = time.perf_counter()
+    messages = []
+    try:
+        program = parse_program(int_file)
+    except Exception as e:
+        messages.append(f"Error reading input file '{int_file}': {e}")
+        return {
+            "status": "error", "stage": "translate", "messages": messages, "stderr": "",
+            "input_names": [], "duration": time.perf_counter() - start,
+        }
+    input_names = list(program.inputs)
+    try:
+        if optimize:
+            program, report = optimize_quads(program)
+            messages.append(report_line(report))
+            c_source = translate_to_c(program, labels=jump_targets(program), profile=profile,
+                                      fork_server=fork_server)
+        else:
+            c_source = translate_to_c(program, profile=profile, fork_server=fork_server)
+    except ValueError as e:
+        messages.append(str(e))
+        return {
+            "status": "error", "stage": "translate", "messages": messages, "stderr": "",
+            "input_names": input_names, "duration": time.perf_counter() - start,
+        }
+    messages.append(f"Conversion complete ({c_source.count(chr(10))} lines of C).")
+
+    build = cache.build(c_source, flags)
+    if build["cached"]:
+        messages.append("Program unchanged: reusing the cached executable.")
+    if profile:
+        build["profile_map"] = profile_map(program)
+    build.update({
+        "stage": "gcc", "messages": messages, "input_names": input_names,
+        # Translation plus gcc, the overhead the interpreter backend avoids.
+        "duration": time.perf_counter() - start,
+    })
+    return build
+
+
+def run_program(command, inputs=None, timeout=None, merge_stderr=False, env=None, limits=None,
+                on_output=None, cancel_event=None):
+    """
+    Run command with inputs (a list of strings, one per line) on stdin, in env
+    if given, under limits (a Limits; timeout is its wall-clock limit).
+    on_output(text) gets stdout as it arrives; cancel_event stops the run.
+    Returns a dict with stdout, stderr, returncode, status ('ok', 'error' or
+    'timeout'), duration and the run's stats from limited_exec.
+    """
+    limits = limits or Limits()
+    if timeout is not None:
+        limits = Limits(limits.cpu, limits.memory, limits.output, timeout)
+    stdin = "".join(str(value) + "\n" for value in inputs or []).encode()
+    stdout, stderr = [], []
+    on_stdout = stdout.append
+    if on_output is not None:
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+
+        def on_stdout(data):
+            stdout.append(data)
+            on_output(decoder.decode(data))
+
+    stats = run_limited(
+        command, limits, stdin=stdin, on_stdout=on_stdout, on_stderr=stderr.append,
+        env=env, merge_stderr=merge_stderr, cancel_event=cancel_event
+    )
+    if stats["reason"] == "timeout":
+        status = "timeout"
+    elif stats["reason"] == "normal" and stats["returncode"] == 0:
+        status = "ok"
+    else:
+        status = "error"
+    return {
+        "stdout": b"".join(stdout).decode("utf-8", "replace"),
+        "stderr": b"".join(stderr).decode("utf-8", "replace") or stats.get("error", ""),
+        "returncode": stats["returncode"],
+        "status": status,
+        "duration": stats["wall"],
+        "stats": stats,
+    }
+
+
+def interpret_intermediate(int_file, inputs=None, timeout=None, on_output=None, cancel_event=None):
+    """
+    Run an .int program in-process with the quad interpreter instead of gcc.
+    Returns the same shape of dict as run_intermediate plus the interpreter's steps.
+    """
+    start = time.perf_counter()
+    try:
+        program = parse_program(int_file)
+        compiled = compile_program(program)
+    except (OSError, ValueError) as e:
+        return {
+            "stdout": "", "stderr": str(e), "returncode": None, "status": "error",
+            "duration": time.perf_counter() - start, "input_names": [],
+        }
+    run = interpret(compiled, inputs or [], on_output=on_output, timeout=timeout, cancel_event=cancel_event)
+    return {
+        "stdout": run["stdout"],
+        "stderr": run["error"],
+        "returncode": 0 if run["status"] == "ok" else None,
+        "status": run["status"],
+        "steps": run["steps"],
+        "duration": time.perf_counter() - start,
+        "input_names": list(program.inputs),
+    }
+
+
+def run_intermediate(int_file, inputs=None, timeout=None, backend="gcc", optimize=False, profile=False,
+                     limits=None):
+    """
+    Run an .int program, feeding inputs in order: translated to C and built
+    with gcc (backend 'gcc'), or directly with the quad interpreter ('interp').
+    optimize runs the quad optimizer before C emission and profile adds the
+    per-quad hit counts as 'profile' (gcc backend only).
+    """
+    if backend == "interp":
+        return interpret_intermediate(int_file, inputs, timeout)
+    build = build_intermediate(int_file, optimize=optimize, profile=profile)
+    result = {"build": build}
+    if build["status"] != "ok":
+        result["status"] = "error"
+        return result
+    if not profile:
+        result.update(run_program([build["executable"]], inputs, timeout, limits=limits))
+        return result
+    path = new_profile_file()
+    try:
+        result.update(run_program([build["executable"]], inputs, timeout, env=profile_env(path), limits=limits))
+        result["profile"] = hit_table(build.pop("profile_map"), read_hits(path))
+    finally:
+        os.remove(path)
+    return result
+
+
+def rars_limits(limits):
+    """
+    limits without the address-space limit: the JVM reserves far more address
+    space than it uses and will not start under a typical one.
+    """
+    return Limits(limits.cpu, None, limits.output, limits.wall)
+
+
+def rars_command(asm_file, max_steps=0):
+    """
+    The RARS command line for asm_file: no copyright notice, start at main,
+    count instructions and stop after max_steps instructions (0 for no limit).
+    """
+    steps = [str(max_steps)] if max_steps else []
+    return ["java", "-jar", RARS_JAR, "nc", "sm", "ic", *steps, asm_file]
+
+
+def split_instruction_count(output):
+    """Output of a RARS run without the instruction count 'ic' appends, and the count (None if absent)."""
+    match = _INSTRUCTION_COUNT.search(output)
+    if match is None:
+        return output, None
+    return output[:match.end(1)], int(match.group(2))
+
+
+def program_output(output):
+    """The output of a RARS run without the termination message RARS appends."""
+    match = _TERMINATION.search(output)
+    return output[:match.start()] if match else output
+
+
+def apply_rars_stats(stats, output, instructions):
+    """
+    Record the instruction count in a RARS run's stats, and a run stopped by
+    its instruction budget as a timeout on the 'steps' limit. The wall-clock
+    limit stays as a backstop.
+    """
+    stats["instructions"] = instructions
+    if stats["reason"] == "normal" and "maximum step limit" in output:
+        stats.update(reason="timeout", limit="steps")
+    return stats
+
+
+def simulate_assembly(asm_file, inputs=None, limits=None, max_steps=DEFAULT_MAX_STEPS, on_output=None,
+                      cancel_event=None):
+    """
+    Run an .asm program in-process with the built-in RV32IM simulator
+    instead of RARS. Returns the same shape of dict as run_assembly; the
+    output, exit code and instruction count follow RARS. The CPU limit
+    counts this thread's CPU time; the memory limit is not applied and the
+    peak RSS is not measured, as the simulator shares this process.
+    """
+    limits = limits or Limits()
+    start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        program = assemble_file(asm_file)
+    except OSError as e:
+        return {
+            "stdout": "", "stderr": str(e), "returncode": None, "status": "error",
+            "duration": time.perf_counter() - start,
+            "stats": {
+                "reason": "error", "limit": None, "returncode": None, "signal": None, "error": str(e),
+                "wall": time.perf_counter() - start, "user": 0.0, "sys": 0.0, "max_rss": 0, "output_bytes": 0,
+            },
+        }
+    except AssemblyError as e:
+        # RARS reports assembly errors on stdout and exits normally.
+        run = {"stdout": f"Error in {asm_file} {e}\n\nProcessing terminated due to errors.\n",
+               "end": "assemble-error", "exit_code": 0, "instructions": None}
+    else:
+        run = simulate(program, inputs or [], on_output=on_output, max_steps=max_steps, timeout=limits.wall,
+                       cancel_event=cancel_event, max_output=limits.output, cpu_timeout=limits.cpu)
+    output = run["stdout"]
+    stats = {
+        "reason": "normal", "limit": None, "returncode": run["exit_code"], "signal": None,
+        "wall": time.perf_counter() - start, "user": time.thread_time() - cpu_start, "sys": 0.0,
+        # The simulator runs in this process, whose RSS says nothing about the program.
+        "max_rss": None, "output_bytes": len(output.encode("utf-8")),
+        "instructions": run["instructions"], "end": run["end"], "simulator": True,
+    }
+    if limits.memory is not None:
+        stats["not_applied"] = ["memory"]
+    if run["end"] == "max-steps":
+        stats.update(reason="timeout", limit="steps")
+    elif run["end"] == "timeout":
+        stats.update(reason="timeout", limit="wall", returncode=None)
+    elif run["end"] == "cpu-timeout":
+        stats.update(reason="timeout", limit="cpu", returncode=None)
+    elif run["end"] == "cancelled":
+        stats.update(reason="cancelled", returncode=None)
+    if run["end"] == "output-limit" or limits.output is not None and stats["output_bytes"] > limits.output:
+        output = output.encode("utf-8")[:limits.output].decode("utf-8", "ignore")
+        stats.update(reason="output-limit", limit="output")
+    if stats["reason"] == "timeout":
+        status = "timeout"
+    elif stats["reason"] == "normal" and stats["returncode"] == 0:
+        status = "ok"
+    else:
+        status = "error"
+    return {
+        "stdout": output,
+        "stderr": "",
+        "returncode": stats["returncode"],
+        "status": status,
+        "duration": stats["wall"],
+        "stats": stats,
+    }
+
+
+def run_assembly(asm_file, inputs=None, timeout=None, limits=None, daemon=None, max_steps=DEFAULT_MAX_STEPS,
+                 backend="rars", on_output=None, cancel_event=None):
+    """
+    Run an .asm program under RARS, feeding inputs like AssemblyExecutor does,
+    for at most max_steps instructions (0 for no limit). The stats include
+    the number of instructions executed.
+    With a daemon (rars_daemon.RarsDaemon) the program runs on its warm JVM
+    when it is available; backend 'python' uses the built-in simulator instead.
+    on_output(text) gets the output as it arrives, except from the daemon,
+    which only returns it at the end.
+    """
+    if backend == "python":
+        limits = limits or Limits()
+        if timeout is not None:
+            limits = Limits(limits.cpu, limits.memory, limits.output, timeout)
+        return simulate_assembly(asm_file, inputs, limits, max_steps, on_output, cancel_event)
+    if daemon is not None:
+        limits = limits or Limits()
+        if timeout is not None:
+            limits = Limits(limits.cpu, limits.memory, limits.output, timeout)
+        result = daemon.run(asm_file, inputs, limits, max_steps, cancel_event)
+        if result is not None:
+            return result
+    # A trailing empty line in case RARS is waiting for a final input.
+    result = run_program(
+        rars_command(asm_file, max_steps), list(inputs or []) + [""], timeout, merge_stderr=True,
+        limits=rars_limits(limits or Limits()), on_output=on_output, cancel_event=cancel_event
+    )
+    result["stdout"], instructions = split_instruction_count(result["stdout"])
+    apply_rars_stats(result["stats"], result["stdout"], instructions)
+    if result["stats"]["reason"] == "timeout":
+        result["status"] = "timeout"
+    return result
@@ -0,0 +1,307 @@
+import re
+
+from src.logic.int_interpreter import wrap32, c_div
+from src.logic.int_to_c_translator import c_line_count, quad_to_c
+from src.logic.quads import ASSIGN, ARITHMETIC, RELATIONAL, Quad, Program, is_number
+
+# Compiler-generated temporaries (T_1, T_2, ...): written once, read once, never an input.
+TEMP_RE = re.compile(r"^T_\d+$")
+
+_FOLD = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': c_div,
+}
+_COMPARE = {
+    '=': lambda a, b: a == b,
+    '<>': lambda a, b: a != b,
+    '<=': lambda a, b: a <= b,
+    '>=': lambda a, b: a >= b,
+    '>': lambda a, b: a > b,
+    '<': lambda a, b: a < b,
+}
+
+
+def _is_temp(name):
+    return name is not None and TEMP_RE.match(name) is not None
+
+
+def _quad(template, op, x='_', y='_', z='_'):
+    return Quad(template.label, op, x, y, z, 5, template.line_no)
+
+
+def _reads(quad):
+    """Operands a quad reads."""
+    op = quad.op
+    if op == ASSIGN or op == 'out':
+        return (quad.x,)
+    if op in ARITHMETIC or op in RELATIONAL:
+        return (quad.x, quad.y)
+    return ()
+
+
+def _writes(quad):
+    """The variable a quad assigns, if any."""
+    if quad.op == ASSIGN or quad.op in ARITHMETIC:
+        return quad.z
+    if quad.op == 'in':
+        return quad.x
+    return None
+
+
+def _is_jump(quad):
+    return quad.op == 'jump' or quad.op in RELATIONAL
+
+
+class _Counts:
+    def __init__(self):
+        self.threaded = 0
+        self.folded = 0
+        self.propagated = 0
+        self.fused = 0
+        self.dead = 0
+        self.unreachable = 0
+
+
+def _thread_jumps(qs, labels, counts):
+    """Point jumps that land on an unconditional jump straight at its final target."""
+    for i, q in enumerate(qs):
+        if q is None or not _is_jump(q):
+            continue
+        target, seen = q.z, {q.z}
+        while True:
+            index = labels.get(target)
+            nxt = qs[index] if index is not None else None
+            if nxt is None or nxt.op != 'jump' or nxt.z in seen:
+                break
+            target = nxt.z
+            seen.add(target)
+        if target != q.z:
+            qs[i] = _quad(q, q.op, q.x, q.y, target)
+            counts.threaded += 1
+
+
+def _leaders(qs, labels):
+    """Indices that start a basic block: the entry, jump targets and quads after a jump."""
+    leaders = {0}
+    for i, q in enumerate(qs):
+        if q is not None and _is_jump(q):
+            leaders.add(i + 1)
+            if q.z in labels:
+                leaders.add(labels[q.z])
+    return leaders
+
+
+def _propagate_and_fold(qs, leaders, counts):
+    """
+    Within each basic block, replace reads of variables last assigned a
+    constant or another variable by that value, then evaluate arithmetic and
+    comparisons whose operands are all constants.
+    """
+    env = {}
+    for i, q in enumerate(qs):
+        if i in leaders:
+            env = {}
+        if q is None:
+            continue
+        op = q.op
+        x, y = q.x, q.y
+        if op == ASSIGN or op == 'out' or op in ARITHMETIC or op in RELATIONAL:
+            if x in env:
+                x = env[x]
+                counts.propagated += 1
+            if (op in ARITHMETIC or op in RELATIONAL) and y in env:
+                value = env[y]
+                # 'a - -3' would be emitted as 'a--3', which is not valid C.
+                if not (op == '-' and value.startswith('-')):
+                    y = value
+                    counts.propagated += 1
+            if (x, y) != (q.x, q.y):
+                q = qs[i] = _quad(q, op, x, y if q.nfields > 3 else '_', q.z)
+
+        if op in ARITHMETIC and is_number(x) and is_number(y) and not (op == '/' and int(y) == 0):
+            value = str(wrap32(_FOLD[op](int(x), int(y))))
+            q = qs[i] = _quad(q, ASSIGN, value, '_', q.z)
+            counts.folded += 1
+        elif op in RELATIONAL and is_number(x) and is_number(y):
+            counts.folded += 1
+            if _COMPARE[op](int(x), int(y)):
+                q = qs[i] = _quad(q, 'jump', '_', '_', q.z)
+            else:
+                qs[i] = None
+                continue
+
+        written = _writes(q)
+        if written is not None:
+            env.pop(written, None)
+            for name in [n for n, value in env.items() if value == written]:
+                del env[name]
+            if q.op == ASSIGN and q.x != written:
+                env[written] = q.x
+
+
+def _read_counts(qs):
+    counts = {}
+    for q in qs:
+        if q is not None:
+            for name in _reads(q):
+                counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+def _fuse_temp_copies(qs, leaders, counts):
+    """Turn `T := a op b; x := T` into `x := a op b` when T is read nowhere else."""
+    reads = _read_counts(qs)
+    for i, q in enumerate(qs):
+        if q is None or not (q.op in ARITHMETIC or q.op == ASSIGN) or not _is_temp(q.z):
+            continue
+        j = i + 1
+        if j >= len(qs) or j in leaders:
+            continue
+        copy = qs[j]
+        if copy is None or copy.op != ASSIGN or copy.x != q.z or reads.get(q.z) != 1:
+            continue
+        qs[i] = _quad(q, q.op, q.x, q.y, copy.z)
+        qs[j] = None
+        counts.fused += 1
+
+
+def _remove_dead_temps(qs, counts):
+    """Drop assignments to temporaries that are never read, until none are left."""
+    changed = True
+    while changed:
+        changed = False
+        reads = _read_counts(qs)
+        for i, q in enumerate(qs):
+            if q is None or not (q.op in ARITHMETIC or q.op == ASSIGN) or not _is_temp(q.z):
+                continue
+            if reads.get(q.z):
+                continue
+            # Keep divisions that might trap on zero, like the unoptimized program would.
+            if q.op == '/' and not (is_number(q.y) and int(q.y) != 0):
+                continue
+            qs[i] = None
+            counts.dead += 1
+            changed = True
+
+
+def _remove_unreachable(qs, labels, counts):
+    reachable = set()
+    stack = [0] if qs else []
+    while stack:
+        i = stack.pop()
+        while i < len(qs) and i not in reachable:
+            reachable.add(i)
+            q = qs[i]
+            if q is not None and _is_jump(q):
+                if q.z in labels:
+                    stack.append(labels[q.z])
+                if q.op == 'jump':
+                    break
+            i += 1
+    for i, q in enumerate(qs):
+        if q is not None and i not in reachable:
+            qs[i] = None
+            counts.unreachable += 1
+
+
+def jump_targets(program):
+    """Labels some quad of the program jumps to."""
+    return {q.z for q in program.quads if _is_jump(q)}
+
+
+def optimize(program):
+    """
+    Optimize a parsed Program before C emission: jump threading, copy
+    propagation and constant folding within basic blocks, fusing temporaries
+    into the copy that follows them, dead temporary removal and unreachable
+    quad removal. The original program is left untouched.
+
+    Returns the optimized Program and a report dict with per-pass counts,
+    quads removed and C lines saved (when only jump targets get labels).
+    A malformed quad raises the translator's ValueError even when it is
+    optimized away.
+    """
+    qs = list(program.quads)
+    labels = program.labels
+    counts = _Counts()
+
+    _thread_jumps(qs, labels, counts)
+    _propagate_and_fold(qs, _leaders(qs, labels), counts)
+    _thread_jumps(qs, labels, counts)
+    _remove_unreachable(qs, labels, counts)
+    _fuse_temp_copies(qs, _leaders(qs, labels), counts)
+    _remove_dead_temps(qs, counts)
+
+    # Jumps to a removed quad continue at the next surviving one.
+    next_alive = [None] * (len(qs) + 1)
+    for i in range(len(qs) - 1, -1, -1):
+        next_alive[i] = i if qs[i] is not None else next_alive[i + 1]
+
+    optimized = Program()
+    tail = []
+    for q in qs:
+        if q is None:
+            continue
+        if _is_jump(q) and q.z in labels:
+            index = next_alive[labels[q.z]]
+            if index is not None:
+                target = qs[index].label
+            else:
+                # Everything from the target on was removed: jump to the end.
+                target = q.z
+                if not tail:
+                    tail.append(_quad(q, 'halt'))
+                    tail[0].label = target
+                target = tail[0].label
+            if target != q.z:
+                q = _quad(q, q.op, q.x, q.y, target)
+        optimized.add(q)
+    for q in tail:
+        optimized.add(q)
+
+    # Declare the original variables that are still referenced, in their original order.
+    used = set()
+    for q in optimized.quads:
+        used.update(_reads(q))
+        if _writes(q) is not None:
+            used.add(_writes(q))
+    optimized.variables = {
+        name: index for index, name in enumerate(n for n in program.variables if n in used)
+    }
+
+    # Only the surviving quads get translated; check the rest so a malformed one still fails the build.
+    kept = {id(q) for q in optimized.quads}
+    for q in program.quads:
+        if id(q) not in kept:
+            quad_to_c(q)
+
+    c_before = c_line_count(program)
+    c_after = c_line_count(optimized, jump_targets(optimized))
+    report = {
+        "quads_before": len(program.quads),
+        "quads_after": len(optimized.quads),
+        "quads_removed": len(program.quads) - len(optimized.quads),
+        "c_lines_before": c_before,
+        "c_lines_after": c_after,
+        "c_lines_saved": c_before - c_after,
+        "jumps_threaded": counts.threaded,
+        "operands_propagated": counts.propagated,
+        "constants_folded": counts.folded,
+        "temporaries_fused": counts.fused,
+        "dead_temporaries": counts.dead,
+        "unreachable": counts.unreachable,
+    }
+    return optimized, report
+
+
+def report_line(report):
+    return (
+        f"Optimizer: {report['quads_removed']} of {report['quads_before']} quads removed, "
+        f"{report['c_lines_saved']} C lines saved "
+        f"({report['c_lines_before']} -> {report['c_lines_after']}); "
+        f"{report['jumps_threaded']} jumps threaded, {report['constants_folded']} folded, "
+        f"{report['operands_propagated']} operands propagated, {report['temporaries_fused']} temporaries fused, "
+        f"{report['dead_temporaries']} dead and {report['unreachable']} unreachable quads dropped."
+    )
@@ -0,0 +1,114 @@
+import sys
+
+ASSIGN = ':='
+ARITHMETIC = ('+', '-', '*', '/')
+RELATIONAL = ('=', '<>', '<=', '>=', '>', '<')
+IGNORED = ('begin_block', 'end_block', 'halt')
+FUNCTIONS = ('par', 'call', 'retv', 'ret')
+
+
+def is_number(x):
+    try:
+        int(x)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+class Quad:
+    """One line of intermediate code: `label: op, x, y, z`."""
+    __slots__ = ("label", "op", "x", "y", "z", "nfields", "line_no")
+
+    def __init__(self, label, op, x, y, z, nfields, line_no):
+        self.label = label
+        self.op = op
+        self.x = x
+        self.y = y
+        self.z = z
+        # How many comma-separated fields the line had (label and op included).
+        self.nfields = nfields
+        self.line_no = line_no
+
+    def fields(self):
+        return [self.label, self.op, self.x, self.y, self.z][:self.nfields]
+
+    def text(self):
+        words = self.fields()
+        return f"{words[0]}: " + ", ".join(w for w in words[1:] if w is not None)
+
+    def __repr__(self):
+        return f"Quad({self.text()!r})"
+
+
+def not_enough_fields(quad, kind):
+    """The ValueError for a quad of kind (e.g. "jump") that is missing fields."""
+    return ValueError(f"Error: Not enough fields in {kind} line {quad.line_no}: {quad.text()}")
+
+
+class Program:
+    """
+    A parsed .int file: the quads in order, a symbol table of declared
+    variables (name -> slot, in first-seen order), the variables read by `in`
+    and the index of every label.
+    """
+    __slots__ = ("quads", "variables", "inputs", "labels")
+
+    def __init__(self):
+        self.quads = []
+        self.variables = {}
+        self.inputs = {}
+        self.labels = {}
+
+    def declare(self, name):
+        if name not in self.variables and not is_number(name):
+            self.variables[name] = len(self.variables)
+
+    def add(self, quad):
+        op = quad.op
+        n = quad.nfields
+        # Same declaration rules as the original two-pass translator.
+        if op == ASSIGN:
+            self.declare(quad.x)
+            if n > 4:
+                self.declare(quad.z)
+        elif op in ARITHMETIC:
+            self.declare(quad.x)
+            if n > 3:
+                self.declare(quad.y)
+            if n > 4:
+                self.declare(quad.z)
+        elif op in RELATIONAL:
+            self.declare(quad.x)
+            if n > 3:
+                self.declare(quad.y)
+        elif op == 'in' and quad.x is not None:
+            self.inputs.setdefault(quad.x, None)
+        self.labels.setdefault(quad.label, len(self.quads))
+        self.quads.append(quad)
+
+
+def parse_line(line, line_no=0):
+    """Parse one .int line into a Quad, or None for '#' comments and lines without an operator."""
+    if line.lstrip().startswith('#'):
+        return None
+    # Replace ':=' temporarily with '#' to avoid conflict with ':' splitting.
+    words = line.replace(':=', '#').replace(':', ',').split(',')
+    if len(words) < 2:
+        return None
+    intern = sys.intern
+    # Restore ':=' and also replace '@' with '$'; interning shares repeated names.
+    words = [intern(w.strip().replace('#', ':=').replace('@', '$')) for w in words[:5]]
+    n = len(words)
+    words += [None] * (5 - n)
+    return Quad(words[0], words[1], words[2], words[3], words[4], n, line_no)
+
+
+def parse_program(filename):
+    """Read an .int file once, streaming it line by line into a Program."""
+    program = Program()
+    with open(filename, 'r') as f:
+        for line_no, line in enumerate(f, start=1):
+            quad = parse_line(line, line_no)
+            if quad is not None:
+                program.add(quad)
+    return program
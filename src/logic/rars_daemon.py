@@ -0,0 +1,253 @@
+import atexit
+import os
+import queue
+import select
+import struct
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+
+from src.logic.limited_exec import peak_rss
+from src.logic.pipeline import RARS_JAR
+
+HOST_SOURCE = os.path.join(os.path.dirname(RARS_JAR), "RarsHost.java")
+# Seconds the host may take to start and warm up.
+STARTUP_TIMEOUT = 30
+# After a failed start (no java, no JDK for source-file mode), wait this long before trying again.
+RETRY_AFTER = 60
+
+
+class DaemonError(Exception):
+    pass
+
+
+def _read_exact(fd, size, deadline=None, cancel_event=None):
+    chunks = []
+    while size:
+        timeout = 0.05
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                raise TimeoutError
+        if cancel_event is not None and cancel_event.is_set():
+            raise InterruptedError
+        ready, _, _ = select.select([fd], [], [], timeout)
+        if not ready:
+            continue
+        data = os.read(fd, size)
+        if not data:
+            raise DaemonError("RARS host closed its output")
+        chunks.append(data)
+        size -= len(data)
+    return b"".join(chunks)
+
+
+def _read_frame(fd, deadline=None, cancel_event=None):
+    (count,) = struct.unpack(">i", _read_exact(fd, 4, deadline, cancel_event))
+    fields = []
+    for _ in range(count):
+        (length,) = struct.unpack(">i", _read_exact(fd, 4, deadline, cancel_event))
+        fields.append(_read_exact(fd, length, deadline, cancel_event).decode("utf-8", "replace"))
+    return fields
+
+
+def _write_frame(pipe, fields):
+    data = [struct.pack(">i", len(fields))]
+    for field in fields:
+        encoded = field.encode("utf-8")
+        data.append(struct.pack(">i", len(encoded)))
+        data.append(encoded)
+    pipe.write(b"".join(data))
+    pipe.flush()
+
+
+def handles_limits(limits):
+    """
+    Whether the warm host can enforce limits. It only has the wall limit;
+    the memory limit is not applied to RARS on either path (see
+    pipeline.rars_limits).
+    """
+    return limits is None or (limits.cpu is None and limits.output is None)
+
+
+class RarsDaemon:
+    """
+    A long-lived RarsHost JVM that runs assembly jobs without paying JVM
+    startup each time. Jobs run one at a time. A host that crashed or was
+    killed for running past its wall-clock limit is started again, and
+    run() returns None whenever the host cannot be used, so callers fall
+    back to starting RARS directly.
+    """
+
+    def __init__(self, java="java", jar=RARS_JAR, source=HOST_SOURCE):
+        self.command = [java, "-cp", jar, source]
+        self.process = None
+        self.lock = threading.Lock()
+        self.failed_at = None
+        self.restarts = 0
+
+    def _start(self):
+        try:
+            process = subprocess.Popen(
+                self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            )
+        except OSError:
+            self.failed_at = time.monotonic()
+            return False
+        try:
+            ready = _read_frame(process.stdout.fileno(), time.monotonic() + STARTUP_TIMEOUT)
+        except (OSError, DaemonError, TimeoutError, struct.error):
+            ready = None
+        if ready != ["ready"]:
+            process.kill()
+            process.wait()
+            self.failed_at = time.monotonic()
+            return False
+        self.process = process
+        self.failed_at = None
+        return True
+
+    def _ensure_running(self):
+        if self.process is not None and self.process.poll() is None:
+            return True
+        if self.process is not None:
+            self.process = None
+            self.restarts += 1
+        if self.failed_at is not None and time.monotonic() - self.failed_at < RETRY_AFTER:
+            return False
+        return self._start()
+
+    def _kill(self):
+        if self.process is not None:
+            self.process.kill()
+            self.process.wait()
+            self.process = None
+            self.restarts += 1
+
+    def ensure_started(self):
+        """Start the host if it is not running; False if it cannot be started."""
+        with self.lock:
+            return self._ensure_running()
+
+    def start_async(self):
+        """Warm the host up in the background, ahead of the first run."""
+        threading.Thread(target=self.ensure_started, daemon=True).start()
+
+    def run(self, asm_file, inputs=None, limits=None, max_steps=0, cancel_event=None):
+        """
+        Run asm_file on the warm host with inputs on stdin (plus a trailing
+        empty line, like the cold path). Returns a dict shaped like
+        pipeline.run_program's, or None if the host is unavailable or cannot
+        honour limits: runs with a CPU or output limit go to the cold path,
+        which enforces them while the program runs.
+        """
+        if not handles_limits(limits):
+            return None
+        with self.lock:
+            if not self._ensure_running():
+                return None
+            stdin = "".join(str(value) + "\n" for value in inputs or []) + "\n"
+            start = time.perf_counter()
+            deadline = time.monotonic() + limits.wall if limits is not None and limits.wall else None
+            stopped_for = None
+            try:
+                _write_frame(self.process.stdin, [os.path.abspath(asm_file), stdin, str(max_steps)])
+                reply = _read_frame(self.process.stdout.fileno(), deadline, cancel_event)
+            except TimeoutError:
+                stopped_for = "timeout"
+            except InterruptedError:
+                stopped_for = "cancelled"
+            except (OSError, DaemonError, struct.error):
+                # The host died under this job: let the caller run it the cold way.
+                self._kill()
+                return None
+            rss = peak_rss(self.process.pid)
+            if stopped_for is not None:
+                # A job cannot be interrupted inside the host; replace the host.
+                self._kill()
+        if stopped_for is not None:
+            self.start_async()
+            return {
+                "stdout": "", "stderr": "", "returncode": None, "status": "timeout" if stopped_for == "timeout" else "error",
+                "duration": time.perf_counter() - start,
+                "stats": {
+                    "reason": stopped_for, "limit": "wall" if stopped_for == "timeout" else None,
+                    "returncode": None, "signal": None, "wall": time.perf_counter() - start,
+                    "user": 0.0, "sys": 0.0, "max_rss": rss, "output_bytes": 0, "instructions": None, "daemon": True,
+                },
+            }
+
+        end, exit_code, output, cpu_ns, instructions = reply
+        stats = {
+            "reason": "normal", "limit": None, "returncode": int(exit_code), "signal": None,
+            "wall": time.perf_counter() - start, "user": int(cpu_ns) / 1e9, "sys": 0.0,
+            # The host's peak, shared by every job it ran.
+            "max_rss": rss, "output_bytes": len(output.encode("utf-8")),
+            "instructions": int(instructions) if instructions else None,
+            "daemon": True, "end": end,
+        }
+        if end == "max-steps":
+            stats.update(reason="timeout", limit="steps")
+        return {
+            "stdout": output,
+            "stderr": "",
+            "returncode": stats["returncode"],
+            "status": (
+                "timeout" if stats["reason"] == "timeout"
+                else "ok" if stats["reason"] == "normal" and stats["returncode"] == 0 else "error"
+            ),
+            "duration": stats["wall"],
+            "stats": stats,
+        }
+
+    def close(self):
+        """Ask the host to exit by closing its stdin; kill it if it does not."""
+        with self.lock:
+            process, self.process = self.process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+            process.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+
+
+class DaemonPool:
+    """
+    A fixed set of RarsDaemons for worker threads, one job per daemon at a
+    time, so parallel runs use separate JVMs. A disabled pool hands out None.
+    """
+
+    def __init__(self, size, enabled=True):
+        self.daemons = queue.Queue()
+        for _ in range(size):
+            self.daemons.put(RarsDaemon() if enabled else None)
+
+    @contextmanager
+    def daemon(self):
+        daemon = self.daemons.get()
+        try:
+            yield daemon
+        finally:
+            self.daemons.put(daemon)
+
+    def close(self):
+        while not self.daemons.empty():
+            daemon = self.daemons.get()
+            if daemon is not None:
+                daemon.close()
+
+
+_daemon = None
+
+
+def get_daemon():
+    """The shared RarsDaemon, closed when the application exits."""
+    global _daemon
+    if _daemon is None:
+        _daemon = RarsDaemon()
+        atexit.register(_daemon.close)
+    return _daemon
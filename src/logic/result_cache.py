@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+# A comment containing this word opts a program out of result caching.
+NONDETERMINISTIC_MARK = "nondeterministic"
+# RARS syscalls whose results vary between runs: time, and the random-number services.
+_VOLATILE_SYSCALLS = {30, 40, 41, 42, 43, 44}
+_SYSCALL_NUMBER = re.compile(r"^\s*(?:li|addi)\s+a7\s*,\s*(?:zero\s*,\s*|x0\s*,\s*)?(\d+)\s*(?:#.*)?$", re.MULTILINE)
+
+
+def nondeterministic_reason(program_file):
+    """
+    Why a program's runs cannot be replayed from the cache, or None. .asm
+    and .int sources are checked for a '# nondeterministic' comment, and
+    assembly also for a syscall for the time or a random number. Anything
+    else (an executable whose source is unknown) is never cached.
+    """
+    extension = os.path.splitext(program_file)[1]
+    if extension not in (".asm", ".int"):
+        return "source not known"
+    try:
+        with open(program_file, "r", encoding="utf-8", errors="replace") as f:
+            text = f.read()
+    except OSError:
+        return None
+    for line in text.splitlines():
+        if "#" in line and NONDETERMINISTIC_MARK in line.split("#", 1)[1].lower():
+            return "marked nondeterministic"
+    if extension == ".asm":
+        for match in _SYSCALL_NUMBER.finditer(text):
+            if int(match.group(1)) in _VOLATILE_SYSCALLS:
+                return f"uses syscall {match.group(1)}"
+    return None
+
+
+class ResultCache:
+    """
+    On-disk cache of finished runs, keyed by the content of the program file
+    (an .asm or a gcc executable), the backend, the input values, the limits
+    and the instruction budget. Each entry holds the output, exit status and
+    run stats as JSON. Only runs that ended normally are stored, and entries
+    are evicted least-recently-used once the cache grows past max_bytes.
+    """
+
+    def __init__(self, root=os.path.join(".cache", "results"), max_bytes=32 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._lock = threading.Lock()
+
+    def key(self, program_file, backend, inputs=(), limits=None, max_steps=0, source_file=None):
+        """
+        The entry key for a run, or None when the program must always run.
+        source_file is the .int an executable was built from.
+        """
+        if nondeterministic_reason(source_file or program_file) is not None:
+            with self._lock:
+                self.bypassed += 1
+            return None
+        digest = hashlib.sha256()
+        try:
+            with open(program_file, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 16), b""):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        digest.update(b"\0" + backend.encode() + b"\0")
+        digest.update("\n".join(str(value) for value in inputs).encode() + b"\0")
+        digest.update(" ".join(limits.args() if limits is not None else []).encode() + b"\0")
+        digest.update(str(max_steps).encode())
+        return digest.hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.root, key + ".json")
+
+    def lookup(self, key):
+        """
+        The stored run for key as a dict shaped like pipeline.run_program's,
+        with stats['cached'] set, or None on a miss.
+        """
+        if key is None:
+            return None
+        path = self._entry(key)
+        try:
+            with open(path, "r") as f:
+                result = json.load(f)
+            now = time.time()
+            os.utime(path, (now, now))
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        result["duration"] = 0.0
+        result["stats"]["cached"] = True
+        return result
+
+    def store(self, key, result):
+        """Save a run that ended normally, then enforce the size bound."""
+        if key is None or result is None or result["stats"].get("reason") != "normal":
+            return
+        entry = self._entry(key)
+        tmp = f"{entry}.tmp{os.getpid()}.{threading.get_ident()}"
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            with open(tmp, "w") as f:
+                json.dump({
+                    "stdout": result["stdout"],
+                    "stderr": result.get("stderr", ""),
+                    "returncode": result["returncode"],
+                    "status": result["status"],
+                    "stats": result["stats"],
+                }, f)
+            os.replace(tmp, entry)
+        except (OSError, TypeError, ValueError):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        self.evict()
+
+    def evict(self):
+        """Drop least-recently-used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        entries.sort()
+        while total > self.max_bytes and entries:
+            _, size, path = entries.pop(0)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def stats_line(self):
+        return f"Result cache: {self.hits} hit(s), {self.misses} miss(es), {self.bypassed} bypassed"
@@ -1,51 +1,135 @@
 import os
-import subprocess
 from PyQt6.QtWidgets import QFileDialog
-from src.logic.compiler import compile_code
+from src.logic.compile_executor import CompileExecutor
 from src.logic.assembly_executor import AssemblyExecutor
 from src.logic.c_executor import CExecutor
-from src.logic.int_to_c_translator import write_to_c, extract_input_variables
+from src.logic.interpreter_executor import InterpreterExecutor
+from src.logic.fork_server import get_fork_server
+from src.logic.fork_server_executor import ForkServerExecutor
+from src.logic.c_build_cache import CBuildCache
+from src.logic.pipeline import build_intermediate, DEFAULT_MAX_STEPS
+from src.logic.input_history import InputHistory
+from src.logic.quads import parse_program
 from PyQt6.QtWidgets import QInputDialog
 
-def run_compiler(compiler_path, source_path, output_box, extra_args=""):
-    compile_code(compiler_path, source_path, output_box, extra_args)
+# Translate + gcc time of the last gcc-path run per .int file, to compare the interpreter against.
+gcc_build_times = {}
+build_cache = CBuildCache()
+input_history = InputHistory()
 
-def run_intermediate_code(source_path, output_box):
+
+def ask_inputs(title, prompts):
+    """Ask for one value per prompt up front; None if the user cancels."""
+    inputs = []
+    for prompt in prompts:
+        value, ok = QInputDialog.getText(None, title, prompt)
+        if not ok:
+            return None
+        inputs.append(value)
+    return inputs
+
+def run_compiler(compiler_path, source_path, output_box, extra_args="", cache=None, timeout=None):
+    """
+    A CompileExecutor wired to output_box but not yet started, so the caller
+    can connect finished before a fast (e.g. cached) compile can end.
+    """
+    output_box.clear()
+    executor = CompileExecutor(compiler_path, source_path, extra_args, cache=cache, timeout=timeout)
+    executor.output_signal.connect(output_box.append)
+    return executor
+
+def run_intermediate_code(source_path, output_box, optimize=False, profile=False, inputs=None, limits=None,
+                          fork_server=False, result_cache=None):
     if not source_path:
         output_box.append("No source file selected.")
         return
     base, _ = os.path.splitext(source_path)
     int_file = base + ".int"
-    project_folder = os.getcwd()
-    c_folder = os.path.join(project_folder, "c")
-    os.makedirs(c_folder, exist_ok=True)
-    c_file = os.path.join(c_folder, os.path.basename(base) + ".c")
-    executable = os.path.join(project_folder, "generated.out")
 
+    if fork_server and profile:
+        output_box.append("Profiling is not available with the fork server; running without it.")
+        profile = False
     output_box.append("Converting intermediate code to C...")
-    write_to_c(int_file, c_file, output_box)
-
-    try:
-        result = subprocess.run(["gcc", c_file, "-o", executable],
-                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        if result.returncode != 0:
+    build = build_intermediate(int_file, build_cache, optimize=optimize, profile=profile, fork_server=fork_server)
+    gcc_build_times[os.path.abspath(int_file)] = build["duration"]
+    for message in build["messages"]:
+        output_box.append(message)
+    if build["status"] != "ok":
+        if build["stage"] == "gcc":
             output_box.append("Compilation error:")
-            output_box.append(result.stderr)
-            return
-        output_box.append("Compilation successful.")
-    except Exception as e:
-        output_box.append(f"Compilation failed: {e}")
+            output_box.append(build["stderr"])
         return
+    output_box.append("Compilation successful.")
 
-    # Extract inputs and run
-    inputs = extract_input_variables(int_file)
-    executor = CExecutor(executable, output_box, input_names=inputs)
+    # Ask for any inputs not supplied, then run with all of them written to stdin at once.
+    input_names = build["input_names"]
+    if inputs is None:
+        inputs = ask_inputs("Input Required", [f"Enter value for {name}:" for name in input_names])
+        if inputs is None:
+            output_box.append("Input cancelled.")
+            return None
+    input_history.remember(int_file, inputs)
+    if fork_server:
+        # The server stays up between runs of the same executable.
+        executor = ForkServerExecutor(
+            get_fork_server(build["executable"]), build["executable"], inputs, limits, cache=result_cache,
+            source_file=int_file
+        )
+        executor.output_signal.connect(output_box.append)
+        executor.stream_signal.connect(output_box.write)
+        executor.start()
+        return executor
+    executor = CExecutor(
+        build["executable"], output_box, input_names=input_names,
+        profile_map=build.get("profile_map"), inputs=inputs, limits=limits, cache=result_cache,
+        source_file=int_file
+    )
     executor.output_signal.connect(lambda txt: output_box.append(txt))
+    executor.stream_signal.connect(output_box.write)
     executor.start()
     return executor
 
 
-def run_assembly_code(asm_path, output_box):
+def run_intermediate_interpreted(int_path, output_box, inputs=None, limits=None):
+    if not int_path:
+        output_box.append("No source file selected.")
+        return None
+    try:
+        input_names = list(parse_program(int_path).inputs)
+    except Exception as e:
+        output_box.append(f"Error reading input file '{int_path}': {e}")
+        return None
+
+    if inputs is None:
+        inputs = ask_inputs("Input Required", [f"Enter value for {name}:" for name in input_names])
+        if inputs is None:
+            output_box.append("Input cancelled.")
+            return None
+    input_history.remember(int_path, inputs)
+
+    output_box.append("Interpreting intermediate code...")
+    # The interpreter runs in-process: only the wall-clock limit applies.
+    executor = InterpreterExecutor(int_path, inputs, timeout=limits.wall if limits else None)
+    executor.output_signal.connect(output_box.append)
+    executor.stream_signal.connect(output_box.write)
+
+    def report_timing():
+        result = executor.result
+        if result is None:
+            return
+        line = f"Interpreter run took {result['duration'] * 1000:.1f} ms"
+        gcc_time = gcc_build_times.get(os.path.abspath(int_path))
+        if gcc_time is not None:
+            line += f" (gcc path spent {gcc_time * 1000:.1f} ms translating and building before running)"
+        output_box.append(line)
+
+    executor.finished.connect(report_timing)
+    executor.start()
+    return executor
+
+
+def run_assembly_code(asm_path, output_box, inputs=None, limits=None, daemon=None, max_steps=DEFAULT_MAX_STEPS,
+                      backend="rars", result_cache=None):
     if not asm_path:
         output_box.append("No assembly file selected.")
         return None
@@ -59,16 +143,19 @@ def run_assembly_code(asm_path, output_box):
                     count += 1
         return count
 
-    num_inputs = count_inputs(asm_path)
-    inputs = []
-    for i in range(num_inputs):
-        txt, ok = QInputDialog.getText(None, "Assembly Input", f"Enter input #{i+1}:")
-        if not ok:
+    if inputs is None:
+        num_inputs = count_inputs(asm_path)
+        inputs = ask_inputs("Assembly Input", [f"Enter input #{i+1}:" for i in range(num_inputs)])
+        if inputs is None:
             output_box.append("Input cancelled.")
             return None
-        inputs.append(txt)
+    input_history.remember(asm_path, inputs)
 
-    executor = AssemblyExecutor(asm_path, output_box, inputs=inputs)
+    executor = AssemblyExecutor(
+        asm_path, output_box, inputs=inputs, limits=limits, daemon=daemon, max_steps=max_steps, backend=backend,
+        cache=result_cache
+    )
     executor.output_signal.connect(output_box.append)
+    executor.stream_signal.connect(output_box.write)
     executor.start()
     return executor
\ No newline at end of file
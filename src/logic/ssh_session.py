@@ -0,0 +1,147 @@
+import atexit
+import logging
+import socket
+import threading
+import time
+
+from paramiko import Transport, SFTPClient
+from paramiko.ssh_exception import AuthenticationException, BadAuthenticationType, SSHException
+
+logger = logging.getLogger(__name__)
+
+SERVER = "scylla.cs.uoi.gr"
+PORT = 22
+CONNECT_TIMEOUT = 10
+# Seconds between keepalive packets, so an idle session survives between submissions.
+KEEPALIVE_INTERVAL = 30
+CONNECT_ATTEMPTS = 3
+
+# The auth method that last worked for each server, tried first next time.
+_auth_methods = {}
+
+
+class SSHSession:
+    """
+    One authenticated paramiko Transport to server, shared by every remote
+    step (whoami, rupt, SFTP, the turnin shell), each on its own channel.
+    The transport is opened on first use and again if it has dropped.
+    """
+
+    def __init__(self, username, password, server=SERVER, port=PORT):
+        self.server = server
+        self.port = port
+        self.username = username
+        self.password = password
+        self.transport = None
+        self.auth_method = None
+        self.lock = threading.Lock()
+
+    def is_active(self):
+        return self.transport is not None and self.transport.is_active()
+
+    def connect(self):
+        """The live transport, connecting and authenticating if needed."""
+        with self.lock:
+            if self.is_active():
+                return self.transport
+            self._close_transport()
+            for attempt in range(1, CONNECT_ATTEMPTS + 1):
+                try:
+                    self.transport = self._open()
+                    break
+                except (OSError, EOFError, SSHException) as e:
+                    # Wrong credentials will not improve with another attempt.
+                    if isinstance(e, AuthenticationException) or attempt == CONNECT_ATTEMPTS:
+                        raise
+                    logger.warning("Connecting to %s failed (attempt %d): %s", self.server, attempt, e)
+                    time.sleep(0.5 * attempt)
+            return self.transport
+
+    def _open(self):
+        sock = socket.create_connection((self.server, self.port), timeout=CONNECT_TIMEOUT)
+        transport = Transport(sock)
+        try:
+            transport.start_client(timeout=CONNECT_TIMEOUT)
+            self._authenticate(transport)
+        except BaseException:
+            transport.close()
+            raise
+        transport.set_keepalive(KEEPALIVE_INTERVAL)
+        return transport
+
+    def _authenticate(self, transport):
+        """Password auth, or keyboard-interactive when the server asks for it."""
+        if _auth_methods.get(self.server) != "keyboard-interactive":
+            try:
+                transport.auth_password(self.username, self.password, fallback=False)
+                self.auth_method = _auth_methods[self.server] = "password"
+                return
+            except BadAuthenticationType as e:
+                if "keyboard-interactive" not in e.allowed_types:
+                    raise
+            except SSHException as e:
+                if "No existing session" not in str(e):
+                    raise
+        transport.auth_interactive(self.username, lambda title, instr, prompts: [self.password] * len(prompts))
+        self.auth_method = _auth_methods[self.server] = "keyboard-interactive"
+
+    def exec(self, command, get_pty=False):
+        """Run command on the server and return its output as text."""
+        channel = self.connect().open_session(timeout=CONNECT_TIMEOUT)
+        try:
+            if get_pty:
+                channel.get_pty()
+            channel.exec_command(command)
+            with channel.makefile("rb") as stdout:
+                return stdout.read().decode(errors="replace")
+        finally:
+            channel.close()
+
+    def open_sftp(self):
+        return SFTPClient.from_transport(self.connect())
+
+    def invoke_shell(self):
+        """An interactive shell channel with a pty; the caller closes it."""
+        channel = self.connect().open_session(timeout=CONNECT_TIMEOUT)
+        channel.get_pty()
+        channel.invoke_shell()
+        return channel
+
+    def _close_transport(self):
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+
+    def close(self):
+        with self.lock:
+            self._close_transport()
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(username, password, server=SERVER):
+    """
+    The shared SSHSession for username on server, closed when the application
+    exits. New credentials for the same user replace the old session.
+    """
+    with _sessions_lock:
+        session = _sessions.get((server, username))
+        if session is not None and session.password != password:
+            session.close()
+            session = None
+        if session is None:
+            session = _sessions[server, username] = SSHSession(username, password, server)
+        return session
+
+
+def close_sessions():
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+atexit.register(close_sessions)
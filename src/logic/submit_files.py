@@ -1,36 +1,43 @@
 ﻿import os
-import shlex
 import re
-import time
+import shlex
 import logging
-import socket
 import paramiko
-from paramiko import SSHClient, AutoAddPolicy, Transport, SFTPClient
-from paramiko.ssh_exception import BadAuthenticationType, SSHException, AuthenticationException
+
+from src.logic.expect import EOF, Expect, ExpectError, strip_ansi
+from src.logic.ssh_session import get_session
 
 # enable debug logging for Paramiko
 paramiko.util.log_to_file("paramiko.log", level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-ANSI_CSI_RE = re.compile(r"\x1b\[[0-9;?]*[ -/]*[@-~]")
-
-def strip_ansi(s: str) -> str:
-    return ANSI_CSI_RE.sub("", s)
+# Turnin shell prompts, matched against output with ANSI codes removed. Each
+# must be the whole last line of output, so text that merely ends in "$" or
+# mentions a question does not count until the remote side is waiting.
+SHELL_PROMPT = r"(?m)^[^\n]*[$#%>] ?\Z"
+PASSWORD_PROMPT = r"(?im)^[^\n]*password[^\n]*: ?\Z"
+LOGIN_REFUSED = r"(?i)permission denied \("
+CONFIRM_PROMPT = r"(?im)^[^\n]*(?:do you want|please enter)[^\n]*[?:] ?(?:\([^)\n]*\) ?|\[[^\]\n]*\] ?)?\Z"
+PASSWORD_ATTEMPTS = 3
+# Seconds each step may wait for its prompt.
+LOGIN_TIMEOUT = 30
+TURNIN_TIMEOUT = 120
+EXIT_TIMEOUT = 5
+
+
+def exact_prompt(line):
+    """
+    A pattern for the prompt line a shell printed, to recognise that shell's
+    next prompt. Numbers may change between prompts (history counters, clocks).
+    """
+    return r"(?m)^" + re.sub(r"\d+", r"\\d+", re.escape(line)) + r"\Z"
 
 
 def get_online_lab_hosts(username, password):
     """
-    Connect to scylla.cs.uoi.gr and run 'rupt' to retrieve a list of online lab workstations.
+    Run 'rupt' on scylla.cs.uoi.gr, over the shared session, to retrieve a list of online lab workstations.
     """
-    server = "scylla.cs.uoi.gr"
-    client = paramiko.SSHClient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    try:
-        client.connect(server, username=username, password=password, timeout=10)
-        stdin, stdout, stderr = client.exec_command("rupt", get_pty=True)
-        rupt_output = stdout.read().decode()
-    finally:
-        client.close()
+    rupt_output = strip_ansi(get_session(username, password).exec("rupt", get_pty=True))
 
     hosts = []
     for line in rupt_output.splitlines():
@@ -42,72 +49,56 @@ def get_online_lab_hosts(username, password):
 def execute_remote_turnin(username, password, file_loader, assignment, course, selected_host):
     """
     1) SFTP-upload each file to scylla home dir.
-    2) Open an interactive shell, ssh into selected_host, handle password prompts,
-       then send 'turnin assignment@course <files>' and collect its output.
+    2) Open an interactive shell, ssh into selected_host, answer its password prompts,
+       then send 'turnin assignment@course <files>', confirm its questions and collect its output.
+    Each prompt is answered as soon as it appears; the output ends with how long each step took.
     """
-    server = "scylla.cs.uoi.gr"
-    # upload via SFTP
-    client = paramiko.SSHClient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    # Upload via SFTP, on the session the login already opened.
+    session = get_session(username, password)
+    chan = None
     try:
-        client.connect(server, username=username, password=password, timeout=10)
-        sftp = client.open_sftp()
-        for _, path in file_loader.items():
-            sftp.put(path, os.path.basename(path))
-        sftp.close()
-
-        chan = client.invoke_shell()
-        output = ""
-
-        # 1) ssh into jump host
-        chan.send(f"ssh -o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null {selected_host}\n")
-        start = time.time()
+        sftp = session.open_sftp()
+        try:
+            for _, path in file_loader.items():
+                sftp.put(path, os.path.basename(path))
+        finally:
+            sftp.close()
+
+        chan = session.invoke_shell()
+        shell = Expect(chan, timeout=LOGIN_TIMEOUT)
+        shell.expect([SHELL_PROMPT], step="server prompt")
+        server_prompt = exact_prompt(shell.match.group())
+
+        # 1) ssh into the lab workstation
+        shell.sendline(f"ssh -o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null {selected_host}")
         attempts = 0
-        while time.time() - start < 30:
-            if chan.recv_ready():
-                data = chan.recv(1024).decode()
-                output += data
-                if "password:" in data.lower() or "permission denied" in data.lower():
-                    if attempts < 3:
-                        chan.send(password + "\n")
-                        attempts += 1
-                if ("$" in data or "#" in data) and attempts > 0:
-                    break
-            time.sleep(0.5)
-
-        # 2) run turnin
-        files = " ".join(shlex.quote(os.path.basename(p)) for p in file_loader.values())
-        cmd = f"turnin {assignment}@{course} {files}\n"
-        chan.send(cmd)
-
-        last = time.time()
         while True:
-            if chan.recv_ready():
-                data = chan.recv(1024).decode()
-                output += data
-                last = time.time()
-                if "do you want" in data.lower() or "please enter" in data.lower():
-                    chan.send("y\n")
-            else:
-                if time.time() - last > 5:
-                    break
-                time.sleep(0.5)
-
-        chan.send("exit\n")
-        time.sleep(1)
-        while chan.recv_ready():
-            output += chan.recv(1024).decode()
-
-        return output, ""
+            index = shell.expect([PASSWORD_PROMPT, LOGIN_REFUSED, SHELL_PROMPT], step=f"login to {selected_host}")
+            if index == 2:
+                lab_prompt = exact_prompt(shell.match.group())
+                break
+            if index == 1 or attempts == PASSWORD_ATTEMPTS:
+                raise ExpectError(f"{selected_host} refused the login")
+            shell.sendline(password)
+            attempts += 1
+
+        # 2) run turnin, confirming its questions
+        files = " ".join(shlex.quote(os.path.basename(p)) for p in file_loader.values())
+        shell.sendline(f"turnin {assignment}@{course} {files}")
+        while shell.expect([CONFIRM_PROMPT, lab_prompt], timeout=TURNIN_TIMEOUT, step="turnin") == 0:
+            shell.sendline("y")
+
+        shell.sendline("exit")
+        try:
+            shell.expect([server_prompt, EOF], timeout=EXIT_TIMEOUT, step="exit")
+        except ExpectError:
+            pass
+
+        logger.info("turnin on %s: %s", selected_host, shell.format_steps())
+        return f"{shell.output()}\nTimings: {shell.format_steps()}", ""
     except Exception as e:
         return "", f"Remote turnin failed: {e}"
     finally:
-        try: client.close()
-        except: pass
-
-
-
-
-
-
- 
\ No newline at end of file
+        # Only the shell channel: the session stays up for the next submission.
+        if chan is not None:
+            chan.close()
@@ -0,0 +1,228 @@
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.logic.asm_batch import first_difference
+from src.logic.limited_exec import Limits
+from src.logic.pipeline import (
+    DEFAULT_MAX_STEPS, compile_source, build_intermediate, run_program, run_assembly, read_inputs_file,
+    program_output
+)
+from src.logic.fork_server import ForkServerPool
+from src.logic.rars_daemon import DaemonPool
+
+# A source's cases live in <stem>.tests/ next to it, as <case>.in / <case>.out pairs.
+TESTS_SUFFIX = ".tests"
+BACKENDS = ("int", "asm")
+# The translated C writes with printf, which a pipe makes block-buffered; line
+# buffering lets a wrong first line stop the program without waiting for it.
+LINE_BUFFERED = ["stdbuf", "-oL"] if shutil.which("stdbuf") else []
+
+
+def tests_dir(source):
+    return os.path.splitext(source)[0] + TESTS_SUFFIX
+
+
+def list_cases(folder):
+    """
+    One case per <case>.out file in folder, sorted by name, with its inputs
+    from <case>.in when there is one.
+    """
+    cases = []
+    if not os.path.isdir(folder):
+        return cases
+    for name in sorted(os.listdir(folder)):
+        if not name.endswith(".out"):
+            continue
+        stem = os.path.join(folder, name[:-len(".out")])
+        with open(stem + ".out", "r", encoding="utf-8", errors="replace") as f:
+            expected = f.read()
+        inputs = read_inputs_file(stem + ".in") if os.path.exists(stem + ".in") else []
+        cases.append({"name": name[:-len(".out")], "inputs": inputs, "expected": expected})
+    return cases
+
+
+class _Stop:
+    """An event set for one run, that also reads as set once the whole matrix is cancelled."""
+
+    def __init__(self, cancel_event=None):
+        self.event = threading.Event()
+        self.cancel_event = cancel_event
+
+    def set(self):
+        self.event.set()
+
+    def is_set(self):
+        return self.event.is_set() or (self.cancel_event is not None and self.cancel_event.is_set())
+
+
+class LineWatch:
+    """
+    Compares output against the expected lines as it streams in and sets
+    stop as soon as a complete line differs, so a failing case is not run
+    to the end. Extra or missing lines are left to the final comparison.
+    """
+
+    def __init__(self, expected, stop):
+        self.expected = expected.rstrip().splitlines()
+        self.stop = stop
+        self.pending = ""
+        self.line = 0
+        self.mismatch = None
+
+    def feed(self, text):
+        if self.mismatch is not None:
+            return
+        self.pending += text
+        *lines, self.pending = self.pending.split("\n")
+        for got in lines:
+            if self.line < len(self.expected) and got.rstrip() != self.expected[self.line].rstrip():
+                self.mismatch = self.line + 1
+                self.stop.set()
+                return
+            self.line += 1
+
+
+def check_run(case, backend, result, watch):
+    """A grid cell: the run's outcome ('pass', 'fail', 'error' or 'timeout'), detail and timing."""
+    output = result.get("stdout", "")
+    outcome, detail = "pass", ""
+    if watch.mismatch is not None:
+        outcome = "fail"
+        detail = (first_difference(program_output(output), case["expected"]) or f"line {watch.mismatch}") \
+            + " (stopped early)"
+    elif result["status"] == "timeout":
+        outcome, detail = "timeout", f"{result['stats'].get('limit')} limit"
+    elif result["status"] == "cancelled" or result.get("stats", {}).get("reason") == "cancelled":
+        outcome = "cancelled"
+    elif result["status"] == "error" and (result["stats"]["reason"] != "normal" or backend == "int"):
+        outcome = "error"
+        detail = result["stderr"].strip() or result["stats"].get("signal") or result["stats"]["reason"]
+        if result["stats"]["reason"] == "normal":
+            detail = f"exit code {result['returncode']}"
+    elif "terminated due to errors" in output:
+        outcome = "error"
+        detail = next((line for line in output.splitlines() if line.startswith("Error")), "RARS error")
+    else:
+        difference = first_difference(program_output(output) if backend == "asm" else output, case["expected"])
+        if difference is not None:
+            outcome, detail = "fail", difference
+    return {
+        "case": case["name"],
+        "backend": backend,
+        "outcome": outcome,
+        "detail": detail,
+        "duration": result.get("duration", 0.0),
+        "instructions": result.get("stats", {}).get("instructions"),
+        "stdout": output,
+    }
+
+
+def run_matrix(compiler_file, source, cases=None, backends=BACKENDS, workers=None, extra_args="", cache=None,
+               limits=None, max_steps=DEFAULT_MAX_STEPS, asm_backend="rars", fork_server=True, use_daemon=True,
+               on_result=None, cancel_event=None):
+    """
+    Compile source once, then run every case (from its .tests folder unless
+    cases are given) on the .int program built with gcc and on the .asm
+    under RARS or the built-in simulator, all (case, backend) pairs on a
+    bounded pool of threads. A run stops at its first mismatched line.
+    With fork_server, each thread keeps a fork server of the gcc build, so
+    a case costs a fork rather than a fresh process. With use_daemon, .asm
+    cases run on warm RARS hosts, which return output only at the end, so
+    a failing case is not stopped early.
+
+    on_result(cell) is called as each run finishes. Returns a summary dict
+    with the compile result, the cells, a grid {case: {backend: outcome}},
+    pass/fail counts and the wall time.
+    """
+    start = time.perf_counter()
+    cases = list_cases(tests_dir(source)) if cases is None else cases
+    limits = limits or Limits(wall=10)
+    summary = {
+        "source": source, "cases": [case["name"] for case in cases], "backends": list(backends),
+        "cells": [], "grid": {case["name"]: {} for case in cases}, "passed": 0, "failed": 0,
+    }
+    compiled = compile_source(compiler_file, source, extra_args, cache=cache)
+    summary["compile"] = {key: compiled.get(key) for key in ("status", "duration", "artifacts", "stderr")}
+    artifacts = compiled.get("artifacts") or {}
+
+    executable = None
+    if compiled["status"] == "ok" and "int" in backends and artifacts.get("int"):
+        build = build_intermediate(artifacts["int"], fork_server=fork_server)
+        summary["build"] = {key: build.get(key) for key in ("status", "cached", "duration", "stderr")}
+        if build["status"] == "ok":
+            executable = build["executable"]
+
+    def run_one(case, backend):
+        stop = _Stop(cancel_event)
+        watch = LineWatch(case["expected"], stop)
+        if stop.is_set():
+            return check_run(case, backend, {"status": "cancelled"}, watch)
+        if backend == "int" and executable is None:
+            missing = "no .int produced" if not artifacts.get("int") else "gcc build failed"
+            return dict(check_run(case, backend, {"status": "ok"}, watch), outcome="error", detail=missing)
+        if backend == "asm" and not artifacts.get("asm"):
+            return dict(check_run(case, backend, {"status": "ok"}, watch), outcome="error", detail="no .asm produced")
+
+        if backend == "int":
+            with servers.server() as server:
+                result = server.run(case["inputs"], limits, watch.feed, stop) if server else None
+            if result is None:
+                result = run_program([*LINE_BUFFERED, executable], case["inputs"], limits=limits,
+                                     on_output=watch.feed, cancel_event=stop)
+        else:
+            with daemons.daemon() as daemon:
+                result = run_assembly(artifacts["asm"], case["inputs"], limits=limits, daemon=daemon,
+                                      max_steps=max_steps, backend=asm_backend, on_output=watch.feed,
+                                      cancel_event=stop)
+            if result["stats"].get("daemon"):
+                # The warm host hands back all the output at once.
+                watch.feed(result["stdout"])
+        return check_run(case, backend, result, watch)
+
+    if compiled["status"] == "ok" and cases:
+        jobs = [(case, backend) for case in cases for backend in backends]
+        workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+        daemons = DaemonPool(workers, use_daemon and asm_backend == "rars" and "asm" in backends)
+        servers = ForkServerPool([*LINE_BUFFERED, executable], workers, fork_server and executable is not None)
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(run_one, case, backend) for case, backend in jobs]
+                for future in as_completed(futures):
+                    cell = future.result()
+                    summary["cells"].append(cell)
+                    if on_result:
+                        on_result(cell)
+        finally:
+            daemons.close()
+            servers.close()
+        order = {(case["name"], backend): i for i, (case, backend) in enumerate(jobs)}
+        summary["cells"].sort(key=lambda cell: order[cell["case"], cell["backend"]])
+
+    for cell in summary["cells"]:
+        summary["grid"][cell["case"]][cell["backend"]] = cell["outcome"]
+    summary["passed"] = sum(1 for cell in summary["cells"] if cell["outcome"] == "pass")
+    summary["failed"] = len(summary["cells"]) - summary["passed"]
+    summary["wall_time"] = time.perf_counter() - start
+    return summary
+
+
+def format_grid(summary):
+    """The pass/fail grid as text: one row per case, one column per backend."""
+    width = max([len("case")] + [len(name) for name in summary["cases"]])
+    lines = ["case".ljust(width) + "".join(f"  {backend:<8}" for backend in summary["backends"])]
+    for name in summary["cases"]:
+        row = summary["grid"].get(name, {})
+        lines.append(name.ljust(width) + "".join(f"  {row.get(b, '-'):<8}" for b in summary["backends"]))
+    return "\n".join(lines)
+
+
+def summary_line(summary):
+    if summary["compile"]["status"] != "ok":
+        return f"Compile {summary['compile']['status']}: no cases run"
+    return (
+        f"{summary['passed']} passed, {summary['failed']} failed over {len(summary['cases'])} case(s) "
+        f"x {len(summary['backends'])} backend(s): wall {summary['wall_time']:.2f} s"
+    )
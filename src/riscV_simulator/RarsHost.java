@@ -0,0 +1,184 @@
+import java.io.BufferedInputStream;
+import java.io.BufferedOutputStream;
+import java.io.ByteArrayInputStream;
+import java.io.ByteArrayOutputStream;
+import java.io.DataInputStream;
+import java.io.DataOutputStream;
+import java.io.EOFException;
+import java.io.File;
+import java.io.FileDescriptor;
+import java.io.FileInputStream;
+import java.io.FileOutputStream;
+import java.io.FileWriter;
+import java.io.IOException;
+import java.io.PrintStream;
+import java.lang.management.ManagementFactory;
+import java.lang.management.ThreadMXBean;
+import java.lang.reflect.Field;
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayList;
+
+import rars.AssemblyException;
+import rars.ErrorList;
+import rars.SimulationException;
+import rars.api.Options;
+import rars.api.Program;
+import rars.simulator.Simulator;
+import rars.util.SystemIO;
+
+/**
+ * Keeps RARS loaded in one JVM and runs assembly jobs sent over stdin, so a
+ * run does not pay for JVM startup and class loading. Start it in source-file
+ * mode: java -cp rars_46ab74d.jar RarsHost.java
+ *
+ * Requests and replies are frames: an int32 field count, then each field as
+ * an int32 byte length and UTF-8 bytes (all big-endian). A request holds the
+ * .asm path, the program's stdin and the maximum step count (0 for none).
+ * A reply holds how the run ended (exit, cliff, max-steps, assemble-error,
+ * simulate-error or internal-error), the exit code, the output as RARS prints
+ * it with "nc sm", the CPU time of the job in nanoseconds and the number of
+ * instructions executed (the cycle CSR, as "ic" reports it). The host sends
+ * a single "ready" frame once it is warmed up and exits when stdin closes.
+ *
+ * Headless RARS reads syscall input from System.in and prints to System.out,
+ * and its file descriptors 0-2 are the System streams, so each job gets its
+ * own System.in and its output is collected from System.out and System.err,
+ * as the command line merges them.
+ */
+public class RarsHost {
+
+    public static void main(String[] args) throws Exception {
+        System.setProperty("java.awt.headless", "true");
+        DataInputStream in = new DataInputStream(new BufferedInputStream(new FileInputStream(FileDescriptor.in)));
+        DataOutputStream out = new DataOutputStream(new BufferedOutputStream(new FileOutputStream(FileDescriptor.out)));
+
+        // The program's output, kept apart from the reply stream.
+        ByteArrayOutputStream printed = new ByteArrayOutputStream();
+        PrintStream console = new PrintStream(printed, true, "UTF-8");
+        System.setOut(console);
+        System.setErr(console);
+
+        warmUp(printed);
+        writeFrame(out, new String[] {"ready"});
+
+        while (true) {
+            String[] request;
+            try {
+                request = readFrame(in);
+            } catch (EOFException e) {
+                return;
+            }
+            printed.reset();
+            writeFrame(out, runJob(request[0], request[1], Integer.parseInt(request[2]), printed));
+        }
+    }
+
+    /** Assemble and run a trivial program so the first real job finds everything loaded. */
+    private static void warmUp(ByteArrayOutputStream printed) {
+        try {
+            File file = File.createTempFile("rars_warmup", ".asm");
+            try (FileWriter writer = new FileWriter(file)) {
+                writer.write(".text\nmain:\n    li a7, 10\n    ecall\n");
+            }
+            runJob(file.getPath(), "", 0, printed);
+            file.delete();
+        } catch (IOException e) {
+            // Only a slower first job.
+        }
+        printed.reset();
+    }
+
+    private static String[] runJob(String file, String stdin, int maxSteps, ByteArrayOutputStream printed) {
+        ThreadMXBean threads = ManagementFactory.getThreadMXBean();
+        long cpuStart = threads.getCurrentThreadCpuTime();
+        StringBuilder output = new StringBuilder();
+        String reason;
+        int exitCode = 0;
+
+        System.setIn(new ByteArrayInputStream(stdin.getBytes(StandardCharsets.UTF_8)));
+        resetInputReader();
+        Options options = new Options();
+        options.startAtMain = true;
+        options.maxSteps = maxSteps;
+        Program program = new Program(options);
+        try {
+            ErrorList warnings = program.assemble(file);
+            if (warnings != null && warnings.warningsOccurred()) {
+                output.append(warnings.generateWarningReport()).append('\n');
+            }
+            // No stdin here: setup would give descriptors 0-2 private buffers instead of the System streams.
+            program.setup(new ArrayList<String>(), null);
+            Simulator.Reason done = program.simulate();
+            output.append(drain(printed));
+            if (done == Simulator.Reason.MAX_STEPS) {
+                output.append("\nProgram terminated when maximum step limit ").append(maxSteps).append(" reached.\n");
+                reason = "max-steps";
+            } else if (done == Simulator.Reason.CLIFF_TERMINATION) {
+                output.append("\nProgram terminated by dropping off the bottom.\n");
+                reason = "cliff";
+            } else {
+                output.append("\nProgram terminated by calling exit\n");
+                reason = "exit";
+                exitCode = program.getExitCode();
+            }
+        } catch (AssemblyException e) {
+            output.append(e.errors().generateErrorAndWarningReport());
+            output.append("\nProcessing terminated due to errors.\n");
+            reason = "assemble-error";
+        } catch (SimulationException e) {
+            output.append(drain(printed));
+            output.append(e.error().generateReport());
+            output.append("\nSimulation terminated due to errors.\n");
+            reason = "simulate-error";
+        } catch (Throwable t) {
+            output.append(drain(printed));
+            output.append(t).append('\n');
+            reason = "internal-error";
+        }
+
+        long cpu = threads.getCurrentThreadCpuTime() - cpuStart;
+        String instructions = "";
+        if (!reason.equals("assemble-error") && !reason.equals("internal-error")) {
+            instructions = Integer.toUnsignedString(program.getRegisterValue("cycle"));
+        }
+        return new String[] {reason, Integer.toString(exitCode), output.toString(), Long.toString(cpu), instructions};
+    }
+
+    private static String drain(ByteArrayOutputStream printed) {
+        String text = new String(printed.toByteArray(), StandardCharsets.UTF_8);
+        printed.reset();
+        return text;
+    }
+
+    /** SystemIO caches a reader over the System.in of the first job; make the next read use this job's. */
+    private static void resetInputReader() {
+        try {
+            Field field = SystemIO.class.getDeclaredField("inputReader");
+            field.setAccessible(true);
+            field.set(null, null);
+        } catch (ReflectiveOperationException | RuntimeException e) {
+            // A RARS without the cached reader.
+        }
+    }
+
+    private static String[] readFrame(DataInputStream in) throws IOException {
+        int count = in.readInt();
+        String[] fields = new String[count];
+        for (int i = 0; i < count; i++) {
+            byte[] data = new byte[in.readInt()];
+            in.readFully(data);
+            fields[i] = new String(data, StandardCharsets.UTF_8);
+        }
+        return fields;
+    }
+
+    private static void writeFrame(DataOutputStream out, String[] fields) throws IOException {
+        out.writeInt(fields.length);
+        for (String field : fields) {
+            byte[] data = field.getBytes(StandardCharsets.UTF_8);
+            out.writeInt(data.length);
+            out.write(data);
+        }
+        out.flush();
+    }
+}
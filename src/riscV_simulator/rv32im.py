@@ -0,0 +1,828 @@
+import re
+import time
+
+# RARS's default memory configuration.
+TEXT_BASE = 0x00400000
+DATA_BASE = 0x10010000
+GP_INIT = 0x10008000
+SP_INIT = 0x7FFFEFFC
+
+MASK = 0xFFFFFFFF
+SIGN = 0x80000000
+
+# Opcodes of the pre-decoded instruction array, roughly most frequent first.
+(OP_ADDI, OP_LW, OP_SW, OP_ADD, OP_SUB, OP_CONST,
+ OP_BEQ, OP_BNE, OP_BLT, OP_BGE, OP_BLTU, OP_BGEU, OP_JAL, OP_JALR,
+ OP_SLT, OP_SLTU, OP_SLTI, OP_SLTIU, OP_AND, OP_OR, OP_XOR, OP_ANDI, OP_ORI, OP_XORI,
+ OP_SLL, OP_SRL, OP_SRA, OP_SLLI, OP_SRLI, OP_SRAI,
+ OP_MUL, OP_MULH, OP_MULHSU, OP_MULHU, OP_DIV, OP_DIVU, OP_REM, OP_REMU,
+ OP_LB, OP_LBU, OP_LH, OP_LHU, OP_SB, OP_SH, OP_ECALL, OP_NOP) = range(46)
+
+_R_TYPE = {
+    'add': OP_ADD, 'sub': OP_SUB, 'slt': OP_SLT, 'sltu': OP_SLTU, 'and': OP_AND, 'or': OP_OR, 'xor': OP_XOR,
+    'sll': OP_SLL, 'srl': OP_SRL, 'sra': OP_SRA, 'mul': OP_MUL, 'mulh': OP_MULH, 'mulhsu': OP_MULHSU,
+    'mulhu': OP_MULHU, 'div': OP_DIV, 'divu': OP_DIVU, 'rem': OP_REM, 'remu': OP_REMU,
+}
+_I_TYPE = {
+    'addi': OP_ADDI, 'slti': OP_SLTI, 'sltiu': OP_SLTIU, 'andi': OP_ANDI, 'ori': OP_ORI, 'xori': OP_XORI,
+}
+_SHIFTS = {'slli': OP_SLLI, 'srli': OP_SRLI, 'srai': OP_SRAI}
+_LOADS = {'lw': OP_LW, 'lb': OP_LB, 'lbu': OP_LBU, 'lh': OP_LH, 'lhu': OP_LHU}
+_STORES = {'sw': OP_SW, 'sb': OP_SB, 'sh': OP_SH}
+_BRANCHES = {'beq': OP_BEQ, 'bne': OP_BNE, 'blt': OP_BLT, 'bge': OP_BGE, 'bltu': OP_BLTU, 'bgeu': OP_BGEU}
+# Pseudo branches: (basic branch, operands swapped).
+_SWAPPED_BRANCHES = {'bgt': ('blt', True), 'ble': ('bge', True), 'bgtu': ('bltu', True), 'bleu': ('bgeu', True)}
+# Branches against zero: (basic branch, zero is the first operand).
+_ZERO_BRANCHES = {
+    'beqz': ('beq', False), 'bnez': ('bne', False), 'bltz': ('blt', False), 'bgez': ('bge', False),
+    'bgtz': ('blt', True), 'blez': ('bge', True),
+}
+
+_ABI_NAMES = [
+    'zero', 'ra', 'sp', 'gp', 'tp', 't0', 't1', 't2', 's0', 's1', 'a0', 'a1', 'a2', 'a3', 'a4', 'a5',
+    'a6', 'a7', 's2', 's3', 's4', 's5', 's6', 's7', 's8', 's9', 's10', 's11', 't3', 't4', 't5', 't6',
+]
+REGISTERS = {name: i for i, name in enumerate(_ABI_NAMES)}
+REGISTERS.update({f"x{i}": i for i in range(32)})
+REGISTERS['fp'] = 8
+# Writes to x0 go to this extra slot, so no instruction has to test for x0.
+_SINK = 32
+
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '0': '\0', '\\': '\\', '"': '"', "'": "'"}
+_MEMORY_OPERAND = re.compile(r"^(.*)\(\s*(\w+)\s*\)$")
+_INTEGER = re.compile(r"^[+-]?\d+$")
+
+
+class AssemblyError(Exception):
+    """An .asm line this assembler cannot handle, with its line number."""
+
+    def __init__(self, line, message, column=None):
+        where = f"line {line}" if column is None else f"line {line} column {column}"
+        super().__init__(f"{where}: {message}")
+        self.line = line
+
+
+class AssembledProgram:
+    """
+    The text segment as a pre-decoded instruction array of (op, a, b, c)
+    tuples, one per basic instruction (pseudo-instructions are expanded the
+    way RARS expands them, so addresses and instruction counts agree), the
+    source line of each instruction, the initial data segment as a sparse
+    word map, the label table and the entry index.
+    """
+    __slots__ = ("code", "lines", "words", "labels", "entry", "filename")
+
+    def __init__(self, code, lines, words, labels, entry, filename):
+        self.code = code
+        self.lines = lines
+        self.words = words
+        self.labels = labels
+        self.entry = entry
+        self.filename = filename
+
+
+def _strip_comment(line):
+    quote = None
+    i = 0
+    while i < len(line):
+        ch = line[i]
+        if quote:
+            if ch == '\\':
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in '"\'':
+            quote = ch
+        elif ch == '#':
+            return line[:i]
+        i += 1
+    return line
+
+
+def _unescape(text, line):
+    out = []
+    chars = iter(text)
+    for ch in chars:
+        if ch == '\\':
+            ch = next(chars, '')
+            if ch not in _ESCAPES:
+                raise AssemblyError(line, f"unknown escape sequence \\{ch}")
+            ch = _ESCAPES[ch]
+        out.append(ch)
+    return "".join(out)
+
+
+def _split_operands(text):
+    """Operands separated by commas and/or spaces, keeping quoted strings whole."""
+    operands, current, quote = [], [], None
+    for ch in text:
+        if quote:
+            current.append(ch)
+            if ch == quote and (len(current) < 2 or current[-2] != '\\'):
+                quote = None
+        elif ch in '"\'':
+            quote = ch
+            current.append(ch)
+        elif ch in ', \t':
+            if current:
+                operands.append("".join(current))
+                current = []
+        else:
+            current.append(ch)
+    if current:
+        operands.append("".join(current))
+    # "4 (sp)" was split at the space.
+    merged = []
+    for operand in operands:
+        if operand.startswith('(') and merged:
+            merged[-1] += operand
+        else:
+            merged.append(operand)
+    return merged
+
+
+def _number(text, line):
+    text = text.strip()
+    if len(text) >= 3 and text[0] == text[-1] == "'":
+        value = _unescape(text[1:-1], line)
+        if len(value) != 1:
+            raise AssemblyError(line, f"bad character literal {text}")
+        return ord(value)
+    try:
+        return int(text, 0)
+    except ValueError:
+        raise AssemblyError(line, f"'{text}' is not a number") from None
+
+
+def _is_number(text):
+    text = text.strip()
+    if len(text) >= 3 and text[0] == text[-1] == "'":
+        return True
+    try:
+        int(text, 0)
+        return True
+    except ValueError:
+        return False
+
+
+def _register(text, line):
+    index = REGISTERS.get(text.strip())
+    if index is None:
+        raise AssemblyError(line, f"'{text}' is not a register")
+    return index
+
+
+def _dest(index):
+    return _SINK if index == 0 else index
+
+
+def _signed12(value):
+    return -2048 <= value <= 2047
+
+
+def _hi_lo(offset):
+    """Split a 32-bit offset for auipc/lui + a 12-bit signed add, like %hi/%lo."""
+    hi = ((offset + 0x800) >> 12) & 0xFFFFF
+    lo = offset - (((offset + 0x800) >> 12) << 12)
+    return hi, lo
+
+
+def _expand(mnemonic, ops, line, column=None):
+    """
+    The basic instructions a source instruction stands for, as
+    (name, a, b, c, label) with label still unresolved. column is where the
+    mnemonic starts, for RARS's unknown-operator message.
+    """
+    def need(count):
+        if len(ops) != count:
+            raise AssemblyError(line, f"{mnemonic} takes {count} operands, got {len(ops)}")
+
+    def reg(i):
+        return _register(ops[i], line)
+
+    def imm12(text):
+        value = _number(text, line)
+        if not _signed12(value):
+            raise AssemblyError(line, f"immediate {value} out of range for {mnemonic}")
+        return value
+
+    def memory(text):
+        match = _MEMORY_OPERAND.match(text.strip())
+        if match is None:
+            return None
+        offset = match.group(1).strip()
+        return (imm12(offset) if offset else 0), _register(match.group(2), line)
+
+    if mnemonic in _R_TYPE:
+        need(3)
+        return [(mnemonic, reg(0), reg(1), reg(2), None)]
+    if mnemonic in _I_TYPE:
+        need(3)
+        return [(mnemonic, reg(0), reg(1), imm12(ops[2]), None)]
+    if mnemonic in _SHIFTS:
+        need(3)
+        amount = _number(ops[2], line)
+        if not 0 <= amount <= 31:
+            raise AssemblyError(line, f"shift amount {amount} out of range")
+        return [(mnemonic, reg(0), reg(1), amount, None)]
+    if mnemonic in _LOADS:
+        if len(ops) == 2 and memory(ops[1]) is None:
+            # lw rd, label: auipc rd + lw rd, %lo(rd)
+            return [('auipc', reg(0), 0, 0, ('hi', ops[1])), (mnemonic, reg(0), reg(0), 0, ('lo', ops[1]))]
+        need(2)
+        address = memory(ops[1])
+        if address is None:
+            raise AssemblyError(line, f"bad memory operand {ops[1]}")
+        return [(mnemonic, reg(0), address[1], address[0], None)]
+    if mnemonic in _STORES:
+        if len(ops) == 3 and memory(ops[1]) is None:
+            # sw rs, label, rt: auipc rt + sw rs, %lo(rt)
+            return [('auipc', reg(2), 0, 0, ('hi', ops[1])), (mnemonic, reg(0), reg(2), 0, ('lo', ops[1]))]
+        need(2)
+        address = memory(ops[1])
+        if address is None:
+            raise AssemblyError(line, f"bad memory operand {ops[1]}")
+        return [(mnemonic, reg(0), address[1], address[0], None)]
+    if mnemonic in _BRANCHES:
+        need(3)
+        return [(mnemonic, reg(0), reg(1), 0, ('target', ops[2]))]
+    if mnemonic in _SWAPPED_BRANCHES:
+        need(3)
+        basic, _ = _SWAPPED_BRANCHES[mnemonic]
+        return [(basic, reg(1), reg(0), 0, ('target', ops[2]))]
+    if mnemonic in _ZERO_BRANCHES:
+        need(2)
+        basic, zero_first = _ZERO_BRANCHES[mnemonic]
+        a, b = (0, reg(0)) if zero_first else (reg(0), 0)
+        return [(basic, a, b, 0, ('target', ops[1]))]
+
+    if mnemonic == 'li':
+        need(2)
+        value = _number(ops[1], line)
+        if not -SIGN <= value <= MASK:
+            raise AssemblyError(line, f"immediate {value} out of range for li")
+        value = ((value + SIGN) & MASK) - SIGN
+        if _signed12(value):
+            return [('addi', reg(0), 0, value, None)]
+        hi, lo = _hi_lo(value)
+        return [('lui', reg(0), 0, hi, None), ('addi', reg(0), reg(0), lo, None)]
+    if mnemonic == 'lui':
+        need(2)
+        value = _number(ops[1], line)
+        if not 0 <= value <= 0xFFFFF:
+            raise AssemblyError(line, f"immediate {value} out of range for lui")
+        return [('lui', reg(0), 0, value, None)]
+    if mnemonic == 'auipc':
+        need(2)
+        value = _number(ops[1], line)
+        if not 0 <= value <= 0xFFFFF:
+            raise AssemblyError(line, f"immediate {value} out of range for auipc")
+        return [('auipc', reg(0), 0, value, None)]
+    if mnemonic == 'la':
+        need(2)
+        return [('auipc', reg(0), 0, 0, ('hi', ops[1])), ('addi', reg(0), reg(0), 0, ('lo', ops[1]))]
+    if mnemonic == 'mv':
+        need(2)
+        return [('add', reg(0), 0, reg(1), None)]
+    if mnemonic == 'not':
+        need(2)
+        return [('xori', reg(0), reg(1), -1, None)]
+    if mnemonic == 'neg':
+        need(2)
+        return [('sub', reg(0), 0, reg(1), None)]
+    if mnemonic == 'seqz':
+        need(2)
+        return [('sltiu', reg(0), reg(1), 1, None)]
+    if mnemonic == 'snez':
+        need(2)
+        return [('sltu', reg(0), 0, reg(1), None)]
+    if mnemonic == 'sltz':
+        need(2)
+        return [('slt', reg(0), reg(1), 0, None)]
+    if mnemonic == 'sgtz':
+        need(2)
+        return [('slt', reg(0), 0, reg(1), None)]
+    if mnemonic == 'sgt':
+        need(3)
+        return [('slt', reg(0), reg(2), reg(1), None)]
+    if mnemonic == 'sgtu':
+        need(3)
+        return [('sltu', reg(0), reg(2), reg(1), None)]
+    if mnemonic == 'nop':
+        need(0)
+        return [('addi', 0, 0, 0, None)]
+    if mnemonic == 'j':
+        need(1)
+        return [('jal', 0, 0, 0, ('target', ops[0]))]
+    if mnemonic == 'jal':
+        if len(ops) == 1:
+            return [('jal', 1, 0, 0, ('target', ops[0]))]
+        need(2)
+        return [('jal', reg(0), 0, 0, ('target', ops[1]))]
+    if mnemonic == 'jr':
+        need(1)
+        return [('jalr', 0, reg(0), 0, None)]
+    if mnemonic == 'jalr':
+        if len(ops) == 1:
+            return [('jalr', 1, reg(0), 0, None)]
+        if len(ops) == 2:
+            address = memory(ops[1])
+            if address is None:
+                raise AssemblyError(line, f"bad memory operand {ops[1]}")
+            return [('jalr', reg(0), address[1], address[0], None)]
+        need(3)
+        return [('jalr', reg(0), reg(1), imm12(ops[2]), None)]
+    if mnemonic == 'ret':
+        need(0)
+        return [('jalr', 0, 1, 0, None)]
+    if mnemonic == 'call':
+        need(1)
+        return [('auipc', 1, 0, 0, ('hi', ops[0])), ('jalr', 1, 1, 0, ('lo', ops[0]))]
+    if mnemonic == 'tail':
+        need(1)
+        return [('auipc', 6, 0, 0, ('hi', ops[0])), ('jalr', 0, 6, 0, ('lo', ops[0]))]
+    if mnemonic == 'ecall':
+        need(0)
+        return [('ecall', 0, 0, 0, None)]
+    raise AssemblyError(line, f'"{mnemonic}" is not a recognized operator', column)
+
+
+def _decode(name, a, b, c):
+    """The executable (op, a, b, c) tuple of a basic instruction with its immediates final."""
+    if name in _R_TYPE:
+        return (_R_TYPE[name], _dest(a), b, c)
+    if name == 'addi':
+        return (OP_ADDI, _dest(a), b, c) if a else (OP_NOP, 0, 0, 0)
+    if name == 'slti':
+        return (OP_SLTI, _dest(a), b, (c & MASK) ^ SIGN)
+    if name in _I_TYPE:
+        return (_I_TYPE[name], _dest(a), b, c & MASK)
+    if name in _SHIFTS:
+        return (_SHIFTS[name], _dest(a), b, c)
+    if name in _LOADS:
+        return (_LOADS[name], _dest(a), b, c)
+    if name in _STORES:
+        return (_STORES[name], a, b, c)
+    if name in _BRANCHES:
+        return (_BRANCHES[name], a, b, c)
+    if name in ('lui', 'auipc'):
+        # Both load a constant once the address is known.
+        return (OP_CONST, _dest(a), 0, c & MASK)
+    if name == 'jal':
+        return (OP_JAL, _dest(a), 0, c)
+    if name == 'jalr':
+        return (OP_JALR, _dest(a), b, c)
+    return (OP_ECALL, 0, 0, 0)
+
+
+def assemble(source, filename=""):
+    """
+    Assemble RARS-syntax source for the RV32IM subset plus the usual
+    pseudo-instructions and data directives. Raises AssemblyError.
+    """
+    text_items = []   # (name, a, b, c, label, line) per basic instruction
+    data = bytearray()
+    data_refs = []    # (offset, label, line) of .word label operands
+    labels = {}
+    global_labels = set()
+    equivalents = {}
+    in_text = True
+    # Data labels with nothing after them yet move along when .word etc. align.
+    fresh_labels = []
+
+    def align(size):
+        while len(data) % size:
+            data.append(0)
+        for label in fresh_labels:
+            labels[label] = DATA_BASE + len(data)
+
+    for number, raw in enumerate(source.splitlines(), start=1):
+        line = _strip_comment(raw).strip()
+        while True:
+            match = re.match(r"^([A-Za-z_.$][\w.$]*)\s*:", line)
+            if match is None:
+                break
+            label = match.group(1)
+            if label in labels:
+                raise AssemblyError(number, f"label '{label}' already defined")
+            labels[label] = TEXT_BASE + 4 * len(text_items) if in_text else DATA_BASE + len(data)
+            if not in_text:
+                fresh_labels.append(label)
+            line = line[match.end():].strip()
+        if not line:
+            continue
+        parts = line.split(None, 1)
+        head = parts[0].lower()
+        rest = parts[1] if len(parts) > 1 else ""
+        ops = [equivalents.get(op, op) for op in _split_operands(rest)]
+
+        if head.startswith('.'):
+            if head == '.text':
+                in_text = True
+            elif head == '.data':
+                in_text = False
+            elif head in ('.globl', '.global'):
+                global_labels.update(ops)
+            elif head == '.eqv':
+                if len(ops) != 2:
+                    raise AssemblyError(number, ".eqv takes a name and a value")
+                equivalents[ops[0]] = ops[1]
+            elif in_text:
+                raise AssemblyError(number, f"directive {head} is not allowed in .text")
+            elif head in ('.word', '.half', '.byte'):
+                size = {'.word': 4, '.half': 2, '.byte': 1}[head]
+                align(size)
+                for op in ops:
+                    if ':' in op and _is_number(op.split(':')[0]):
+                        value, count = op.split(':')
+                        values = [_number(value, number)] * _number(count, number)
+                    elif size == 4 and not _is_number(op):
+                        # A label's address; resolved once every label is known.
+                        values = [("label", op)]
+                    else:
+                        values = [_number(op, number)]
+                    for value in values:
+                        if isinstance(value, tuple):
+                            data_refs.append((len(data), value[1], number))
+                            data.extend(b"\0\0\0\0")
+                        else:
+                            data.extend((value & ((1 << (8 * size)) - 1)).to_bytes(size, 'little'))
+            elif head in ('.asciz', '.string', '.ascii'):
+                for op in ops:
+                    if len(op) < 2 or op[0] != '"' or op[-1] != '"':
+                        raise AssemblyError(number, f"{head} needs a quoted string")
+                    data.extend(_unescape(op[1:-1], number).encode('utf-8'))
+                    if head != '.ascii':
+                        data.append(0)
+            elif head == '.space':
+                data.extend(bytes(_number(ops[0], number) if ops else 0))
+            elif head == '.align':
+                align(1 << _number(ops[0], number) if ops else 1)
+            else:
+                raise AssemblyError(number, f"unsupported directive {head}")
+            if head not in ('.align', '.globl', '.global', '.eqv'):
+                fresh_labels.clear()
+            continue
+
+        if not in_text:
+            raise AssemblyError(number, f"instruction '{head}' in .data")
+        column = len(_strip_comment(raw).rstrip()) - len(line) + 1
+        for item in _expand(head, ops, number, column):
+            text_items.append(item + (number,))
+
+    def resolve(label, line):
+        if _is_number(label):
+            return _number(label, line)
+        address = labels.get(label)
+        if address is None:
+            raise AssemblyError(line, f"label '{label}' is not defined")
+        return address
+
+    code, lines = [], []
+    for name, a, b, c, ref, line in text_items:
+        index = len(code)
+        address = TEXT_BASE + 4 * index
+        if ref is not None:
+            kind, label = ref
+            if kind == 'target':
+                target = resolve(label, line)
+                if target & 3 or not TEXT_BASE <= target < TEXT_BASE + 4 * len(text_items):
+                    raise AssemblyError(line, f"'{label}' is not a text label")
+                c = (target - TEXT_BASE) >> 2
+            elif kind == 'hi':
+                c = (address + (_hi_lo(resolve(label, line) - address)[0] << 12)) & MASK
+            else:
+                # The matching auipc is the instruction just before this one.
+                c = _hi_lo(resolve(label, line) - (address - 4))[1]
+        elif name == 'lui':
+            c = c << 12
+        elif name == 'auipc':
+            c = address + (c << 12)
+        code.append(_decode(name, a, b, c))
+        lines.append(line)
+
+    for offset, label, line in data_refs:
+        data[offset:offset + 4] = (resolve(label, line) & MASK).to_bytes(4, 'little')
+    align(4)
+    words = {
+        (DATA_BASE >> 2) + i: int.from_bytes(data[4 * i:4 * i + 4], 'little')
+        for i in range(len(data) // 4) if any(data[4 * i:4 * i + 4])
+    }
+    # Like RARS with 'sm': start at main only if it is declared global.
+    entry = 0
+    if 'main' in global_labels and 'main' in labels:
+        entry = (labels['main'] - TEXT_BASE) >> 2
+    return AssembledProgram(code, lines, words, labels, entry, filename)
+
+
+def assemble_file(path):
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return assemble(f.read(), path)
+
+
+class _RuntimeFault(Exception):
+    pass
+
+
+def simulate(program, inputs=(), on_output=None, max_steps=0, timeout=None, cancel_event=None, max_output=None,
+             cpu_timeout=None):
+    """
+    Run an AssembledProgram with the given input values on stdin, one per
+    line (plus a trailing empty line, like the RARS path). on_output(text)
+    receives output as it is produced. Execution stops after max_steps
+    instructions (0 for no limit), timeout seconds, cpu_timeout seconds of
+    this thread's CPU time, about max_output characters of output or once
+    cancel_event is set. Returns a dict with stdout (ending in the
+    termination message RARS prints), end ('exit', 'cliff', 'max-steps',
+    'simulate-error', 'timeout', 'cpu-timeout', 'output-limit' or
+    'cancelled'), exit_code, instructions and duration.
+    """
+    code = program.code
+    n = len(code)
+    regs = [0] * 33
+    regs[2] = SP_INIT
+    regs[3] = GP_INIT
+    mem = dict(program.words)
+    stdin = iter("".join(str(value) + "\n" for value in inputs) + "\n")
+    out, pending = [], []
+    out_size = 0
+    exit_code = 0
+    end = None
+    message = None
+    pc = program.entry
+    steps = 0
+    limit = max_steps if max_steps else -1
+    start = time.perf_counter()
+    deadline = start + timeout if timeout else None
+    cpu_deadline = time.thread_time() + cpu_timeout if cpu_timeout else None
+
+    def emit(text):
+        nonlocal out_size
+        out.append(text)
+        pending.append(text)
+        out_size += len(text)
+
+    def read_line():
+        chars = []
+        for ch in stdin:
+            if ch == '\n':
+                return "".join(chars)
+            chars.append(ch)
+        return "".join(chars) if chars else None
+
+    def load_byte(address):
+        return (mem.get(address >> 2, 0) >> (8 * (address & 3))) & 0xFF
+
+    def store_byte(address, value):
+        shift = 8 * (address & 3)
+        key = address >> 2
+        mem[key] = (mem.get(key, 0) & ~(0xFF << shift) & MASK) | ((value & 0xFF) << shift)
+
+    def syscall():
+        nonlocal exit_code
+        service = regs[17]
+        a0 = regs[10]
+        if service == 1:
+            emit(str(a0 - ((a0 & SIGN) << 1)))
+        elif service == 4:
+            chunk = bytearray()
+            address = a0
+            while True:
+                byte = load_byte(address)
+                if not byte:
+                    break
+                chunk.append(byte)
+                address = (address + 1) & MASK
+            emit(chunk.decode('utf-8', 'replace'))
+        elif service == 5:
+            value = read_line()
+            value = value.strip() if value is not None else ""
+            if not _INTEGER.match(value) or not -SIGN <= int(value) < SIGN:
+                raise _RuntimeFault("invalid integer input (syscall 5)")
+            regs[10] = int(value) & MASK
+        elif service == 8:
+            value = read_line() or ""
+            size = regs[11] - ((regs[11] & SIGN) << 1)
+            encoded = (value + "\n").encode('utf-8')[:max(size - 1, 0)]
+            for i, byte in enumerate(encoded + b"\0" if size > 0 else b""):
+                store_byte((a0 + i) & MASK, byte)
+        elif service == 10:
+            exit_code = 0
+            return True
+        elif service == 11:
+            emit(chr(a0 & 0xFFFF))
+        elif service == 12:
+            ch = next(stdin, None)
+            if ch is None:
+                raise _RuntimeFault("invalid char input (syscall 12)")
+            regs[10] = ord(ch) & MASK
+        elif service == 34:
+            emit(f"0x{a0:08x}")
+        elif service == 35:
+            emit(f"{a0:032b}")
+        elif service == 36:
+            emit(str(a0))
+        elif service == 64:
+            # write: only stdout and stderr are open, both go to the console.
+            if a0 in (1, 2):
+                size = regs[12] - ((regs[12] & SIGN) << 1)
+                chunk = bytes(load_byte((regs[11] + i) & MASK) for i in range(max(size, 0)))
+                emit(chunk.decode('utf-8', 'replace'))
+                regs[10] = max(size, 0)
+            else:
+                regs[10] = MASK
+        elif service == 93:
+            exit_code = a0 - ((a0 & SIGN) << 1)
+            return True
+        else:
+            raise _RuntimeFault(f"invalid or unimplemented syscall service: {service}")
+        return False
+
+    try:
+        while True:
+            if pc >= n:
+                end = "cliff"
+                break
+            if steps == limit:
+                end = "max-steps"
+                break
+            steps += 1
+            if not steps & 0xFFFF:
+                if pending and on_output is not None:
+                    on_output("".join(pending))
+                    pending.clear()
+                if deadline is not None and time.perf_counter() > deadline:
+                    end = "timeout"
+                    steps -= 1
+                    break
+                if cpu_deadline is not None and time.thread_time() > cpu_deadline:
+                    end = "cpu-timeout"
+                    steps -= 1
+                    break
+                if cancel_event is not None and cancel_event.is_set():
+                    end = "cancelled"
+                    steps -= 1
+                    break
+                if max_output is not None and out_size > max_output:
+                    end = "output-limit"
+                    steps -= 1
+                    break
+            op, a, b, c = code[pc]
+            pc += 1
+            if op == OP_ADDI:
+                regs[a] = (regs[b] + c) & MASK
+            elif op == OP_LW:
+                address = (regs[b] + c) & MASK
+                if address & 3:
+                    raise _RuntimeFault(f"Load address not aligned to word boundary 0x{address:08x}")
+                regs[a] = mem.get(address >> 2, 0)
+            elif op == OP_SW:
+                address = (regs[b] + c) & MASK
+                if address & 3:
+                    raise _RuntimeFault(f"Store address not aligned to word boundary 0x{address:08x}")
+                mem[address >> 2] = regs[a]
+            elif op == OP_ADD:
+                regs[a] = (regs[b] + regs[c]) & MASK
+            elif op == OP_SUB:
+                regs[a] = (regs[b] - regs[c]) & MASK
+            elif op == OP_CONST:
+                regs[a] = c
+            elif op == OP_BEQ:
+                if regs[a] == regs[b]:
+                    pc = c
+            elif op == OP_BNE:
+                if regs[a] != regs[b]:
+                    pc = c
+            elif op == OP_BLT:
+                if regs[a] ^ SIGN < regs[b] ^ SIGN:
+                    pc = c
+            elif op == OP_BGE:
+                if regs[a] ^ SIGN >= regs[b] ^ SIGN:
+                    pc = c
+            elif op == OP_BLTU:
+                if regs[a] < regs[b]:
+                    pc = c
+            elif op == OP_BGEU:
+                if regs[a] >= regs[b]:
+                    pc = c
+            elif op == OP_JAL:
+                regs[a] = TEXT_BASE + 4 * pc
+                pc = c
+            elif op == OP_JALR:
+                target = (regs[b] + c) & MASK & ~1
+                regs[a] = TEXT_BASE + 4 * pc
+                index = (target - TEXT_BASE) >> 2
+                if target & 3 or not 0 <= index <= n:
+                    raise _RuntimeFault(f"Instruction load access error 0x{target:08x}")
+                pc = index
+            elif op == OP_ECALL:
+                if syscall():
+                    # Like RARS, the ecall that exits is not counted.
+                    end = "exit"
+                    steps -= 1
+                    break
+            elif op == OP_NOP:
+                pass
+            elif op == OP_SLT:
+                regs[a] = 1 if regs[b] ^ SIGN < regs[c] ^ SIGN else 0
+            elif op == OP_SLTU:
+                regs[a] = 1 if regs[b] < regs[c] else 0
+            elif op == OP_SLTI:
+                regs[a] = 1 if regs[b] ^ SIGN < c else 0
+            elif op == OP_SLTIU:
+                regs[a] = 1 if regs[b] < c else 0
+            elif op == OP_AND:
+                regs[a] = regs[b] & regs[c]
+            elif op == OP_OR:
+                regs[a] = regs[b] | regs[c]
+            elif op == OP_XOR:
+                regs[a] = regs[b] ^ regs[c]
+            elif op == OP_ANDI:
+                regs[a] = regs[b] & c
+            elif op == OP_ORI:
+                regs[a] = regs[b] | c
+            elif op == OP_XORI:
+                regs[a] = regs[b] ^ c
+            elif op == OP_SLL:
+                regs[a] = (regs[b] << (regs[c] & 31)) & MASK
+            elif op == OP_SRL:
+                regs[a] = regs[b] >> (regs[c] & 31)
+            elif op == OP_SRA:
+                regs[a] = ((regs[b] - ((regs[b] & SIGN) << 1)) >> (regs[c] & 31)) & MASK
+            elif op == OP_SLLI:
+                regs[a] = (regs[b] << c) & MASK
+            elif op == OP_SRLI:
+                regs[a] = regs[b] >> c
+            elif op == OP_SRAI:
+                regs[a] = ((regs[b] - ((regs[b] & SIGN) << 1)) >> c) & MASK
+            elif op == OP_MUL:
+                regs[a] = (regs[b] * regs[c]) & MASK
+            elif op in (OP_MULH, OP_MULHSU, OP_MULHU):
+                x, y = regs[b], regs[c]
+                if op != OP_MULHU:
+                    x -= (x & SIGN) << 1
+                if op == OP_MULH:
+                    y -= (y & SIGN) << 1
+                regs[a] = ((x * y) >> 32) & MASK
+            elif op in (OP_DIV, OP_REM):
+                x = regs[b] - ((regs[b] & SIGN) << 1)
+                y = regs[c] - ((regs[c] & SIGN) << 1)
+                if y == 0:
+                    # RISC-V does not trap: the quotient is -1, the remainder the dividend.
+                    regs[a] = MASK if op == OP_DIV else regs[b]
+                else:
+                    q = abs(x) // abs(y)
+                    if (x < 0) != (y < 0):
+                        q = -q
+                    regs[a] = (q if op == OP_DIV else x - q * y) & MASK
+            elif op == OP_DIVU:
+                regs[a] = regs[b] // regs[c] if regs[c] else MASK
+            elif op == OP_REMU:
+                regs[a] = regs[b] % regs[c] if regs[c] else regs[b]
+            elif op in (OP_LB, OP_LBU):
+                value = load_byte((regs[b] + c) & MASK)
+                if op == OP_LB and value & 0x80:
+                    value |= 0xFFFFFF00
+                regs[a] = value
+            elif op in (OP_LH, OP_LHU):
+                address = (regs[b] + c) & MASK
+                if address & 1:
+                    raise _RuntimeFault(f"Load address not aligned on halfword boundary 0x{address:08x}")
+                value = load_byte(address) | (load_byte(address + 1) << 8)
+                if op == OP_LH and value & 0x8000:
+                    value |= 0xFFFF0000
+                regs[a] = value
+            elif op == OP_SB:
+                store_byte((regs[b] + c) & MASK, regs[a])
+            elif op == OP_SH:
+                address = (regs[b] + c) & MASK
+                if address & 1:
+                    raise _RuntimeFault(f"Store address not aligned on halfword boundary 0x{address:08x}")
+                store_byte(address, regs[a])
+                store_byte(address + 1, regs[a] >> 8)
+    except _RuntimeFault as e:
+        # Nor is the instruction that faulted.
+        end = "simulate-error"
+        steps -= 1
+        message = (
+            f"Error in {program.filename} line {program.lines[pc - 1]}: "
+            f"Runtime exception at 0x{TEXT_BASE + 4 * (pc - 1):08x}: {e}\n"
+        )
+
+    if end == "exit":
+        emit("\nProgram terminated by calling exit\n")
+    elif end == "cliff":
+        emit("\nProgram terminated by dropping off the bottom.\n")
+    elif end == "max-steps":
+        emit(f"\nProgram terminated when maximum step limit {max_steps} reached.\n")
+    elif end == "simulate-error":
+        emit(message + "\nSimulation terminated due to errors.\n")
+    if pending and on_output is not None:
+        on_output("".join(pending))
+    return {
+        "stdout": "".join(out),
+        "end": end,
+        "exit_code": exit_code,
+        "instructions": steps,
+        "duration": time.perf_counter() - start,
+    }
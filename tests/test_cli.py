@@ -0,0 +1,22 @@
+import json
+
+from src.cli import main
+
+
+def test_translator_error_is_a_json_report(tmp_path, capsys):
+    program = tmp_path / "p.int"
+    program.write_text("0: begin_block, main, _, _\n1: jump\n2: halt, _, _, _\n")
+    matrix = tmp_path / "m.txt"
+    matrix.write_text("1\n")
+    assert main(["run-int-batch", str(program), "--inputs-matrix", str(matrix)]) == 1
+    report = json.loads(capsys.readouterr().out)
+    assert report == {
+        "status": "error", "command": "run-int-batch",
+        "error": "Error: Not enough fields in jump line 2: 1: jump", "ok": False,
+    }
+
+
+def test_missing_inputs_file_is_a_json_report(tmp_path, capsys):
+    assert main(["run-asm", str(tmp_path / "p.asm"), "--inputs-file", str(tmp_path / "none")]) == 1
+    report = json.loads(capsys.readouterr().out)
+    assert (report["status"], report["command"], report["ok"]) == ("error", "run-asm", False)
@@ -0,0 +1,45 @@
+import pytest
+
+from src.logic.pipeline import build_intermediate, interpret_intermediate
+
+
+def write_int(tmp_path, line):
+    path = tmp_path / "p.int"
+    path.write_text(f"0: begin_block, main, _, _\n{line}\n9: halt, _, _, _\n")
+    return str(path)
+
+
+# A quad cut short, and how the C translation and the interpreter name its kind.
+TRUNCATED = [
+    ("1: jump", "jump", "jump"),
+    ("1: <, a, 1", "comparison", "comparison"),
+    ("1: out", "out", "out"),
+    ("1: in", "in", "in"),
+    ("1: :=, 1", "assignment", "assignment"),
+    ("1: +, a, 1", "addition", "arithmetic"),
+]
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+@pytest.mark.parametrize("line, kind, _", TRUNCATED)
+def test_truncated_quad_is_a_translation_error(tmp_path, line, kind, _, optimize):
+    result = build_intermediate(write_int(tmp_path, line), optimize=optimize)
+    assert result["status"] == "error"
+    assert result["stage"] == "translate"
+    assert result["messages"][-1] == f"Error: Not enough fields in {kind} line 2: {line}"
+
+
+@pytest.mark.parametrize("line, _, kind", TRUNCATED)
+def test_truncated_quad_is_an_interpreter_error(tmp_path, line, _, kind):
+    result = interpret_intermediate(write_int(tmp_path, line))
+    assert result["status"] == "error"
+    assert result["stderr"] == f"Error: Not enough fields in {kind} line 2: {line}"
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_unreachable_bad_quad_still_fails_the_build(tmp_path, optimize):
+    path = tmp_path / "p.int"
+    path.write_text("0: begin_block, main, _, _\n1: jump, _, _, 3\n2: call, f, _, _\n3: halt, _, _, _\n")
+    result = build_intermediate(str(path), optimize=optimize)
+    assert (result["status"], result["stage"]) == ("error", "translate")
+    assert result["messages"][-1] == "Error: functions not supported: call"
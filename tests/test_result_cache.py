@@ -0,0 +1,27 @@
+from src.logic.pipeline import build_intermediate
+from src.logic.result_cache import ResultCache, nondeterministic_reason
+
+PROGRAM = "0: begin_block, main, _, _\n1: out, 1, _, _\n2: halt, _, _, _\n"
+
+
+def test_marked_int_source_is_not_cached(tmp_path):
+    marked = tmp_path / "m.int"
+    marked.write_text("# nondeterministic: reads the clock\n" + PROGRAM)
+    plain = tmp_path / "p.int"
+    plain.write_text(PROGRAM)
+    executable = tmp_path / "p.out"
+    executable.write_bytes(b"\x7fELF")
+    cache = ResultCache(root=str(tmp_path / "cache"))
+    assert nondeterministic_reason(str(marked)) == "marked nondeterministic"
+    assert cache.key(str(executable), "gcc", source_file=str(marked)) is None
+    assert cache.key(str(executable), "gcc", source_file=str(plain)) is not None
+    # The comment line is no quad, so the program still builds.
+    assert build_intermediate(str(marked))["stage"] != "translate"
+
+
+def test_executable_without_source_is_not_cached(tmp_path):
+    executable = tmp_path / "p.out"
+    executable.write_bytes(b"\x7fELF")
+    cache = ResultCache(root=str(tmp_path / "cache"))
+    assert cache.key(str(executable), "gcc") is None
+    assert cache.bypassed == 1
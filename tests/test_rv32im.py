@@ -0,0 +1,209 @@
+import pytest
+
+from src.logic.limited_exec import Limits
+from src.logic.pipeline import simulate_assembly
+from src.riscV_simulator.rv32im import (
+    AssemblyError, DATA_BASE, MASK, OP_CONST, OP_ADDI, OP_ECALL, OP_JALR, TEXT_BASE, assemble, simulate
+)
+
+EXIT = "\nProgram terminated by calling exit\n"
+CLIFF = "\nProgram terminated by dropping off the bottom.\n"
+
+
+def run(source, inputs=(), **kwargs):
+    return simulate(assemble(source, "t.asm"), inputs, **kwargs)
+
+
+def program(body, data=""):
+    return f".data\n{data}\n.text\n.globl main\nmain:\n{body}\n    li a7, 10\n    ecall\n"
+
+
+def print_int(register):
+    return f"    mv a0, {register}\n    li a7, 1\n    ecall\n    li a0, 10\n    li a7, 11\n    ecall\n"
+
+
+# Pseudo-instruction expansion and addresses
+
+def test_li_small_is_one_addi():
+    code = assemble("li t0, 2047\n").code
+    assert code == [(OP_ADDI, 5, 0, 2047)]
+
+
+def test_li_large_is_lui_addi():
+    prog = assemble("li t0, 0x12345\nafter: nop\n")
+    assert len(prog.code) == 3
+    assert prog.labels["after"] == TEXT_BASE + 8
+
+
+@pytest.mark.parametrize("value", [0x12345, 0x800, 0xFFF, -2049, 0x7FFFFFFF, -0x80000000, 0xFFFFFFFF])
+def test_li_loads_the_value(value):
+    result = run(program(f"    li t0, {value}\n" + print_int("t0")))
+    signed = ((value + 0x80000000) & MASK) - 0x80000000
+    assert result["stdout"] == f"{signed}\n" + EXIT
+
+
+def test_la_and_call_take_two_instructions():
+    prog = assemble(program("    la a0, msg\n    call f\nf:\n    ret\n", 'msg: .asciz "hi"'))
+    assert prog.labels["f"] == TEXT_BASE + 16
+    assert prog.labels["msg"] == DATA_BASE
+    assert prog.code[0] == (OP_CONST, 10, 0, DATA_BASE)
+    assert prog.code[3][0] == OP_JALR
+
+
+def test_hi_lo_split_with_bit_11_set():
+    # A negative %lo has to be compensated by the %hi part.
+    source = program("    la t0, far\n    lw t1, 0(t0)\n" + print_int("t1") + "    lw t2, far\n" + print_int("t2"),
+                     "pad: .space 2048\nfar: .word 77")
+    prog = assemble(source)
+    assert prog.labels["far"] == DATA_BASE + 0x800
+    assert simulate(prog)["stdout"] == "77\n77\n" + EXIT
+
+
+def test_swapped_and_zero_branches():
+    body = (
+        "    li t0, 3\n    li t1, 5\n"
+        "    bgt t1, t0, ok1\n    li a0, 1\n    j fail\n"
+        "ok1:\n    ble t0, t1, ok2\n    li a0, 2\n    j fail\n"
+        "ok2:\n    blez zero, ok3\n    li a0, 3\n    j fail\n"
+        "ok3:\n    bgtz t0, ok4\n    li a0, 4\n    j fail\n"
+        "ok4:\n    li a0, 0\n"
+        "fail:\n    li a7, 93\n    ecall\n"
+    )
+    result = run(".text\n.globl main\nmain:\n" + body)
+    assert result["exit_code"] == 0
+
+
+def test_entry_is_main_only_when_global():
+    source = "    li a0, 1\n    li a7, 1\n    ecall\nmain:\n    li a0, 2\n    li a7, 1\n    ecall\n"
+    assert run(".text\n" + source)["stdout"] == "12" + CLIFF
+    assert run(".text\n.globl main\n" + source)["stdout"] == "2" + CLIFF
+
+
+def test_undefined_label_is_an_assembly_error():
+    with pytest.raises(AssemblyError, match="line 1"):
+        assemble("j nowhere\n")
+
+
+# Division
+
+@pytest.mark.parametrize("op, x, y, expected", [
+    ("div", 7, 0, -1),
+    ("rem", 7, 0, 7),
+    ("div", -7, 0, -1),
+    ("rem", -7, 0, -7),
+    ("divu", 7, 0, -1),
+    ("remu", 7, 0, 7),
+    ("div", -7, 2, -3),
+    ("rem", -7, 2, -1),
+    ("div", 7, -2, -3),
+    ("rem", 7, -2, 1),
+    ("div", -0x80000000, -1, -0x80000000),
+    ("rem", -0x80000000, -1, 0),
+])
+def test_division(op, x, y, expected):
+    result = run(program(f"    li t0, {x}\n    li t1, {y}\n    {op} t2, t0, t1\n" + print_int("t2")))
+    assert result["stdout"] == f"{expected}\n" + EXIT
+
+
+# Syscalls
+
+def test_print_int_string_and_char():
+    body = (
+        "    li a0, -42\n    li a7, 1\n    ecall\n"
+        "    la a0, msg\n    li a7, 4\n    ecall\n"
+        "    li a0, 65\n    li a7, 11\n    ecall\n"
+    )
+    assert run(program(body, 'msg: .asciz " is\\n"'))["stdout"] == "-42 is\nA" + EXIT
+
+
+def test_read_int():
+    body = "    li a7, 5\n    ecall\n    mv t0, a0\n    li a7, 5\n    ecall\n    add t0, t0, a0\n" + print_int("t0")
+    assert run(program(body), ["40", " 2 "])["stdout"] == "42\n" + EXIT
+
+
+def test_read_int_rejects_bad_input():
+    result = run(program("    li a7, 5\n    ecall\n"), ["abc"])
+    assert result["end"] == "simulate-error"
+    assert "t.asm line 7: Runtime exception at 0x00400004: invalid integer input (syscall 5)" in result["stdout"]
+    assert result["stdout"].endswith("\nSimulation terminated due to errors.\n")
+
+
+def test_write_to_stdout():
+    body = "    li a0, 1\n    la a1, msg\n    li a2, 3\n    li a7, 64\n    ecall\n" + print_int("a0")
+    assert run(program(body, 'msg: .ascii "ab\\n"'))["stdout"] == "ab\n3\n" + EXIT
+
+
+def test_exit_with_code():
+    result = run(".text\n    li a0, 3\n    li a7, 93\n    ecall\n    li a0, 9\n")
+    assert result["end"] == "exit"
+    assert result["exit_code"] == 3
+    assert result["stdout"] == EXIT
+
+
+def test_unknown_syscall_is_a_runtime_error():
+    result = run(".text\n    li a7, 99\n    ecall\n")
+    assert result["end"] == "simulate-error"
+    assert "invalid or unimplemented syscall service: 99" in result["stdout"]
+
+
+# Termination and instruction counts
+
+def test_counts_every_basic_instruction_but_not_the_exit():
+    # RARS counts neither the ecall that exits nor an instruction that faults.
+    result = run(".text\n    li t0, 0x12345\n    li a7, 10\n    ecall\n")
+    assert result["end"] == "exit"
+    assert result["instructions"] == 3
+    assert run(".text\n    li t0, 2\n    lw t1, 0(t0)\n")["instructions"] == 1
+
+
+def test_dropping_off_the_bottom():
+    result = run(".text\n    nop\n    nop\n")
+    assert result["end"] == "cliff"
+    assert result["instructions"] == 2
+    assert result["stdout"] == CLIFF
+
+
+def test_max_steps():
+    result = run(".text\nloop:\n    addi t0, t0, 1\n    j loop\n", max_steps=10)
+    assert result["end"] == "max-steps"
+    assert result["instructions"] == 10
+    assert result["stdout"] == "\nProgram terminated when maximum step limit 10 reached.\n"
+
+
+def test_misaligned_load_reports_the_faulting_instruction():
+    result = run(".text\n    li t0, 2\n    lw t1, 0(t0)\n")
+    assert result["stdout"].startswith("Error in t.asm line 3: Runtime exception at 0x00400004: ")
+
+
+def test_x0_stays_zero():
+    assert run(program("    li zero, 5\n    addi x0, x0, 1\n" + print_int("zero")))["stdout"] == "0\n" + EXIT
+    assert assemble("ecall\n").code == [(OP_ECALL, 0, 0, 0)]
+
+
+# simulate_assembly
+
+def test_simulate_assembly_stats(tmp_path):
+    path = tmp_path / "p.asm"
+    path.write_text(program(print_int("zero")))
+    result = simulate_assembly(str(path), limits=Limits(wall=10))
+    assert result["status"] == "ok"
+    assert result["stats"]["instructions"] == 7
+    assert result["stats"]["max_rss"] is None
+    assert "not_applied" not in result["stats"]
+
+
+def test_simulate_assembly_error_matches_rars(tmp_path):
+    path = tmp_path / "bad.asm"
+    path.write_text(".text\n    bogus t0\n")
+    result = simulate_assembly(str(path), limits=Limits(wall=10))
+    assert result["stdout"] == (f'Error in {path} line 2 column 5: "bogus" is not a recognized operator\n'
+                                "\nProcessing terminated due to errors.\n")
+
+
+def test_simulate_assembly_cpu_limit(tmp_path):
+    path = tmp_path / "spin.asm"
+    path.write_text(".text\nloop:\n    j loop\n")
+    result = simulate_assembly(str(path), limits=Limits(cpu=0.2, wall=30, memory=1 << 30), max_steps=0)
+    assert result["status"] == "timeout"
+    assert (result["stats"]["reason"], result["stats"]["limit"]) == ("timeout", "cpu")
+    assert result["stats"]["not_applied"] == ["memory"]